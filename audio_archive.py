@@ -0,0 +1,346 @@
+import argparse
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+ARCHIVE_DIR = "audio_archive"
+SESSION_FILE = "session.json"
+INDEX_FILE = "index.bin"
+
+# Ein Eintrag pro Chunk-Datei: erstes Sample (Sample-Zähler der Aufnahme), Uhrzeit dieses Samples,
+# Anzahl Samples (0 = Chunk wird noch geschrieben) und davon mit Stille aufgefüllte Samples
+INDEX_DTYPE = np.dtype([("first_sample", "<i8"), ("time", "<f8"), ("samples", "<i4"), ("gap_samples", "<i4")])
+
+
+def chunk_file_name(number):
+    return f"chunk_{number:06d}.pcm"
+
+
+class AudioArchiver:
+    """Schreibt das aufgenommene Audio (int16) einer Session ab Sample 0 in Chunk-Dateien fester Länge.
+
+    write() kehrt sofort zurück: Die Chunks gehen über eine begrenzte Warteschlange an einen eigenen
+    Schreib-Thread, ist sie voll, fällt der Chunk weg und wird im Archiv als Stille aufgefüllt - so
+    bleibt Sample n immer in Datei n // chunk_samples an Position n % chunk_samples. Pro fertiger
+    Chunk-Datei steht ein Eintrag (INDEX_DTYPE) in index.bin. Nach jedem Chunk werden im ganzen
+    Archiv-Verzeichnis die ältesten Chunks gelöscht, bis max_bytes und max_age eingehalten sind (0 = aus).
+    Mehrere Archiver (ein Sprecher je Session) teilen sich das Verzeichnis: Was ein anderer gerade gelöscht
+    hat, wird übersprungen, und Verzeichnisse laufender Sessions bleiben stehen.
+    """
+
+    _open_sessions = set()   # Verzeichnisse der laufenden Sessions aller Archiver im Prozess
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, root, rate, chunk_duration=60, max_bytes=0, max_age=0, queue_size=1000, log=None):
+        self.root = root
+        self.rate = rate
+        self.chunk_samples = int(chunk_duration * rate)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.log = log or (lambda message: None)
+        self.directory = None
+        self.dropped_samples = 0
+        self.deleted_chunks = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._chunk_file = None
+        self._chunk_number = None
+        self._chunk_written = 0   # Samples in der aktuellen Chunk-Datei
+        self._chunk_gaps = 0
+        self._chunk_time = None
+        self._index_file = None
+        self._next_sample = 0     # Nächstes erwartetes Sample
+
+    def start(self, started=None, name=None):
+        """Legt das Session-Verzeichnis an (Zeitstempel, optional mit name) und startet den Schreib-Thread."""
+        started = time.time() if started is None else started
+        name = datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S") + (f"-{name}" if name else "")
+        self.directory = os.path.join(self.root, name)
+        suffix = 1
+        while os.path.exists(self.directory):
+            suffix += 1
+            self.directory = os.path.join(self.root, f"{name}-{suffix}")
+        os.makedirs(self.directory)
+        with self._sessions_lock:
+            self._open_sessions.add(self.directory)
+        with open(os.path.join(self.directory, SESSION_FILE), "w", encoding="utf-8") as f:
+            json.dump({"rate": self.rate, "chunk_samples": self.chunk_samples, "started": started}, f)
+        self._index_file = open(os.path.join(self.directory, INDEX_FILE), "wb")
+        self._thread = threading.Thread(target=self._run, name="Audio-Archiv", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, data, end_sample, end_time):
+        """Übernimmt einen Chunk der Aufnahme, der bei Sample end_sample (Uhrzeit end_time) endet."""
+        try:
+            data = data.tobytes() if isinstance(data, np.ndarray) else bytes(data)
+            self._queue.put_nowait((data, end_sample, end_time))
+        except queue.Full:
+            self.dropped_samples += len(data) // 2
+
+    def close(self):
+        """Schreibt alle wartenden Chunks und schließt die Dateien."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        with self._sessions_lock:
+            self._open_sessions.discard(self.directory)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            data, end_sample, end_time = entry
+            try:
+                self._append(np.frombuffer(data, dtype=np.int16), end_sample, end_time)
+            except OSError as e:
+                self.log(f"Fehler beim Schreiben des Audio-Archivs: {e}")
+        try:
+            self._finish_chunk()
+            self._index_file.close()
+        except OSError as e:
+            self.log(f"Fehler beim Schließen des Audio-Archivs: {e}")
+
+    def _append(self, samples, end_sample, end_time):
+        start_sample = end_sample - len(samples)
+        if start_sample < self._next_sample:
+            samples = samples[self._next_sample - start_sample:]   # Bereits archiviert
+            start_sample = self._next_sample
+        gap = start_sample - self._next_sample
+        sample_time = end_time - len(samples) / self.rate
+        if gap:
+            # Verlorene Chunks als Stille auffüllen, damit die Positionen stimmen
+            self._write_samples(np.zeros(gap, dtype=np.int16), sample_time - gap / self.rate, gap=True)
+        self._write_samples(samples, sample_time)
+
+    def _write_samples(self, samples, first_time, gap=False):
+        while len(samples):
+            if self._chunk_file is None:
+                self._open_chunk(self._next_sample // self.chunk_samples, first_time)
+            count = min(len(samples), self.chunk_samples - self._chunk_written)
+            self._chunk_file.write(samples[:count].tobytes())
+            self._chunk_written += count
+            if gap:
+                self._chunk_gaps += count
+            self._next_sample += count
+            first_time += count / self.rate
+            samples = samples[count:]
+            if self._chunk_written == self.chunk_samples:
+                self._finish_chunk()
+
+    def _open_chunk(self, number, chunk_time):
+        self._chunk_number = number
+        self._chunk_written = 0
+        self._chunk_gaps = 0
+        self._chunk_time = chunk_time
+        self._chunk_file = open(os.path.join(self.directory, chunk_file_name(number)), "wb")
+        self._write_index_entry(0)
+
+    def _write_index_entry(self, samples):
+        entry = np.array([(self._chunk_number * self.chunk_samples, self._chunk_time, samples, self._chunk_gaps)],
+                         dtype=INDEX_DTYPE)
+        # Einträge stehen an fester Position - der Eintrag des laufenden Chunks wird beim Abschluss überschrieben
+        self._index_file.seek(self._chunk_number * INDEX_DTYPE.itemsize)
+        self._index_file.write(entry.tobytes())
+        self._index_file.flush()
+
+    def _finish_chunk(self):
+        if self._chunk_file is None:
+            return
+        self._chunk_file.close()
+        self._chunk_file = None
+        self._write_index_entry(self._chunk_written)
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        if not self.max_bytes and not self.max_age:
+            return
+        chunks = []
+        for session in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, session)
+            try:
+                names = sorted(os.listdir(directory))
+            except (FileNotFoundError, NotADirectoryError):
+                continue   # Keine Session oder gerade von einem anderen Archiver entfernt
+            for name in names:
+                if name.startswith("chunk_"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    chunks.append((stat.st_mtime, path, stat.st_size))
+        chunks.sort()
+        current = os.path.join(self.directory, chunk_file_name(self._chunk_number))
+        total = sum(size for _, _, size in chunks)
+        now = time.time()
+        for mtime, path, size in chunks:
+            if path == current:
+                break   # Der gerade abgeschlossene Chunk bleibt immer
+            if not (self.max_bytes and total > self.max_bytes) and not (self.max_age and now - mtime > self.max_age):
+                break
+            total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue   # Schon von einem anderen Archiver gelöscht
+            self.deleted_chunks += 1
+            directory = os.path.dirname(path)
+            with self._sessions_lock:
+                if directory in self._open_sessions:
+                    continue
+            try:
+                if not any(name.startswith("chunk_") for name in os.listdir(directory)):
+                    shutil.rmtree(directory, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+
+class ArchiveReader:
+    """Liest beliebige Bereiche einer archivierten Session über Memory-Mapping der Chunk-Dateien.
+
+    Die Position eines Samples ergibt sich direkt aus der Chunk-Länge, gelesen werden nur die
+    betroffenen Dateien. Zeiten sind Sekunden seit Sample 0 - dieselbe Audio-Zeit wie start/end
+    in transcript.jsonl - oder bei read_time() Uhrzeiten aus dem Index.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, SESSION_FILE), "r", encoding="utf-8") as f:
+            session = json.load(f)
+        self.rate = session["rate"]
+        self.chunk_samples = session["chunk_samples"]
+        self.started = session["started"]
+        self._maps = {}
+
+    def index(self):
+        """Index-Einträge (INDEX_DTYPE) aller bisher angelegten Chunks, gemappt statt geladen."""
+        path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.getsize(path) < INDEX_DTYPE.itemsize:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.memmap(path, dtype=INDEX_DTYPE, mode="r")
+
+    @property
+    def total_samples(self):
+        index = self.index()
+        if not len(index):
+            return 0
+        return int(index[-1]["first_sample"]) + self._chunk_length(len(index) - 1, index[-1])
+
+    def _chunk_length(self, number, entry):
+        if entry["samples"]:
+            return int(entry["samples"])
+        # Noch offener Chunk: so viel, wie bereits auf der Platte steht
+        path = os.path.join(self.directory, chunk_file_name(number))
+        return os.path.getsize(path) // 2 if os.path.exists(path) else 0
+
+    def _chunk(self, number):
+        chunk = self._maps.get(number)
+        if chunk is not None:
+            return chunk
+        path = os.path.join(self.directory, chunk_file_name(number))
+        if not os.path.exists(path):
+            raise ValueError(f"Chunk {number} ist nicht (mehr) im Archiv")
+        entry = self.index()[number]
+        length = self._chunk_length(number, entry)
+        chunk = np.memmap(path, dtype=np.int16, mode="r", shape=(length,)) if length else np.zeros(0, np.int16)
+        if entry["samples"]:
+            self._maps[number] = chunk   # Nur fertige Chunks bleiben gemappt
+        return chunk
+
+    def read_samples(self, start_sample, end_sample):
+        """Kopiert die Samples [start_sample, end_sample) als int16-Array."""
+        start_sample = max(0, int(start_sample))
+        end_sample = int(end_sample)
+        if end_sample > self.total_samples or end_sample < start_sample:
+            raise ValueError(f"Bereich {start_sample}-{end_sample} liegt nicht im Archiv")
+        out = np.empty(end_sample - start_sample, dtype=np.int16)
+        position = start_sample
+        while position < end_sample:
+            number, offset = divmod(position, self.chunk_samples)
+            count = min(end_sample - position, self.chunk_samples - offset)
+            chunk = self._chunk(number)
+            if offset + count > len(chunk):
+                raise ValueError(f"Bereich {start_sample}-{end_sample} liegt nicht im Archiv")
+            out[position - start_sample:position - start_sample + count] = chunk[offset:offset + count]
+            position += count
+        return out
+
+    def read(self, start, end):
+        """Audio zwischen start und end (Sekunden Audio-Zeit) als int16-Array."""
+        return self.read_samples(round(start * self.rate), round(end * self.rate))
+
+    def read_segment(self, record):
+        """Audio eines Transkript-Segments (JSONL-Eintrag oder Suchtreffer mit start/end)."""
+        if isinstance(record, dict):
+            return self.read(record["start"], record["end"])
+        return self.read(record.start, record.end)
+
+    def read_time(self, since, until):
+        """Audio zwischen zwei Uhrzeiten (Unix-Zeit) anhand der Chunk-Zeiten im Index."""
+        return self.read_samples(self.sample_at(since), self.sample_at(until))
+
+    def sample_at(self, timestamp):
+        index = self.index()
+        if not len(index):
+            raise ValueError("Archiv ist leer")
+        number = max(0, int(np.searchsorted(index["time"], timestamp, side="right")) - 1)
+        return int(index[number]["first_sample"]) + max(0, round((timestamp - index[number]["time"]) * self.rate))
+
+    def close(self):
+        self._maps.clear()
+
+
+def sessions(root=ARCHIVE_DIR):
+    """Verzeichnisse aller archivierten Sessions, älteste zuerst."""
+    if not os.path.isdir(root):
+        return []
+    return [os.path.join(root, name) for name in sorted(os.listdir(root))
+            if os.path.exists(os.path.join(root, name, SESSION_FILE))]
+
+
+def write_wav(path, samples, rate):
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio-Archiv: Sessions auflisten, Ausschnitte als WAV exportieren")
+    parser.add_argument("--root", default=ARCHIVE_DIR, help="Archiv-Verzeichnis")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("sessions", help="Alle Sessions auflisten")
+    extract = commands.add_parser("extract", help="Ausschnitt einer Session als WAV speichern")
+    extract.add_argument("session", help="Session-Verzeichnis (oder Name im Archiv)")
+    extract.add_argument("start", type=float, help="Beginn in Sekunden Audio-Zeit (wie start in transcript.jsonl)")
+    extract.add_argument("end", type=float, help="Ende in Sekunden Audio-Zeit")
+    extract.add_argument("output", help="Ziel-WAV-Datei")
+    args = parser.parse_args()
+
+    if args.command == "sessions":
+        for directory in sessions(args.root):
+            reader = ArchiveReader(directory)
+            started = datetime.fromtimestamp(reader.started).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{os.path.basename(directory)}  {started}  {reader.total_samples / reader.rate:>9.1f}s")
+    elif args.command == "extract":
+        directory = args.session if os.path.isdir(args.session) else os.path.join(args.root, args.session)
+        reader = ArchiveReader(directory)
+        samples = reader.read(args.start, args.end)
+        write_wav(args.output, samples, reader.rate)
+        print(f"✓ {len(samples) / reader.rate:.2f}s nach '{args.output}' geschrieben")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import bisect
+import threading
+import time
+import wave
+
+
+# Status-Flag im Callback von PortAudio: Eingangsdaten gingen vor diesem Block verloren (paInputOverflow)
+PA_INPUT_OVERFLOW = 0x2
+PA_CONTINUE = 0 # paContinue
+MAX_BUFFERED_DURATION = 2.0 # Sekunden: So viel Audio hält die Quelle vor, falls die Aufnahme nicht nachkommt
+
+
+class MicrophoneSource:
+    """Audio-Eingang über PyAudio (Standard-Eingabegerät oder device_index). PyAudio wird erst beim Öffnen importiert.
+
+    rate=None bzw. channels=None öffnen das Gerät mit seiner nativen Rate (defaultSampleRate) bzw. allen
+    Eingangskanälen - umgerechnet wird danach in record_audio() statt im Betriebssystem.
+    Mit channels > 1 liefert read() die Kanäle verschachtelt (ein Frame = ein Sample pro Kanal).
+    Der Stream läuft im Callback-Modus: PortAudio übergibt jeden Block, read() holt ihn ab. Eingangs-Überläufe
+    meldet PortAudio über status_flags - sie werden gezählt (overflows), das Audio des Blocks bleibt erhalten.
+    Verloren sind nur die Frames, die PortAudio selbst verworfen hat. Kommt read() länger als
+    MAX_BUFFERED_DURATION nicht nach, wird das älteste Audio verworfen und ebenfalls als Überlauf gezählt.
+    """
+
+    def __init__(self, rate, channels, chunk_size, device_index=None):
+        self.rate = rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.device_index = device_index
+        self.device_name = None
+        self.default_sample_rate = None
+        self.overflows = 0
+        self._pyaudio = None
+        self._stream = None
+        self._buffer = bytearray()
+        self._max_bytes = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def open(self):
+        import pyaudio
+        self._pyaudio = pyaudio.PyAudio()
+        if self.device_index is None:
+            device = self._pyaudio.get_default_input_device_info()
+        else:
+            device = self._pyaudio.get_device_info_by_index(self.device_index)
+        self.device_name = device['name']
+        self.default_sample_rate = device['defaultSampleRate']
+        if self.rate is None:
+            self.rate = int(self.default_sample_rate)
+        if self.channels is None:
+            self.channels = max(1, int(device['maxInputChannels']))
+        self._max_bytes = int(MAX_BUFFERED_DURATION * self.rate) * 2 * self.channels
+        self._closed = False
+        self._stream = self._pyaudio.open(format=pyaudio.paInt16,
+                                          channels=self.channels,
+                                          rate=self.rate,
+                                          input=True,
+                                          input_device_index=self.device_index,
+                                          frames_per_buffer=self.chunk_size,
+                                          stream_callback=self._callback)
+        return self
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        """Callback von PortAudio (eigener Thread): Block ablegen, Überläufe zählen."""
+        with self._cond:
+            if status_flags & PA_INPUT_OVERFLOW:
+                self.overflows += 1
+            self._buffer += in_data
+            excess = len(self._buffer) - self._max_bytes
+            if excess > 0:
+                frame_bytes = 2 * self.channels
+                del self._buffer[:-(-excess // frame_bytes) * frame_bytes]
+                self.overflows += 1
+            self._cond.notify()
+        return None, PA_CONTINUE
+
+    def read(self, num_frames):
+        """Wartet auf num_frames Samples und gibt sie als int16-Bytes zurück (leer, sobald die Quelle geschlossen ist)."""
+        size = num_frames * 2 * self.channels
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._buffer) >= size or self._closed)
+            if self._closed:
+                return b""
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+
+class WavFileSource:
+    """Deterministischer Ersatz für pyaudio.Stream.read, der eine WAV-Datei abspielt.
+
+    speed=1.0 liefert in Echtzeit, speed=10 zehnmal so schnell, speed=0 so schnell wie möglich.
+    Die Aufnahmezeit jedes Chunks wird festgehalten (capture_times), damit Latenzen vom
+    Ende eines Audio-Abschnitts bis zum fertigen Text gemessen werden können.
+    Mit loop > 1 wird die Datei mehrfach hintereinander abgespielt. Am Ende liefert read() leere Bytes.
+    """
+
+    def __init__(self, path, speed=1.0, loop=1, record_times=True):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.record_times = record_times
+        self.device_name = f"WAV-Wiedergabe: {path}"
+        self.default_sample_rate = None
+        self.rate = None
+        self.channels = None
+        self.frames_delivered = 0
+        self.capture_times = []   # (Sample-Zähler nach dem Chunk, Wanduhr-Zeit der Auslieferung)
+        self._wav = None
+        self._loops_done = 0
+        self._start_time = None
+
+    def open(self):
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getsampwidth() != 2:
+            raise ValueError(f"{self.path}: Nur 16-bit PCM wird unterstützt")
+        self.rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self.default_sample_rate = float(self.rate)
+        return self
+
+    @property
+    def audio_time(self):
+        """Simulierte Uhr: Sekunden Audio, die bisher ausgeliefert wurden."""
+        return self.frames_delivered / self.rate
+
+    def read(self, num_frames):
+        """Liest num_frames Samples als int16-Bytes und wartet gemäß speed auf die simulierte Aufnahmezeit."""
+        data = self._wav.readframes(num_frames)
+        while not data and self._loops_done + 1 < self.loop:
+            self._loops_done += 1
+            self._wav.rewind()
+            data = self._wav.readframes(num_frames)
+        if not data:
+            return b""
+
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        self.frames_delivered += len(data) // (2 * self.channels)
+        if self.speed:
+            # Erst ausliefern, wenn das letzte Sample dieses Chunks "aufgenommen" wäre
+            delay = self._start_time + self.audio_time / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if self.record_times:
+            self.capture_times.append((self.frames_delivered, time.perf_counter()))
+        return data
+
+    def capture_time(self, sample):
+        """Wanduhr-Zeit, zu der das Sample mit diesem Zähler ausgeliefert wurde (None falls unbekannt)."""
+        index = bisect.bisect_left(self.capture_times, (sample, float("-inf")))
+        if index >= len(self.capture_times):
+            return None
+        return self.capture_times[index][1]
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class PushSource:
+    """Audio-Eingang, dem ein anderer Thread (z.B. der Stream-Server) PCM16-Bytes zuschiebt.
+
+    push() blockiert nie: Liegen schon max_bytes im Puffer, gibt es False zurück und der Absender
+    muss es später erneut versuchen (der Server liest solange nicht weiter vom Socket).
+    read() liefert ganze Chunks, nach finish() noch den Rest (auf ganze Frames gekürzt), danach leere Bytes.
+    """
+
+    def __init__(self, rate, channels=1, name="Netzwerk", max_bytes=64 * 1024):
+        self.rate = rate
+        self.channels = channels
+        self.max_bytes = max_bytes
+        self.device_name = f"Netzwerk: {name}"
+        self.default_sample_rate = float(rate)
+        self.bytes_received = 0
+        self._buffer = bytearray()
+        self._finished = False
+        self._cond = threading.Condition()
+
+    def open(self):
+        return self
+
+    def push(self, data):
+        """Hängt Bytes an (beliebige Größe) - False, wenn der Puffer voll ist."""
+        with self._cond:
+            if self._finished:
+                raise RuntimeError("Quelle ist bereits beendet")
+            if len(self._buffer) >= self.max_bytes:
+                return False
+            self._buffer += data
+            self.bytes_received += len(data)
+            self._cond.notify()
+            return True
+
+    def finish(self):
+        """Kein weiteres Audio - read() liefert den Rest und dann leere Bytes."""
+        with self._cond:
+            self._finished = True
+            self._cond.notify()
+
+    def read(self, num_frames):
+        """Wartet auf num_frames Samples und gibt sie als int16-Bytes zurück."""
+        frame_bytes = 2 * self.channels
+        size = num_frames * frame_bytes
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._buffer) >= size or self._finished)
+            size = min(size, len(self._buffer) - len(self._buffer) % frame_bytes)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+    def close(self):
+        self.finish()
@@ -0,0 +1,191 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+from model_manager import load_whisper_model
+from stitcher import normalize_word
+
+# Standard-Suchraum des Autotuners
+MODEL_SIZES = ["tiny", "base"]
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+BEAM_SIZES = [1, 5]
+PROFILE_FILE = "stt_profile.json"
+
+
+def load_wav(path):
+    """Liest eine 16-bit Mono-WAV-Datei als float32 im Bereich [-1, 1)."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"{path}: Erwartet 16-bit Mono-PCM")
+        rate = wf.getframerate()
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return audio.astype(np.float32) / 32768.0, rate
+
+
+def peak_rss_mb():
+    """Höchststand des Arbeitsspeichers (RSS) dieses Prozesses in MB - None, wenn das System ihn nicht meldet (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024 # macOS: Bytes, Linux/BSD: KiB
+
+
+def word_error_rate(reference, hypothesis):
+    """Wortfehlerrate (Levenshtein auf Wortebene, ohne Satzzeichen und Groß-/Kleinschreibung)."""
+    ref = [w for w in (normalize_word(word) for word in reference.split()) if w]
+    hyp = [w for w in (normalize_word(word) for word in hypothesis.split()) if w]
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def measure_config(task):
+    """Misst eine Konfiguration in einem eigenen Prozess, damit der Spitzen-RSS nur ihr gehört."""
+    wav_path, reference, size, compute_type, cpu_threads, beam_sizes, repeat = task
+    audio, rate = load_wav(wav_path)
+    duration = len(audio) / rate
+    results = []
+
+    load_start = time.perf_counter()
+    try:
+        model = load_whisper_model(size, "cpu", compute_type, cpu_threads=cpu_threads)
+    except Exception as e:
+        return [{"model": size, "compute_type": compute_type, "cpu_threads": cpu_threads,
+                 "beam_size": beam_size, "error": str(e)} for beam_size in beam_sizes]
+    load_time = time.perf_counter() - load_start
+
+    # Aufwärm-Durchlauf, damit die erste Messung keine Initialisierung enthält
+    segments, _ = model.transcribe(audio[:rate], language="de", beam_size=1)
+    list(segments)
+
+    for beam_size in beam_sizes:
+        timings = []
+        text = ""
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            segments, _ = model.transcribe(audio, language="de", beam_size=beam_size, vad_filter=True,
+                                           vad_parameters=dict(min_silence_duration_ms=500))
+            text = " ".join(segment.text.strip() for segment in segments)
+            timings.append(time.perf_counter() - start_time)
+        results.append({
+            "model": size,
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads,
+            "beam_size": beam_size,
+            "load_seconds": load_time,
+            "real_time_factor": min(timings) / duration,
+            "peak_rss_mb": peak_rss_mb(),
+            "word_error_rate": word_error_rate(reference, text) if reference is not None else None,
+            "text": text,
+        })
+    return results
+
+
+def select_profile(results, max_rtf, max_wer=None):
+    """Wählt die schnellste Konfiguration, die Latenz-Budget und (optional) Fehlerrate einhält."""
+    candidates = [r for r in results if "error" not in r and r["real_time_factor"] <= max_rtf]
+    if max_wer is not None:
+        candidates = [r for r in candidates if r["word_error_rate"] is not None and r["word_error_rate"] <= max_wer]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r["real_time_factor"], r["word_error_rate"] or 0.0))
+
+
+def run_sweep(wav_path, reference=None, models=MODEL_SIZES, compute_types=COMPUTE_TYPES,
+              threads=None, beam_sizes=BEAM_SIZES, repeat=1, log=print):
+    """Misst alle Kombinationen aus Modell × compute_type × cpu_threads × beam_size."""
+    if threads is None:
+        cpu_count = os.cpu_count() or 1
+        threads = sorted({1, max(1, cpu_count // 2), cpu_count})
+    tasks = [(wav_path, reference, size, compute_type, cpu_threads, list(beam_sizes), repeat)
+             for size, compute_type, cpu_threads in itertools.product(models, compute_types, threads)]
+
+    results = []
+    # Jede Konfiguration in einem frischen Prozess (spawn), damit sich Modelle nicht gegenseitig beeinflussen
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for task_results in pool.imap(measure_config, tasks):
+            for r in task_results:
+                if "error" in r:
+                    log(f"✗ {r['model']}/{r['compute_type']}/{r['cpu_threads']} Threads: {r['error']}")
+                    continue
+                wer = f"{r['word_error_rate']:.2%}" if r["word_error_rate"] is not None else "-"
+                rss = f"{r['peak_rss_mb']:.0f}MB" if r["peak_rss_mb"] is not None else "-"
+                log(f"{r['model']:>6} {r['compute_type']:>13} threads={r['cpu_threads']:<2} beam={r['beam_size']} "
+                    f"RTF={r['real_time_factor']:.3f} RSS={rss} WER={wer}")
+            results.extend(task_results)
+    return results
+
+
+def write_profile(profile, path=PROFILE_FILE):
+    """Schreibt das Profil, das stt.py beim Start lädt."""
+    data = {
+        "model": profile["model"],
+        "compute_type": profile["compute_type"],
+        "cpu_threads": profile["cpu_threads"],
+        "beam_size": profile["beam_size"],
+        "measured": {key: profile[key] for key in ("real_time_factor", "peak_rss_mb", "word_error_rate")},
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Findet die schnellste Modell-Konfiguration für diesen Rechner")
+    parser.add_argument("wav", nargs="?", default="test_recording.wav", help="Referenz-WAV (16 kHz, mono, 16 bit)")
+    parser.add_argument("--reference", help="Datei mit dem korrekten Text der Referenz-WAV (für die Wortfehlerrate)")
+    parser.add_argument("--models", nargs="+", default=MODEL_SIZES)
+    parser.add_argument("--compute-types", nargs="+", default=COMPUTE_TYPES)
+    parser.add_argument("--threads", nargs="+", type=int, default=None, help="cpu_threads-Werte (Standard: 1, halb, alle)")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=BEAM_SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="Wiederholungen pro Messung (bester Wert zählt)")
+    parser.add_argument("--max-rtf", type=float, default=0.5,
+                        help="Latenz-Budget als Echtzeitfaktor (Rechenzeit / Audiodauer)")
+    parser.add_argument("--max-wer", type=float, default=None, help="Maximal erlaubte Wortfehlerrate (0-1)")
+    parser.add_argument("--profile", default=PROFILE_FILE, help="Ausgabe-Profil für stt.py")
+    parser.add_argument("--output", help="Alle Messwerte als JSON in diese Datei schreiben")
+    args = parser.parse_args()
+
+    reference = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = f.read()
+
+    results = run_sweep(args.wav, reference, args.models, args.compute_types, args.threads,
+                        args.beam_sizes, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    profile = select_profile(results, args.max_rtf, args.max_wer)
+    if profile is None:
+        print(f"Keine Konfiguration erfüllt das Budget (RTF <= {args.max_rtf}"
+              f"{f', WER <= {args.max_wer}' if args.max_wer is not None else ''}). Profil nicht geschrieben.")
+        return
+    write_profile(profile, args.profile)
+    print(f"✓ Profil '{args.profile}' geschrieben: {profile['model']}/{profile['compute_type']}, "
+          f"cpu_threads={profile['cpu_threads']}, beam_size={profile['beam_size']} "
+          f"(RTF {profile['real_time_factor']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
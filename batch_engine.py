@@ -0,0 +1,129 @@
+import bisect
+import collections
+import threading
+import time
+from collections import namedtuple
+
+# Zeitanteile eines Auftrags: Wartezeit von der Entnahme aus der Warteschlange bis zum Start seines
+# Batches, Rechenzeit des Batches und Anzahl der Aufträge, mit denen er gerechnet wurde
+BatchTiming = namedtuple("BatchTiming", ["waited", "inference", "batch_size"])
+
+
+def split_batch_segments(segments, clip_starts):
+    """Ordnet die Segmente eines gebündelten Durchlaufs ihren Fenstern zu.
+
+    clip_starts sind die Startzeiten (Sekunden, aufsteigend) der aneinandergehängten Fenster - jedes
+    Segment gehört zum Fenster, in dem seine Mitte liegt (die Pipeline rundet die Grenzen auf Samples).
+    Gibt je Fenster eine Liste zurück.
+    """
+    groups = [[] for _ in clip_starts]
+    for segment in segments:
+        index = bisect.bisect_right(clip_starts, (segment.start + segment.end) / 2) - 1
+        groups[max(index, 0)].append(segment)
+    return groups
+
+
+class BatchInferenceEngine:
+    """Sammelt wartende Aufträge beliebiger Quellen aus einer BoundedWorkQueue und rechnet sie gebündelt.
+
+    Ein Batch ist voll, sobald max_batch_size Aufträge vorliegen oder max_wait Sekunden nach dem
+    ersten vergangen sind. run_batch(items) liefert die Ergebnisse in derselben Reihenfolge,
+    deliver(seq, item, result, timing) gibt jedes an seine Quelle zurück - auch wenn der Batch
+    fehlschlägt (result None), damit keine Sequenznummer offen bleibt.
+    """
+
+    def __init__(self, work_queue, run_batch, deliver, max_batch_size=8, max_wait=0.05, log=None):
+        self.queue = work_queue
+        self.run_batch = run_batch
+        self.deliver = deliver
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max_wait
+        self.log = log or (lambda message: None)
+        self._thread = None
+        self._lock = threading.Lock()
+        # Statistik
+        self.batches = 0
+        self.requests = 0
+        self.failed = 0
+        self.batch_sizes = collections.Counter()
+        self.total_wait = 0.0
+        self.max_waited = 0.0
+        self.total_inference = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="Batch-Inferenz", daemon=True)
+            self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Rechnet Batches, bis die Warteschlange geschlossen und leer ist."""
+        while True:
+            batch = self.collect()
+            if not batch:
+                break
+            self.process(batch)
+
+    def collect(self):
+        """Wartet auf den ersten Auftrag und sammelt weitere bis zur Batch-Größe oder Wartezeit.
+
+        Gibt [(seq, item, entnommen)] zurück - leer, wenn die Warteschlange geschlossen und leer ist.
+        """
+        job = self.queue.get()
+        if job is None:
+            return []
+        collected = time.perf_counter()
+        batch = [(*job, collected)]
+        deadline = collected + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self.queue.get(timeout=remaining)
+            except TimeoutError:
+                break
+            if job is None:
+                break
+            batch.append((*job, time.perf_counter()))
+        return batch
+
+    def process(self, batch):
+        started = time.perf_counter()
+        try:
+            results = list(self.run_batch([item for _, item, _ in batch]))
+            if len(results) != len(batch):
+                raise ValueError(f"{len(results)} Ergebnisse für {len(batch)} Aufträge")
+        except Exception as e:
+            self.log(f"FEHLER bei der Batch-Inferenz ({len(batch)} Aufträge): {e}")
+            results = [None] * len(batch)
+            with self._lock:
+                self.failed += len(batch)
+        inference = time.perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            self.total_inference += inference
+            for _, _, collected in batch:
+                self.total_wait += started - collected
+                self.max_waited = max(self.max_waited, started - collected)
+        for (seq, item, collected), result in zip(batch, results):
+            self.deliver(seq, item, result, BatchTiming(started - collected, inference, len(batch)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "failed": self.failed,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "mean_wait_seconds": self.total_wait / self.requests if self.requests else 0.0,
+                "max_wait_seconds": self.max_waited,
+                "mean_batch_seconds": self.total_inference / self.batches if self.batches else 0.0,
+            }
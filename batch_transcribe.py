@@ -0,0 +1,254 @@
+import argparse
+import json
+import multiprocessing
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from model_manager import load_whisper_model
+
+SHARD_DURATION = 30 # Sekunden: Ziel-Länge eines Shards (entspricht dem Whisper-Fenster)
+CUT_SEARCH_DURATION = 5 # Sekunden: Bereich vor dem Ziel, in dem die leiseste Stelle gesucht wird
+RMS_CHUNK_SIZE = 1024 # Samples pro RMS-Block wie im Live-Betrieb (CHUNK_SIZE)
+SILENCE_THRESHOLD = 0.005 # RMS unter diesem Wert = Stille (VOLUME_THRESHOLDS[0])
+CHECKPOINT_FILE = "batch_checkpoint.jsonl"
+
+
+def open_wav_memmap(path):
+    """Öffnet die PCM-Daten einer 16-bit WAV-Datei als Memory-Map, ohne die Datei einzulesen.
+
+    Gibt (samples, rate, channels) zurück, samples hat die Form (frames, channels).
+    """
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: Keine RIFF/WAVE-Datei")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: Kein data-Chunk gefunden")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    if fmt is None:
+        raise ValueError(f"{path}: Kein fmt-Chunk gefunden")
+    audio_format, channels, rate, _, _, bits = fmt
+    if audio_format != 1 or bits != 16:
+        raise ValueError(f"{path}: Nur 16-bit PCM wird unterstützt")
+    # Ein abgeschnittener data-Chunk (z.B. abgebrochene Aufnahme) wird auf die vorhandenen Bytes begrenzt
+    chunk_size = min(chunk_size, os.path.getsize(path) - data_offset)
+    frames = chunk_size // (2 * channels)
+    samples = np.memmap(path, dtype=np.int16, mode="r", offset=data_offset, shape=(frames, channels))
+    return samples, rate, channels
+
+
+def chunk_rms(samples, chunk_size=RMS_CHUNK_SIZE, block_chunks=4096):
+    """RMS pro Chunk wie calculate_volume_level(), blockweise über die Memory-Map (Kanäle gemittelt)."""
+    n_chunks = len(samples) // chunk_size
+    rms = np.empty(n_chunks, dtype=np.float32)
+    for first in range(0, n_chunks, block_chunks):
+        last = min(n_chunks, first + block_chunks)
+        block = samples[first * chunk_size:last * chunk_size].astype(np.float32).mean(axis=1) / 32768.0
+        rms[first:last] = np.sqrt(np.mean(block.reshape(-1, chunk_size) ** 2, axis=1))
+    return rms
+
+
+def find_shards(rms, rate, total_frames, shard_duration=SHARD_DURATION, cut_search=CUT_SEARCH_DURATION,
+                chunk_size=RMS_CHUNK_SIZE, silence_threshold=SILENCE_THRESHOLD):
+    """Teilt eine Datei an Stille-Grenzen in Shards von höchstens shard_duration Sekunden.
+
+    Geschnitten wird am Ende des leisesten Chunks im Suchbereich vor der Ziel-Länge.
+    Shards, die komplett still sind, werden übersprungen.
+    """
+    shard_chunks = max(1, int(shard_duration * rate / chunk_size))
+    search_chunks = min(shard_chunks - 1, int(cut_search * rate / chunk_size))
+    shards = []
+    start = 0
+    n_chunks = len(rms)
+    while start < n_chunks:
+        end = start + shard_chunks
+        if end >= n_chunks:
+            end = n_chunks
+        else:
+            window = rms[end - search_chunks:end]
+            end = end - search_chunks + int(np.argmin(window)) + 1
+        if np.any(rms[start:end] >= silence_threshold):
+            shards.append((start * chunk_size, end * chunk_size))
+        start = end
+    # Rest hinter dem letzten vollen Chunk dem letzten Shard zuschlagen
+    if shards and shards[-1][1] == n_chunks * chunk_size:
+        shards[-1] = (shards[-1][0], total_frames)
+    return shards
+
+
+# --- Worker-Prozess: ein Modell pro Prozess ---
+_worker_model = None
+_worker_options = None
+
+
+def init_worker(model_size, compute_type, cpu_threads, options):
+    global _worker_model, _worker_options
+    _worker_model = load_whisper_model(model_size, "cpu", compute_type, cpu_threads=cpu_threads)
+    _worker_options = options
+
+
+def transcribe_shard(path, start, end):
+    """Transkribiert einen Shard und gibt Segmente mit Zeitstempeln relativ zum Dateianfang zurück."""
+    samples, rate, _ = open_wav_memmap(path)
+    audio = samples[start:end].astype(np.float32).mean(axis=1) / 32768.0
+    segments, _ = _worker_model.transcribe(audio, **_worker_options)
+    offset = start / rate
+    return [(offset + segment.start, offset + segment.end, segment.text.strip())
+            for segment in segments if segment.text.strip()]
+
+
+def file_signature(path):
+    """Identifiziert eine Eingabedatei für den Checkpoint (Pfad, Größe, Änderungszeit)."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+
+def load_checkpoint(path):
+    """Liest bereits fertige Shards: {(signatur, start, end): segmente}."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # Unvollständige letzte Zeile nach einem Absturz
+            done[(entry["file"], entry["start"], entry["end"])] = [tuple(s) for s in entry["segments"]]
+    return done
+
+
+def format_time(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:04.1f}"
+
+
+def collect_inputs(inputs):
+    """Dateien und Verzeichnisse (rekursiv nach *.wav) in stabiler Reihenfolge."""
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, dirs, names in os.walk(entry):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(".wav"))
+        else:
+            files.append(entry)
+    return files
+
+
+def write_file_transcript(path, output_path, segments):
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"=== Transkript von {path} ===\n\n")
+        for start, end, text in segments:
+            f.write(f"[{format_time(start)} - {format_time(end)}] {text}\n")
+
+
+def run_batch(inputs, output_dir, workers=None, model_size="base", compute_type="int8", cpu_threads=1,
+              beam_size=5, shard_duration=SHARD_DURATION, checkpoint=None, log=print):
+    """Transkribiert alle Eingaben parallel und schreibt pro Datei ein Transkript mit Zeitstempeln."""
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = checkpoint or os.path.join(output_dir, CHECKPOINT_FILE)
+    done = load_checkpoint(checkpoint)
+
+    files = collect_inputs(inputs)
+    plan = []   # (pfad, signatur, ausgabe, shards, gesamtdauer)
+    used_names = set()
+    for path in files:
+        samples, rate, _ = open_wav_memmap(path)
+        shards = find_shards(chunk_rms(samples), rate, len(samples), shard_duration)
+        name = os.path.splitext(os.path.basename(path))[0]
+        output_name, suffix = name, 2
+        while output_name in used_names:
+            output_name, suffix = f"{name}_{suffix}", suffix + 1
+        used_names.add(output_name)
+        plan.append((path, file_signature(path), os.path.join(output_dir, output_name + ".txt"),
+                     shards, len(samples) / rate))
+        del samples
+
+    total_audio = sum(entry[4] for entry in plan)
+    pending = [(index, path, signature, start, end)
+               for index, (path, signature, _, shards, _) in enumerate(plan)
+               for start, end in shards if (signature, start, end) not in done]
+    log(f"{len(files)} Dateien, {total_audio/60:.1f} min Audio, "
+        f"{sum(len(entry[3]) for entry in plan)} Shards ({len(pending)} offen), {workers} Prozesse")
+
+    options = dict(language="de", beam_size=beam_size, vad_filter=True,
+                   vad_parameters=dict(min_silence_duration_ms=500))
+    start_time = time.perf_counter()
+    remaining = {index: sum((sig, s, e) not in done for s, e in shards)
+                 for index, (_, sig, _, shards, _) in enumerate(plan)}
+
+    def finish_file(index):
+        path, signature, output_path, shards, _ = plan[index]
+        segments = [segment for start, end in shards for segment in done[(signature, start, end)]]
+        write_file_transcript(path, output_path, segments)
+        log(f"✓ {path} -> {output_path} ({len(segments)} Segmente)")
+
+    for index, count in remaining.items():
+        if count == 0:
+            finish_file(index)
+
+    if pending:
+        context = multiprocessing.get_context("spawn")
+        with open(checkpoint, "a", encoding="utf-8") as checkpoint_file, \
+                ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                    initargs=(model_size, compute_type, cpu_threads, options)) as pool:
+            futures = {pool.submit(transcribe_shard, path, start, end): (index, signature, start, end)
+                       for index, path, signature, start, end in pending}
+            for future in as_completed(futures):
+                index, signature, start, end = futures[future]
+                segments = future.result()
+                done[(signature, start, end)] = segments
+                # Checkpoint sofort festschreiben, damit ein Absturz nur laufende Shards kostet
+                checkpoint_file.write(json.dumps({"file": signature, "start": start, "end": end,
+                                                  "segments": segments}, ensure_ascii=False) + "\n")
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    finish_file(index)
+
+    wall_time = time.perf_counter() - start_time
+    log(f"Fertig in {wall_time:.1f}s ({total_audio / wall_time if wall_time else 0:.1f} Audio-Sekunden pro Sekunde)")
+    return wall_time, total_audio
+
+
+def main():
+    import stt # Nur für Standardwerte und das Autotuner-Profil
+
+    model_size, _, compute_type = stt.MODEL_CONFIGS[0]
+    parser = argparse.ArgumentParser(description="Transkribiert WAV-Archive offline mit einem Prozess-Pool")
+    parser.add_argument("inputs", nargs="+", help="WAV-Dateien oder Verzeichnisse")
+    parser.add_argument("--output-dir", default="transcripts", help="Zielverzeichnis für die Transkripte")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--model", default=model_size)
+    parser.add_argument("--compute-type", default=compute_type)
+    parser.add_argument("--cpu-threads", type=int, default=1, help="Threads pro Prozess (1 skaliert am besten)")
+    parser.add_argument("--beam-size", type=int, default=stt.BEAM_SIZE)
+    parser.add_argument("--shard-duration", type=float, default=SHARD_DURATION, help="Sekunden pro Shard")
+    parser.add_argument("--checkpoint", default=None, help=f"Checkpoint-Datei (Standard: <output-dir>/{CHECKPOINT_FILE})")
+    args = parser.parse_args()
+
+    run_batch(args.inputs, args.output_dir, args.workers, args.model, args.compute_type, args.cpu_threads,
+              args.beam_size, args.shard_duration, args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+import stt
+from audio_source import WavFileSource
+
+
+def latency_summary(values):
+    """Perzentile einer Liste von Latenzen in Sekunden."""
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    data = np.asarray(values)
+    return {
+        "count": len(values),
+        "p50": float(np.percentile(data, 50)),
+        "p95": float(np.percentile(data, 95)),
+        "p99": float(np.percentile(data, 99)),
+        "max": float(data.max()),
+    }
+
+
+def transcription_threads(workers, batch=1, batch_wait=None):
+    """Threads der Transkription (noch nicht gestartet): Batch-Inferenz bei batch > 1, sonst workers Worker."""
+    if batch > 1:
+        engine = stt.BatchInferenceEngine(stt.utterance_queue, stt.run_inference_batch, stt.deliver_batch_result,
+                                          max_batch_size=batch, log=stt.debug_print,
+                                          max_wait=stt.INFERENCE_BATCH_WAIT if batch_wait is None else batch_wait)
+        stt.batch_engine = engine
+        return [threading.Thread(target=engine.run, name="Batch-Inferenz", daemon=True)]
+    return [threading.Thread(target=stt.transcribe_audio, name=f"Transkription-{index + 1}", daemon=True)
+            for index in range(workers)]
+
+
+def run_benchmark(wav_path, speed=0, loop=1, policy="block", workers=None, batch=1, batch_wait=None,
+                  transcript_file="bench_output.txt", debug=False):
+    """Spielt eine WAV-Datei durch die komplette Pipeline und gibt die Messwerte als dict zurück.
+
+    Mit batch > 1 rechnet die Batch-Inferenz statt der Transkriptions-Threads.
+    """
+    stt.DEBUG = debug
+    stt.TRANSCRIPT_FILE = transcript_file
+    stt.TRANSCRIPT_JSONL_FILE = None
+    stt.TRANSCRIPT_STORE_FILE = None
+    stt.utterance_queue.policy = policy
+    workers = workers or stt.TRANSCRIPTION_WORKERS
+    stt.model_manager.model_kwargs["num_workers"] = workers
+    stt.configure_ring_buffer(workers, batch)
+    stt.initialize_transcript_file()
+
+    # Modell vorab laden - die Ladezeit ist nicht Teil der Pipeline-Messung
+    stt.model_manager.get()
+
+    source = WavFileSource(wav_path, speed=speed, loop=loop)
+    latencies = []
+    dropped_windows = 0
+    lines = 0
+
+    def on_text(text, audio_end):
+        nonlocal dropped_windows, lines
+        emitted = time.perf_counter()
+        lines += 1
+        if audio_end is None:
+            dropped_windows += 1 # Hinweiszeile für verworfenes oder überschriebenes Audio
+            return
+        captured = source.capture_time(int(round(audio_end * stt.RATE)))
+        if captured is not None:
+            latencies.append(emitted - captured)
+
+    stt.transcript_listeners.append(on_text)
+    threads = transcription_threads(workers, batch, batch_wait)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for thread in threads:
+        thread.start()
+    try:
+        stt.record_audio(source)
+        stt.utterance_queue.close()
+        for thread in threads:
+            thread.join()
+        stt.flush_transcript()
+    finally:
+        stt.transcript_listeners.remove(on_text)
+        stt.close_transcript_file()
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    audio_seconds = source.audio_time
+    size, device, compute_type = stt.model_manager.config
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": {"platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "input": {"file": wav_path, "speed": speed, "loop": loop, "audio_seconds": audio_seconds},
+        "config": {
+            "model": size, "device": device, "compute_type": compute_type,
+            "beam_size": stt.BEAM_SIZE, "cpu_threads": stt.CPU_THREADS,
+            "workers": workers, "policy": policy, "batch": batch,
+            "max_utterance_seconds": stt.BUFFER_DURATION, "overlap_seconds": stt.OVERLAP_DURATION,
+        },
+        "model_load_seconds": stt.model_manager.load_time,
+        "wall_seconds": wall_time,
+        "real_time_factor": wall_time / audio_seconds if audio_seconds else None,
+        "audio_seconds_per_second": audio_seconds / wall_time if wall_time else None,
+        "cpu_seconds_per_audio_second": cpu_time / audio_seconds if audio_seconds else None,
+        "latency_seconds": latency_summary(latencies),
+        "transcript_lines": lines,
+        "dropped_windows": dropped_windows,
+        "coalesced_windows": stt.utterance_queue.coalesced,
+        "queue_high_watermark": stt.utterance_queue.high_watermark,
+        "ring_overflows": stt.speaker_streams[0].audio_buffer.overflows,
+        "ring_underruns": stt.speaker_streams[0].audio_buffer.underruns,
+        "scheduler": stt.scheduler.stats(),
+        "batching": stt.batch_engine.stats() if batch > 1 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der STT-Pipeline mit WAV-Wiedergabe statt Mikrofon")
+    parser.add_argument("wav", nargs="?", default="test_recording.wav", help="WAV-Datei (16 kHz, mono, 16 bit)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Wiedergabe-Geschwindigkeit: 1 = Echtzeit, 10 = zehnfach, 0 = so schnell wie möglich")
+    parser.add_argument("--loop", type=int, default=1, help="Datei mehrfach hintereinander abspielen")
+    parser.add_argument("--policy", default="block", choices=["block", "drop_oldest", "coalesce"],
+                        help="Überlast-Strategie der Warteschlange")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Transkriptions-Threads")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="Bis zu N wartende Fenster gebündelt rechnen (1 = Transkriptions-Threads)")
+    parser.add_argument("--batch-wait", type=float, default=None,
+                        help="Sekunden, die ein Batch nach dem ersten Fenster auf weitere wartet")
+    parser.add_argument("--transcript", default="bench_output.txt", help="Transkript-Datei des Benchmarks")
+    parser.add_argument("--output", help="JSON-Ergebnis in diese Datei schreiben (Standard: stdout)")
+    parser.add_argument("--debug", action="store_true", help="Debug-Ausgaben der Pipeline anzeigen")
+    args = parser.parse_args()
+
+    # Pipeline-Ausgaben nach stderr, damit stdout nur das JSON enthält
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_benchmark(args.wav, speed=args.speed, loop=args.loop, policy=args.policy,
+                               workers=args.workers, batch=args.batch, batch_wait=args.batch_wait,
+                               transcript_file=args.transcript, debug=args.debug)
+    report = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"Ergebnis gespeichert in '{args.output}'")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
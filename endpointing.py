@@ -0,0 +1,95 @@
+from collections import namedtuple
+
+# Eine fertige Äußerung als halboffenes Sample-Intervall [start_sample, end_sample) eines Sprechers (stream)
+Utterance = namedtuple("Utterance", ["start_sample", "end_sample", "forced", "stream"], defaults=(0,))
+
+
+class UtteranceEndpointer:
+    """Streaming-Endpunkterkennung auf Basis des RMS pro Chunk.
+
+    Sprache beginnt, wenn der RMS für min_speech Samples über speech_threshold liegt,
+    und endet erst, wenn er für hangover Samples unter silence_threshold bleibt (Hysterese).
+    Äußerungen, die max_utterance Samples erreichen, werden an der leisesten Stelle
+    der letzten cut_search Samples geschnitten, damit keine halben Wörter entstehen.
+    """
+
+    def __init__(self, silence_threshold, speech_threshold, hangover, min_speech,
+                 max_utterance, pre_roll=0, cut_search=0):
+        self.silence_threshold = silence_threshold
+        self.speech_threshold = max(speech_threshold, silence_threshold)
+        self.hangover = int(hangover)
+        self.min_speech = int(min_speech)
+        self.max_utterance = int(max_utterance)
+        self.pre_roll = int(pre_roll)
+        self.cut_search = min(int(cut_search), self.max_utterance // 2)
+        self.reset()
+
+    def reset(self):
+        """Setzt den Detektor auf Stille zurück."""
+        self.in_speech = False
+        self._last_sample = 0
+        self._candidate_start = None   # Beginn möglicher Sprache vor Erreichen von min_speech
+        self._utterance_start = 0
+        self._last_voiced = 0          # Ende des letzten Chunks über silence_threshold
+        self._cut_sample = None        # Leiseste Stelle im Suchbereich vor max_utterance
+        self._cut_rms = None
+
+    @property
+    def open_start(self):
+        """Frühestes Sample, bei dem eine noch nicht ausgegebene Äußerung beginnen kann."""
+        if self.in_speech:
+            return self._utterance_start
+        if self._candidate_start is not None:
+            return max(0, self._candidate_start - self.pre_roll)
+        return max(0, self._last_sample - self.pre_roll)
+
+    def process(self, rms, end_sample):
+        """Verarbeitet einen Chunk, der bei end_sample endet. Gibt eine fertige Utterance oder None zurück."""
+        start_sample = self._last_sample
+        self._last_sample = end_sample
+
+        if not self.in_speech:
+            if rms < self.speech_threshold:
+                self._candidate_start = None
+                return None
+            if self._candidate_start is None:
+                self._candidate_start = start_sample
+            if end_sample - self._candidate_start < self.min_speech:
+                return None
+            # Sprache bestätigt - Vorlauf mitnehmen, damit der Wortanfang nicht fehlt
+            self.in_speech = True
+            self._utterance_start = max(0, self._candidate_start - self.pre_roll)
+            self._last_voiced = end_sample
+            self._cut_sample = None
+            self._cut_rms = None
+            self._candidate_start = None
+            return None
+
+        if rms >= self.silence_threshold:
+            self._last_voiced = end_sample
+        elif end_sample - self._last_voiced >= self.hangover:
+            # Nachlaufzeit abgelaufen: Äußerung endet nach der Stille-Pause
+            self.in_speech = False
+            return Utterance(self._utterance_start, end_sample, False)
+
+        # Schnitt spätestens vor dem Chunk, mit dem die Äußerung max_utterance überschreiten würde
+        length = end_sample - self._utterance_start + (end_sample - start_sample)
+        if length >= self.max_utterance - self.cut_search:
+            if self._cut_rms is None or rms <= self._cut_rms:
+                self._cut_rms = rms
+                self._cut_sample = end_sample
+        if length > self.max_utterance:
+            cut = self._cut_sample if self._cut_sample is not None else end_sample
+            utterance = Utterance(self._utterance_start, cut, True)
+            self._utterance_start = cut
+            self._cut_sample = None
+            self._cut_rms = None
+            return utterance
+        return None
+
+    def flush(self):
+        """Beendet eine laufende Äußerung sofort (z.B. beim Programmende)."""
+        if not self.in_speech:
+            return None
+        self.in_speech = False
+        return Utterance(self._utterance_start, self._last_sample, True)
@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+
+
+class StreamingMelExtractor:
+    """Berechnet Whisper-log-Mel-Frames fortlaufend während der Aufnahme.
+
+    Frame k ist (wie bei Whisper mit center=True) auf Sample k * hop_length zentriert und wird
+    berechnet, sobald die Aufnahme n_fft/2 Samples darüber hinaus ist. Die Frames liegen als
+    log10-Mel ohne fensterabhängige Normalisierung in einem Ring, der wie der Audio-Ringpuffer über
+    den Sample-Zähler adressiert wird. Pro Chunk kosten nur die neuen Frames Rechenzeit, ein Fenster
+    wird beim Transkribieren nur noch zusammengesetzt und normalisiert.
+    """
+
+    def __init__(self, mel_filters, capacity_frames, n_fft=400, hop_length=160):
+        self.mel_filters = np.asarray(mel_filters, dtype=np.float32)
+        self.n_mels = self.mel_filters.shape[0]
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.capacity = int(capacity_frames)
+        self._window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+        self._frames = np.zeros((self.n_mels, self.capacity), dtype=np.float32)
+        self._ready = 0   # Anzahl fertiger Frames (monoton steigend, wird zuletzt erhöht)
+        # Noch nicht verbrauchte Samples ab dem Beginn des nächsten Frames (vor Sample 0: Stille)
+        self._pending = np.zeros(n_fft // 2, dtype=np.float32)
+
+    @property
+    def frames_ready(self):
+        return self._ready
+
+    def process(self, data):
+        """Übernimmt einen Chunk (bytes oder int16-Array) und berechnet alle dadurch vollständigen Frames."""
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        pending = np.empty(len(self._pending) + len(samples), dtype=np.float32)
+        pending[:len(self._pending)] = self._pending
+        np.multiply(samples, np.float32(1.0 / 32768.0), out=pending[len(self._pending):], casting="unsafe")
+        if len(pending) < self.n_fft:
+            self._pending = pending
+            return 0
+
+        count = 1 + (len(pending) - self.n_fft) // self.hop_length
+        log_mel = self._log_mel(pending, count)
+        first = self._ready
+        positions = np.arange(first, first + count) % self.capacity
+        self._frames[:, positions] = log_mel
+        self._ready = first + count   # Erst nach dem Schreiben veröffentlichen
+        self._pending = pending[count * self.hop_length:].copy()
+        return count
+
+    def _log_mel(self, samples, count):
+        frames = np.lib.stride_tricks.as_strided(
+            samples, (count, self.n_fft), (self.hop_length * samples.strides[0], samples.strides[0]))
+        spectrum = np.fft.rfft(frames * self._window, axis=-1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        mel = self.mel_filters @ power.T
+        return np.log10(np.maximum(mel, 1e-10))
+
+    def window_features(self, start_sample, end_sample, audio):
+        """Log-Mel-Merkmale für das Fenster [start_sample, end_sample) wie FeatureExtractor(audio).
+
+        start_sample und end_sample müssen Vielfache von hop_length sein, audio enthält die
+        float32-Samples des Fensters (für die letzten Frames, die die Aufnahme noch nicht fertig hat -
+        wie bei Whisper mit Stille nach dem Fensterende). Gibt None zurück, wenn die Frames im Ring
+        bereits überschrieben sind.
+        """
+        first = start_sample // self.hop_length
+        last = end_sample // self.hop_length + 1   # Whisper liefert len/hop + 1 Frames
+        ready = self._ready
+        if first < ready - self.capacity or first > ready:
+            return None
+        cached = min(last, ready)
+        features = np.empty((self.n_mels, last - first), dtype=np.float32)
+        positions = np.arange(first, cached) % self.capacity
+        features[:, :cached - first] = self._frames[:, positions]
+        if self._ready - self.capacity > first:
+            return None # Während des Kopierens überschrieben
+
+        if cached < last:
+            # Restliche Frames aus dem Fenster-Audio, mit Stille über das Fensterende hinaus
+            offset = cached * self.hop_length - self.n_fft // 2 - start_sample
+            tail = np.zeros((last - cached - 1) * self.hop_length + self.n_fft, dtype=np.float32)
+            source = audio[max(0, offset):]
+            tail[max(0, -offset):max(0, -offset) + len(source)] = source[:len(tail) - max(0, -offset)]
+            features[:, cached - first:] = self._log_mel(tail, last - cached)
+
+        # Normalisierung wie faster_whisper.FeatureExtractor, bezogen auf das Fenster
+        np.maximum(features, features.max() - 8.0, out=features)
+        features += 4.0
+        features /= 4.0
+        return features
+
+
+class PrecomputedFeatureExtractor:
+    """Ersetzt model.feature_extractor: liefert vorbereitete Merkmale statt sie neu zu berechnen.
+
+    prepare() hinterlegt die Merkmale für den nächsten Aufruf im selben Thread - so teilen sich
+    mehrere Transkriptions-Threads ein Modell. Ohne vorbereitete Merkmale wird wie bisher gerechnet.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+
+    def prepare(self, features):
+        self._local.features = features
+
+    def __call__(self, waveform, padding=160, chunk_length=None):
+        features = getattr(self._local, "features", None)
+        self._local.features = None
+        if features is None:
+            return self.extractor(waveform, padding=padding, chunk_length=chunk_length)
+        if chunk_length is not None:
+            self.extractor.n_samples = chunk_length * self.extractor.sampling_rate
+            self.extractor.nb_max_frames = self.extractor.n_samples // self.extractor.hop_length
+        return features
@@ -0,0 +1,218 @@
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+TRACE_FRAMES = 1 # Stack-Tiefe, die tracemalloc je Allokation festhält (1 = nur die auslösende Zeile)
+
+
+def process_rss():
+    """Aktueller Arbeitsspeicher (RSS) des Prozesses in Bytes.
+
+    Ohne /proc (z.B. macOS) nur der bisherige Höchststand aus getrusage - steigt er, wächst auch der Speicher.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # macOS: Bytes, Linux/BSD: KiB
+
+
+def rss_kind():
+    """Was process_rss() hier misst: "current", "peak" (ohne /proc nur der Höchststand) oder None (gar nichts)."""
+    if os.path.exists("/proc/self/statm"):
+        return "current"
+    try:
+        import resource
+    except ImportError:
+        return None
+    return "peak"
+
+
+def thread_count():
+    """Threads des Prozesses laut Betriebssystem (inkl. nativer Threads, z.B. von CTranslate2)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return threading.active_count()
+
+
+def open_file_count():
+    """Offene Datei-Deskriptoren des Prozesses (None, wenn das System sie nicht auflistet)."""
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+def gc_stats(count_objects=False):
+    """Sammlungen je Generation, nicht freigebbare Objekte und - optional - alle vom GC verfolgten Objekte."""
+    stats = gc.get_stats()
+    result = {
+        "collections": [generation["collections"] for generation in stats],
+        "uncollectable": sum(generation["uncollectable"] for generation in stats),
+        "garbage": len(gc.garbage),
+    }
+    if count_objects:
+        result["objects"] = len(gc.get_objects()) # Kostet einige Millisekunden
+    return result
+
+
+def growth_per_hour(samples, key, start=None):
+    """Steigung (Einheiten pro Stunde) einer Größe über die Zeitachse "clock" in Sekunden, per linearer Regression.
+
+    Berücksichtigt nur Proben ab clock >= start. None bei weniger als zwei verwertbaren Proben.
+    """
+    points = [(sample["clock"], sample[key]) for sample in samples
+              if sample.get(key) is not None and (start is None or sample["clock"] >= start)]
+    if len(points) < 2 or points[-1][0] <= points[0][0]:
+        return None
+    clock, values = np.asarray(points, dtype=np.float64).T
+    return float(np.polyfit(clock / 3600.0, values, 1)[0])
+
+
+class MemoryMonitor:
+    """Hintergrund-Thread, der alle interval Sekunden Speicher, Threads, Dateien und GC-Zustand festhält.
+
+    clock() liefert die Zeitachse der Proben (Standard: Sekunden seit start(), im Soak-Test die simulierte
+    Audio-Zeit). probes ist ein dict Name -> Funktion für weitere Größen, z.B. den Füllstand der Ringpuffer.
+    Höchstens max_samples Proben werden gehalten - danach wird jede zweite verworfen und nur noch halb so
+    oft gespeichert, der Monitor wächst also selbst nicht (0 = nur die letzte Probe in latest).
+    Mit limit_bytes wird on_limit(rss) einmal je Überschreiten aufgerufen.
+    trace=True startet tracemalloc: mark() - bzw. die erste Probe ab clock >= mark_at - legt die
+    Vergleichsbasis fest, top_allocations() nennt die Zeilen, deren Speicher seitdem am stärksten gewachsen ist.
+    """
+
+    def __init__(self, interval=1.0, clock=None, probes=None, max_samples=2000, limit_bytes=0, on_limit=None,
+                 trace=False, mark_at=None, count_objects=False, log=None):
+        self.interval = interval
+        self.clock = clock
+        self.probes = probes or {}
+        self.max_samples = max_samples
+        self.limit_bytes = limit_bytes
+        self.on_limit = on_limit
+        self.trace = trace
+        self.mark_at = mark_at
+        self.count_objects = count_objects
+        self.log = log or (lambda message: None)
+        self.samples = []
+        self.latest = None
+        self.limit_exceeded = 0 # Wie oft limit_bytes überschritten wurde
+        self._stride = 1
+        self._ticks = 0
+        self._over_limit = False
+        self.marked_at = None # clock der Vergleichsbasis
+        self._baseline = None
+        self._started_tracing = False
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._started = time.monotonic()
+            if self.trace and not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._started_tracing = True
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name="Speicher-Monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Nimmt eine letzte Probe und beendet den Thread (und tracemalloc, falls er es gestartet hat)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.sample()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.log(f"FEHLER im Speicher-Monitor: {e}")
+
+    def sample(self):
+        """Nimmt eine Probe, prüft limit_bytes und gibt sie als dict zurück."""
+        clock = self.clock() if self.clock is not None else time.monotonic() - (self._started or time.monotonic())
+        sample = {
+            "clock": clock,
+            "rss_bytes": process_rss(),
+            "threads": thread_count(),
+            "open_files": open_file_count(),
+            **gc_stats(self.count_objects),
+        }
+        if tracemalloc.is_tracing():
+            sample["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+        for name, probe in self.probes.items():
+            sample[name] = probe()
+        self.latest = sample
+        if self.mark_at is not None and self._baseline is None and clock >= self.mark_at:
+            self.mark()
+        self._keep(sample)
+        self._check_limit(sample["rss_bytes"])
+        return sample
+
+    def _keep(self, sample):
+        if not self.max_samples:
+            return
+        self._ticks += 1
+        if (self._ticks - 1) % self._stride:
+            return
+        self.samples.append(sample)
+        if len(self.samples) > self.max_samples:
+            # Erste und letzte Probe bleiben erhalten, dazwischen jede zweite
+            self.samples = self.samples[:-1:2] + self.samples[-1:]
+            self._stride *= 2
+
+    def _check_limit(self, rss):
+        if not self.limit_bytes or rss is None:
+            return
+        over = rss > self.limit_bytes
+        if over and not self._over_limit:
+            self.limit_exceeded += 1
+            if self.on_limit is not None:
+                self.on_limit(rss)
+        self._over_limit = over
+
+    def mark(self):
+        """Vergleichsbasis für top_allocations() (z.B. nach der Aufwärmphase)."""
+        if tracemalloc.is_tracing():
+            self._baseline = tracemalloc.take_snapshot()
+            self.marked_at = self.latest["clock"] if self.latest else None
+
+    def top_allocations(self, limit=10):
+        """Zeilen mit dem stärksten Speicherzuwachs seit mark(): [{"location", "size_bytes", "count"}]."""
+        if not tracemalloc.is_tracing():
+            return []
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        if self._baseline is None:
+            statistics = snapshot.statistics("lineno")
+            return [{"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                    for stat in statistics[:limit]]
+        statistics = snapshot.compare_to(self._baseline.filter_traces(filters), "lineno")
+        return [{"location": str(stat.traceback), "size_bytes": stat.size_diff, "count": stat.count_diff}
+                for stat in statistics[:limit]]
@@ -0,0 +1,377 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Grenzen der Histogramm-Buckets: Zeiten in Sekunden (Chunk-Lesen bis Transkription) und Verhältnisse (Echtzeitfaktor)
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+class Metric:
+    """Basis für Zähler, Messwerte und Histogramme mit optionalen Labels.
+
+    Werte werden über die Label-Werte adressiert, z.B. counter.inc(speaker="Anna"). Statt Werte zu
+    setzen, kann callback() sie beim Auslesen liefern - eine Zahl oder {(Label-Werte, ...): Zahl}.
+    So kostet z.B. der Füllstand einer Warteschlange im laufenden Betrieb gar nichts.
+    """
+
+    kind = None
+
+    def __init__(self, name, help, labelnames=(), callback=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+    def value(self, **labels):
+        if self.callback is not None:
+            values = self._collect()
+            return values.get(self._key(labels), 0.0)
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def remove(self, **labels):
+        """Verwirft die Werte einer Label-Kombination, z.B. eines beendeten Sprechers."""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def _collect(self):
+        """Aktuelle Werte als {Label-Werte: Zahl}."""
+        if self.callback is None:
+            with self._lock:
+                values = dict(self._values)
+            if not self.labelnames and not values:
+                values[()] = 0 # Ohne Labels gibt es den Wert immer, auch vor der ersten Änderung
+            return values
+        values = self.callback()
+        if isinstance(values, dict):
+            return {tuple(str(part) for part in key): value for key, value in values.items()}
+        return {(): values}
+
+    def samples(self):
+        """Gibt [(Name, Labels, Wert)] für den Export zurück."""
+        return [(self.name, self._labels(key), value) for key, value in sorted(self._collect().items())]
+
+    def snapshot(self):
+        values = self._collect()
+        if not self.labelnames:
+            return values.get((), 0.0)
+        return {",".join(key): value for key, value in sorted(values.items())}
+
+
+class Counter(Metric):
+    """Monoton steigender Zähler."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Momentanwert, der steigen und fallen kann."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Verteilung von Messwerten in festen Buckets (kumulativ exportiert, wie Prometheus es erwartet)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=TIME_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [Anzahl je Bucket (+Inf zuletzt), Summe, Anzahl, Maximum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, -math.inf]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+            state[3] = max(state[3], value)
+
+    def _state(self, labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return None if state is None else [list(state[0]), *state[1:]]
+
+    def count(self, **labels):
+        state = self._state(labels)
+        return state[2] if state else 0
+
+    def quantile(self, q, **labels):
+        """Schätzt das q-Quantil aus den Buckets (linear innerhalb des Buckets, wie histogram_quantile)."""
+        state = self._state(labels)
+        if not state or not state[2]:
+            return None
+        return self._quantile(state, q)
+
+    def _quantile(self, state, q):
+        counts, _, total, maximum = state
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                return min(maximum, lower + (upper - lower) * (rank - cumulative) / count)
+            cumulative += count
+        return maximum
+
+    def samples(self):
+        with self._lock:
+            states = sorted((key, [list(state[0]), *state[1:]]) for key, state in self._values.items())
+        samples = []
+        for key, (counts, total, count, _) in states:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((self.name + "_bucket", {**labels, "le": format_value(bound)}, cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, count))
+        return samples
+
+    def snapshot(self):
+        with self._lock:
+            states = {key: [list(state[0]), *state[1:]] for key, state in self._values.items()}
+        summaries = {}
+        for key, state in sorted(states.items()):
+            summaries[",".join(key)] = {
+                "count": state[2],
+                "mean": state[1] / state[2],
+                "p50": self._quantile(state, 0.5),
+                "p95": self._quantile(state, 0.95),
+                "max": state[3],
+            }
+        if not self.labelnames:
+            return summaries.get("", {"count": 0})
+        return summaries
+
+
+class MetricsRegistry:
+    """Sammlung aller Metriken, exportierbar als Prometheus-Text oder JSON-Schnappschuss."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metrik '{name}' ist bereits als {metric.kind} registriert")
+            elif kwargs.get("callback") is not None:
+                metric.callback = kwargs["callback"]
+            return metric
+
+    def counter(self, name, help, labelnames=(), callback=None):
+        return self._register(Counter, name, help, labelnames, callback=callback)
+
+    def gauge(self, name, help, labelnames=(), callback=None):
+        return self._register(Gauge, name, help, labelnames, callback=callback)
+
+    def histogram(self, name, help, labelnames=(), buckets=TIME_BUCKETS):
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+    def render(self):
+        """Prometheus-Textformat (Version 0.0.4)."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Alle Metriken als dict - Histogramme als Anzahl, Mittelwert, p50, p95 und Maximum."""
+        return {"time": time.time(), "metrics": {metric.name: metric.snapshot() for metric in self.metrics()}}
+
+
+class TimedLock:
+    """Lock-Ersatz, der die Wartezeit bis zum Erwerb und die Haltezeit in Histogramme schreibt.
+
+    Nicht reentrant - taugt auch als Lock einer threading.Condition.
+    """
+
+    def __init__(self, name, wait_histogram, hold_histogram, lock=None):
+        self.name = name
+        self.wait_histogram = wait_histogram
+        self.hold_histogram = hold_histogram
+        self._lock = lock or threading.Lock()
+        self._acquired = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        started = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired = time.perf_counter()
+            self.wait_histogram.observe(self._acquired - started, lock=self.name)
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self._acquired
+        self._lock.release()
+        self.hold_histogram.observe(held, lock=self.name)
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class CallTimer:
+    """Ersetzt eine Methode (z.B. model.encode) und summiert ihre Laufzeit je Thread.
+
+    take() gibt die seit dem letzten Aufruf im selben Thread verbrauchte Zeit zurück - so teilen sich
+    mehrere Transkriptions-Threads ein Modell.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self._local = threading.local()
+
+    def __call__(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            self._local.seconds = getattr(self._local, "seconds", 0.0) + time.perf_counter() - started
+
+    def take(self):
+        seconds = getattr(self._local, "seconds", 0.0)
+        self._local.seconds = 0.0
+        return seconds
+
+
+def start_http_server(registry, port, host="127.0.0.1"):
+    """Stellt /metrics (Prometheus-Text) und /metrics.json in einem Hintergrund-Thread bereit.
+
+    Standardmäßig nur auf localhost. Gibt den Server zurück (server.shutdown() beendet ihn).
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body = registry.render().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Kein Zugriffsprotokoll auf stderr
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="Metriken-HTTP", daemon=True).start()
+    return server
+
+
+class SnapshotWriter:
+    """Schreibt alle interval Sekunden einen JSON-Schnappschuss der Metriken (atomar ersetzt)."""
+
+    def __init__(self, registry, path, interval=10.0, log=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.log = log or (lambda message: None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="Metriken-Schnappschuss", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        temporary = self.path + ".tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self.registry.snapshot(), f, indent=2)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self.log(f"Metriken konnten nicht geschrieben werden: {e}")
+
+    def close(self):
+        """Beendet den Thread und schreibt einen letzten Schnappschuss."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
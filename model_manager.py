@@ -0,0 +1,85 @@
+import threading
+import time
+import numpy as np
+
+
+def load_whisper_model(size, device, compute_type, **kwargs):
+    """Lädt ein faster-whisper Modell. Der Import erfolgt erst hier, damit Programmstart und Imports schnell bleiben."""
+    from faster_whisper import WhisperModel
+    return WhisperModel(size, device=device, compute_type=compute_type, **kwargs)
+
+
+class ModelManager:
+    """Lädt das Whisper-Modell verzögert oder im Hintergrund, inklusive Aufwärm-Durchlauf.
+
+    configs ist eine Liste von (size, device, compute_type), die der Reihe nach probiert wird.
+    get() blockiert, bis ein Modell bereit ist, und lädt es bei Bedarf selbst (lazy).
+    Schlägt jede Konfiguration fehl, wirft get() einen RuntimeError statt den Prozess zu beenden.
+    """
+
+    def __init__(self, configs, model_kwargs=None, warmup_samples=8000, loader=load_whisper_model, log=None):
+        self.configs = list(configs)
+        self.model_kwargs = model_kwargs or {}
+        self.warmup_samples = warmup_samples
+        self.loader = loader
+        self.log = log or (lambda message: None)
+        self.model = None
+        self.config = None
+        self.error = None
+        self.load_time = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Startet das Laden in einem Hintergrund-Thread und kehrt sofort zurück."""
+        with self._lock:
+            if self._thread is None and not self._ready.is_set():
+                self._thread = threading.Thread(target=self._load, name="Modell-Laden", daemon=True)
+                self._thread.start()
+        return self
+
+    def get(self, timeout=None):
+        """Gibt das geladene Modell zurück und wartet bei Bedarf auf das Laden."""
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Modell wurde nicht rechtzeitig geladen")
+        if self.model is None:
+            raise RuntimeError(f"Kein Modell konnte geladen werden: {self.error}")
+        return self.model
+
+    def _load(self):
+        start_time = time.perf_counter()
+        try:
+            for size, device, compute_type in self.configs:
+                self.log(f"Lade Whisper-Modell ({size}/{device}/{compute_type})...")
+                try:
+                    model = self.loader(size, device, compute_type, **self.model_kwargs)
+                except Exception as e:
+                    self.log(f"FEHLER beim Laden des Modells {size}/{device}/{compute_type}: {e}")
+                    self.error = e
+                    continue
+                self._warm_up(model)
+                self.model = model
+                self.config = (size, device, compute_type)
+                self.error = None
+                self.load_time = time.perf_counter() - start_time
+                self.log(f"✓ Whisper-Modell bereit ({size}/{device}/{compute_type}) nach {self.load_time:.2f}s")
+                return
+            self.log(f"KRITISCHER FEHLER: Kein Modell konnte geladen werden: {self.error}")
+        finally:
+            self._ready.set()
+
+    def _warm_up(self, model):
+        """Einmaliger Durchlauf auf kurzer Stille, damit das erste echte Fenster keine Initialisierung bezahlt."""
+        if not self.warmup_samples:
+            return
+        try:
+            segments, _ = model.transcribe(np.zeros(self.warmup_samples, dtype=np.float32), language="de", beam_size=1)
+            list(segments)
+        except Exception as e:
+            self.log(f"Aufwärm-Durchlauf fehlgeschlagen (wird ignoriert): {e}")
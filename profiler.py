@@ -0,0 +1,94 @@
+import collections
+import contextlib
+import os
+import sys
+import threading
+
+SAMPLE_INTERVAL = 0.005 # Sekunden zwischen zwei Stichproben
+MAX_DEPTH = 64 # Tiefste Stack-Ebenen, die je Stichprobe festgehalten werden
+
+
+class SamplingProfiler:
+    """Stichproben-Profiler nur für ausgewählte Abschnitte, z.B. den Aufruf von model.transcribe.
+
+    Ein Hintergrund-Thread liest alle interval Sekunden die Python-Stacks der Threads, die sich gerade
+    in section() befinden - der übrige Code läuft ungestört und ohne Tracing-Overhead. Zeit in
+    nativem Code (CTranslate2) zählt für die Python-Zeile, die ihn aufgerufen hat.
+    Das Ergebnis sind gefaltete Stacks ("a;b;c Anzahl"), lesbar mit flamegraph.pl oder speedscope.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, max_depth=MAX_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._active = collections.Counter() # Thread-Id -> Anzahl offener section()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @contextlib.contextmanager
+    def section(self):
+        """Stichproben des aktuellen Threads, solange der Block läuft."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[ident] -= 1
+                if not self._active[ident]:
+                    del self._active[ident]
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = [ident for ident in self._active if ident != own]
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            stacks = [self._stack(frames[ident]) for ident in idents if ident in frames]
+            with self._lock:
+                for stack in stacks:
+                    self.stacks[stack] += 1
+                self.samples += len(stacks)
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self):
+        """Gefaltete Stacks, häufigste zuerst."""
+        with self._lock:
+            return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def top(self, limit=10):
+        """Funktionen, in denen die Stichproben endeten: [(Funktion, Anteil)]."""
+        leaves = collections.Counter()
+        with self._lock:
+            for stack, count in self.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            samples = self.samples
+        return [(name, count / samples) for name, count in leaves.most_common(limit)]
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
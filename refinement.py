@@ -0,0 +1,84 @@
+import os
+import threading
+from collections import namedtuple
+
+from work_queue import BoundedWorkQueue, DROP_OLDEST
+
+# Eine bereits ausgegebene Entwurfszeile: Zeilen-Id, Zeitbereich der Wörter und das Audio (int16)
+# ab audio_start Sekunden, dazu Entwurfstext, Prompt zum Zeitpunkt des Entwurfs und Sprecher
+RefinementJob = namedtuple("RefinementJob", ["line_id", "start", "end", "audio_start", "audio", "draft", "prompt",
+                                             "stream"], defaults=(0,))
+
+
+class Refiner:
+    """Hintergrund-Stufe, die Entwurfszeilen mit einem größeren Modell erneut dekodiert.
+
+    Läuft in einem eigenen Thread mit niedrigster Priorität (nice 19, auch für die Threads des dort
+    geladenen Modells) und beginnt einen Auftrag nur, wenn is_idle() meldet, dass die Live-Stufe
+    nichts zu tun hat. Ist die Warteschlange voll, fällt der älteste Auftrag weg - dessen Entwurf bleibt.
+    on_done(job) meldet jeden erledigten Auftrag, auch fehlgeschlagene und verworfene.
+    """
+
+    def __init__(self, refine, is_idle, maxsize=50, idle_poll=0.1, on_done=None, log=None):
+        self.refine = refine
+        self.is_idle = is_idle
+        self.on_done = on_done or (lambda job: None)
+        self.idle_poll = idle_poll
+        self.log = log or (lambda message: None)
+        self.queue = BoundedWorkQueue(maxsize, DROP_OLDEST, on_drop=self._dropped)
+        self.refined = 0
+        self.unchanged = 0
+        self.failed = 0
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Überarbeitung", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, job):
+        self.queue.put(job)
+
+    def close(self, timeout=None):
+        """Nimmt keine Aufträge mehr an und arbeitet die wartenden höchstens timeout Sekunden lang ab.
+
+        Danach endet der Thread nach dem laufenden Auftrag, übrige Zeilen bleiben Entwurf.
+        """
+        self.queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._stopped.set()
+
+    def _dropped(self, seq, job):
+        self.log(f"Überarbeitung von Zeile {job.line_id} verworfen - Warteschlange voll, Entwurf bleibt")
+        self.on_done(job)
+
+    def _lower_priority(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError) as e:
+            self.log(f"Priorität der Überarbeitung konnte nicht gesenkt werden: {e}")
+
+    def _run(self):
+        # Unter Linux gilt nice pro Thread und wird an später gestartete Threads (Modell-Laden) vererbt
+        self._lower_priority()
+        while not self._stopped.is_set():
+            job = self.queue.get()
+            if job is None:
+                break
+            _, job = job
+            while not self.is_idle():
+                if self._stopped.wait(self.idle_poll):
+                    return
+            try:
+                if self.refine(job):
+                    self.refined += 1
+                else:
+                    self.unchanged += 1
+            except Exception as e:
+                self.failed += 1
+                self.log(f"FEHLER bei der Überarbeitung von Zeile {job.line_id}: {e}")
+            finally:
+                self.on_done(job)
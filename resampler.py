@@ -0,0 +1,127 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+ZERO_CROSSINGS = 16 # Nulldurchgänge des Sinc je Seite - mehr = steilere Flanke, mehr Rechenaufwand
+ROLLOFF = 0.94 # Grenzfrequenz relativ zur kleineren Nyquist-Frequenz
+KAISER_BETA = 8.6 # ~80 dB Sperrdämpfung
+
+
+def polyphase_filter(up, down, zero_crossings=ZERO_CROSSINGS, rolloff=ROLLOFF, beta=KAISER_BETA):
+    """Tiefpass (Kaiser-gefenstertes Sinc) für up/down, zerlegt in up Phasen.
+
+    Gibt eine (up, taps) Matrix zurück - Zeile p enthält die Koeffizienten für Ausgaben mit Phase p,
+    Spalte k gehört zum Eingangs-Sample i - k.
+    """
+    cutoff = rolloff / max(up, down)
+    half_width = zero_crossings * max(up, down)
+    length = 2 * half_width + 1
+    taps = -(-length // up)
+    n = np.arange(taps * up) - half_width
+    prototype = up * cutoff * np.sinc(cutoff * n)
+    window = np.zeros(taps * up)
+    window[:length] = np.kaiser(length, beta)
+    return (prototype * window).reshape(taps, up).T.astype(np.float32)
+
+
+class StreamingResampler:
+    """Polyphasen-Resampler für Blöcke beliebiger Größe, z.B. 48 kHz oder 44,1 kHz -> 16 kHz.
+
+    Das Verhältnis wird exakt gekürzt (44100 -> 16000 = 160/441). Die letzten Eingangs-Samples und die
+    Phase bleiben zwischen den Blöcken erhalten - das Ergebnis ist Sample für Sample dasselbe wie bei
+    einem Durchlauf am Stück, ohne Artefakte an den Blockgrenzen. Die Verzögerung beträgt
+    zero_crossings Perioden der niedrigeren Rate (bei 16 kHz 1 ms).
+    Eingabe und Ausgabe sind float32-Arrays der Form (frames, channels).
+    """
+
+    def __init__(self, input_rate, output_rate, channels=1, zero_crossings=ZERO_CROSSINGS):
+        divisor = math.gcd(int(input_rate), int(output_rate))
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.channels = channels
+        self.up = int(output_rate) // divisor
+        self.down = int(input_rate) // divisor
+        # Spalten umgedreht: passt direkt auf ein Fenster aufsteigender Eingangs-Samples
+        self.filters = np.ascontiguousarray(polyphase_filter(self.up, self.down, zero_crossings)[:, ::-1])
+        self.taps = self.filters.shape[1]
+        self._history = np.zeros((self.taps - 1, channels), dtype=np.float32)
+        self._position = (self.taps - 1) * self.up   # Nächste Ausgabe in 1/up Eingangs-Samples ab _history[0]
+
+    def process(self, frames):
+        """Resampelt einen Block (frames, channels) und gibt alle damit fertigen Ausgabe-Samples zurück."""
+        buffer = np.concatenate([self._history, np.asarray(frames, dtype=np.float32).reshape(-1, self.channels)])
+        end = len(buffer) * self.up
+        count = max(0, -(-(end - self._position) // self.down))
+        positions = self._position + self.down * np.arange(count)
+        starts = positions // self.up - (self.taps - 1)
+        phases = positions % self.up
+        # Fenster als Sicht, ein Gather pro Ausgabe-Sample, Skalarprodukt über alle Taps vektorisiert
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps, axis=0)[starts]
+        output = np.einsum("nk,nck->nc", self.filters[phases], windows)
+
+        consumed = len(buffer) - (self.taps - 1)
+        self._position += count * self.down - consumed * self.up
+        self._history = buffer[consumed:].copy()
+        return output
+
+
+def downmix(frames):
+    """Mittelt alle Kanäle (frames, channels) zu Mono (frames, 1) in float32."""
+    return frames.mean(axis=1, dtype=np.float32, keepdims=True)
+
+
+class InputConverter:
+    """Wandelt int16-Bytes einer Quelle (native Rate und Kanäle) in int16-Frames mit output_rate.
+
+    Mit mix=True werden alle Kanäle zu Mono gemischt, sonst bleibt jeder Kanal einzeln erhalten.
+    """
+
+    def __init__(self, input_rate, input_channels, output_rate, mix=True):
+        self.input_channels = input_channels
+        self.mix = mix and input_channels > 1
+        self.output_channels = 1 if self.mix else input_channels
+        self.resampler = None
+        if input_rate != output_rate:
+            self.resampler = StreamingResampler(input_rate, output_rate, self.output_channels)
+
+    def process(self, data):
+        """Gibt die umgewandelten Samples als int16-Array (frames, Kanäle) zurück."""
+        frames = np.frombuffer(data, dtype=np.int16).reshape(-1, self.input_channels)
+        if self.mix:
+            frames = downmix(frames)
+        if self.resampler is not None:
+            frames = self.resampler.process(frames)
+        if frames.dtype == np.int16:
+            return frames
+        return np.clip(np.rint(frames), -32768, 32767).astype(np.int16)
+
+
+def benchmark(input_rate, channels, output_rate=16000, seconds=60.0, chunk_duration=0.064):
+    """CPU-Sekunden pro Audio-Sekunde für Mischen und Resampeln in Blöcken wie bei der Aufnahme."""
+    rng = np.random.default_rng(0)
+    chunk = int(input_rate * chunk_duration)
+    data = (rng.standard_normal((chunk, channels)) * 3000).astype(np.int16).tobytes()
+    converter = InputConverter(input_rate, channels, output_rate)
+    chunks = int(seconds / chunk_duration)
+    start_time = time.process_time()
+    for _ in range(chunks):
+        converter.process(data)
+    return (time.process_time() - start_time) / (chunks * chunk_duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Misst die CPU-Kosten des Resamplers")
+    parser.add_argument("--rates", default="44100,48000,96000", help="Eingangs-Raten")
+    parser.add_argument("--channels", default="1,2", help="Kanal-Anzahlen")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Sekunden Audio pro Messung")
+    args = parser.parse_args()
+    for rate in (int(rate) for rate in args.rates.split(",")):
+        for channels in (int(channels) for channels in args.channels.split(",")):
+            cost = benchmark(rate, channels, seconds=args.seconds)
+            print(f"{rate:>6} Hz, {channels} Kanal/Kanäle -> 16 kHz mono: {cost * 100:.2f}% eines Kerns")
+
+
+if __name__ == "__main__":
+    main()
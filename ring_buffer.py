@@ -0,0 +1,120 @@
+import threading
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Ringpuffer fester Größe für Audio-Samples, adressiert über einen fortlaufenden Sample-Zähler.
+
+    Der Aufnahme-Thread schreibt direkt in ein vorab reserviertes Array, Leser holen
+    sich beliebige Fenster [start_sample, end_sample) als View oder als eine einzige Kopie.
+    Das Lock schützt nur die Index-Verwaltung, nie das Kopieren der Daten.
+    """
+
+    def __init__(self, capacity, dtype=np.int16, lock=None):
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.zeros(self.capacity, dtype=self.dtype)
+        self._write_pos = 0      # Anzahl vollständig geschriebener Samples (monoton steigend)
+        self._reserved_pos = 0   # Ende des gerade beschriebenen Bereichs
+        self._lock = lock or threading.Lock()   # z.B. metrics.TimedLock, um Warte- und Haltezeiten zu messen
+        self.overflows = 0   # Eingangs-Überläufe der Aufnahme (von record_audio gepflegt)
+        self.underruns = 0   # Lesezugriffe auf bereits überschriebene Bereiche
+
+    @property
+    def total_written(self):
+        """Gesamtzahl der bisher geschriebenen Samples."""
+        with self._lock:
+            return self._write_pos
+
+    def available_range(self):
+        """Gibt (ältestes, neuestes) lesbares Sample als halboffenes Intervall zurück."""
+        with self._lock:
+            return max(0, self._reserved_pos - self.capacity), self._write_pos
+
+    def __len__(self):
+        oldest, newest = self.available_range()
+        return newest - oldest
+
+    def write(self, data):
+        """Schreibt Audio-Daten (bytes oder numpy-Array) in den Puffer und gibt den neuen Zähler zurück."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(data, dtype=self.dtype)
+        else:
+            samples = data
+        n = len(samples)
+        if n > self.capacity:
+            # Nur das Ende passt in den Puffer, der Rest wäre ohnehin sofort überschrieben
+            skipped = n - self.capacity
+            with self._lock:
+                self._write_pos += skipped
+                self._reserved_pos = self._write_pos
+            samples = samples[skipped:]
+            n = self.capacity
+
+        with self._lock:
+            start = self._write_pos
+            self._reserved_pos = start + n
+
+        # Kopieren außerhalb des Locks - es gibt genau einen Schreiber
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        self._buffer[offset:offset + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+
+        with self._lock:
+            self._write_pos = start + n
+            return self._write_pos
+
+    def _check_range(self, start_sample, end_sample):
+        oldest, newest = self.available_range()
+        if start_sample < oldest or end_sample > newest or start_sample > end_sample:
+            self.underruns += 1
+            raise ValueError(
+                f"Bereich [{start_sample}, {end_sample}) nicht verfügbar (Puffer hält [{oldest}, {newest}))"
+            )
+
+    def view(self, start_sample, end_sample):
+        """Gibt eine View ohne Kopie zurück, falls das Fenster nicht über das Puffer-Ende läuft, sonst None.
+
+        Die View bleibt nur gültig, solange der Schreiber den Bereich nicht überholt hat.
+        """
+        self._check_range(start_sample, end_sample)
+        offset = start_sample % self.capacity
+        length = end_sample - start_sample
+        if offset + length > self.capacity:
+            return None
+        return self._buffer[offset:offset + length]
+
+    def read(self, start_sample, end_sample, out=None, dtype=np.float32):
+        """Kopiert das Fenster [start_sample, end_sample) in ein zusammenhängendes Array.
+
+        Bei dtype=float32 wird in einem Durchgang auf [-1, 1) normalisiert, so wie Whisper es erwartet.
+        Wirft ValueError, wenn der Bereich (auch während des Kopierens) überschrieben wurde.
+        """
+        self._check_range(start_sample, end_sample)
+        length = end_sample - start_sample
+        dtype = np.dtype(dtype)
+        if out is None:
+            out = np.empty(length, dtype=dtype)
+        else:
+            out = out[:length]
+
+        offset = start_sample % self.capacity
+        first = min(length, self.capacity - offset)
+        self._copy(self._buffer[offset:offset + first], out[:first])
+        if first < length:
+            self._copy(self._buffer[:length - first], out[first:])
+
+        # Prüfen, ob der Schreiber den Bereich während des Kopierens überholt hat
+        oldest, _ = self.available_range()
+        if start_sample < oldest:
+            self.underruns += 1
+            raise ValueError(f"Bereich ab Sample {start_sample} wurde während des Lesens überschrieben")
+        return out
+
+    def _copy(self, src, dst):
+        if dst.dtype == np.float32 and src.dtype == np.int16:
+            np.multiply(src, np.float32(1.0 / 32768.0), out=dst, casting="unsafe")
+        else:
+            dst[:] = src
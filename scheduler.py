@@ -0,0 +1,103 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+# Eine Qualitätsstufe: Modell-Konfiguration (size, device, compute_type) oder None = Hauptmodell,
+# beam_size oder None = Standard-Beam
+QualityLevel = collections.namedtuple("QualityLevel", ["model_config", "beam_size"])
+
+
+def speech_fraction(audio, threshold, chunk_size=1024):
+    """Anteil der Chunks eines float32-Fensters, deren RMS die Sprach-Schwelle erreicht."""
+    chunks = len(audio) // chunk_size
+    if chunks == 0:
+        return float(np.sqrt(np.mean(audio ** 2)) >= threshold) if len(audio) else 0.0
+    blocks = audio[:chunks * chunk_size].reshape(chunks, chunk_size)
+    rms = np.sqrt(np.einsum("ij,ij->i", blocks, blocks) / chunk_size)
+    return float(np.count_nonzero(rms >= threshold)) / chunks
+
+
+class LoadScheduler:
+    """Passt den Inferenz-Aufwand an die verfügbare Rechenzeit an.
+
+    Fenster mit zu wenig Sprache werden gar nicht transkribiert. Aus den letzten Fenstern wird der
+    Echtzeitfaktor (Rechenzeit / Audiodauer) gemittelt: Liegt er über step_down_rtf oder stauen sich
+    queue_high Aufträge, geht es eine Stufe in levels nach unten (billiger), bei rtf unter step_up_rtf
+    und leerer Warteschlange wieder nach oben. Nach jedem Wechsel gilt eine Pause von cooldown Fenstern,
+    gemessen wird dann nur noch auf der neuen Stufe. Jede Entscheidung geht als Metrik an on_decision.
+    """
+
+    def __init__(self, levels, min_speech_fraction=0.1, step_down_rtf=0.8, step_up_rtf=0.35,
+                 queue_high=2, window=5, cooldown=3, on_decision=None):
+        if not levels:
+            raise ValueError("Mindestens eine Qualitätsstufe nötig")
+        self.levels = [QualityLevel(*level) for level in levels]
+        self.min_speech_fraction = min_speech_fraction
+        self.step_down_rtf = step_down_rtf
+        self.step_up_rtf = step_up_rtf
+        self.queue_high = queue_high
+        self.cooldown = cooldown
+        self.on_decision = on_decision or (lambda decision: None)
+        self.level_index = 0
+        self._rtfs = collections.deque(maxlen=window)
+        self._since_change = 0
+        self._lock = threading.Lock()
+        # Metriken
+        self.skipped = 0
+        self.transcribed = 0
+        self.step_downs = 0
+        self.step_ups = 0
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def rolling_rtf(self):
+        with self._lock:
+            return sum(self._rtfs) / len(self._rtfs) if self._rtfs else None
+
+    def should_transcribe(self, fraction):
+        """Entscheidet anhand des Sprachanteils, ob sich die Inferenz für ein Fenster lohnt."""
+        if fraction >= self.min_speech_fraction:
+            return True
+        with self._lock:
+            self.skipped += 1
+        self.on_decision({"decision": "skip", "speech_fraction": round(fraction, 3), "time": time.time()})
+        return False
+
+    def record(self, audio_seconds, inference_seconds, queue_depth):
+        """Meldet ein transkribiertes Fenster und wechselt bei Bedarf die Stufe. Gibt die aktuelle Stufe zurück."""
+        decision = None
+        with self._lock:
+            self.transcribed += 1
+            if audio_seconds > 0:
+                self._rtfs.append(inference_seconds / audio_seconds)
+            self._since_change += 1
+            rtf = sum(self._rtfs) / len(self._rtfs) if self._rtfs else 0.0
+            if self._since_change >= self.cooldown:
+                previous = self.level_index
+                if (rtf > self.step_down_rtf or queue_depth >= self.queue_high) \
+                        and self.level_index < len(self.levels) - 1:
+                    self.level_index += 1
+                    self.step_downs += 1
+                elif rtf < self.step_up_rtf and queue_depth == 0 and self.level_index > 0:
+                    self.level_index -= 1
+                    self.step_ups += 1
+                if self.level_index != previous:
+                    decision = {"decision": "step_down" if self.level_index > previous else "step_up",
+                                "from": previous, "to": self.level_index, "rtf": round(rtf, 3),
+                                "queue_depth": queue_depth, "time": time.time()}
+                    self._rtfs.clear()
+                    self._since_change = 0
+            level = self.level
+        if decision is not None:
+            self.on_decision(decision)
+        return level
+
+    def stats(self):
+        """Zähler und aktuelle Stufe für Benchmark und Abschlussmeldung."""
+        with self._lock:
+            return {"level": self.level_index, "transcribed": self.transcribed, "skipped": self.skipped,
+                    "step_downs": self.step_downs, "step_ups": self.step_ups}
@@ -0,0 +1,167 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Kopfbereich (int64-Felder) vor den Audio-Daten
+_WRITE_CURSOR = 0   # Anzahl vollständig geschriebener Samples (wird als einziges veröffentlicht)
+_RESERVED = 1       # Ende des gerade beschriebenen Bereichs
+_CAPACITY = 2
+_OVERFLOWS = 3      # Eingangs-Überläufe der Aufnahme (Audio ging verloren, bevor es gelesen wurde)
+_UNDERRUNS = 4      # Lesezugriffe, deren Fenster bereits überschrieben war (Inferenz zu langsam)
+_HEADER_FIELDS = 8
+_HEADER_BYTES = _HEADER_FIELDS * 8
+
+
+class SharedAudioRing:
+    """int16-Ringpuffer in multiprocessing.shared_memory für Aufnahme- und Inferenz-Prozesse.
+
+    Genau ein Prozess schreibt und veröffentlicht nur seinen Schreib-Zeiger, beliebig viele Prozesse
+    lesen Fenster ohne Kopie (view) oder mit einer Kopie (read). Die Schnittstelle entspricht
+    AudioRingBuffer, ein Lock gibt es nicht: Leser prüfen nach dem Kopieren, ob der Bereich
+    inzwischen überschrieben wurde.
+    """
+
+    def __init__(self, shm, owner, counter_lock=None):
+        self._shm = shm
+        self._owner = owner
+        self.counter_lock = counter_lock
+        self._header = np.ndarray(_HEADER_FIELDS, dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self._header[_CAPACITY])
+        self._buffer = np.ndarray(self.capacity, dtype=np.int16, buffer=shm.buf, offset=_HEADER_BYTES)
+        self.dtype = self._buffer.dtype
+
+    @classmethod
+    def create(cls, capacity, counter_lock=None):
+        """Legt einen neuen Ring an (Aufnahme-Prozess)."""
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + int(capacity) * 2)
+        header = np.ndarray(_HEADER_FIELDS, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = int(capacity)
+        del header
+        return cls(shm, owner=True, counter_lock=counter_lock)
+
+    @classmethod
+    def attach(cls, name, counter_lock=None):
+        """Verbindet sich mit einem bestehenden Ring (Inferenz-Prozess)."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Vor Python 3.13: Ohne Registrierung, sonst gibt der resource_tracker den Speicher
+            # beim Beenden des Lesers frei bzw. meldet beim unlink() des Besitzers einen Fehler
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False, counter_lock=counter_lock)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def total_written(self):
+        return int(self._header[_WRITE_CURSOR])
+
+    @property
+    def overflows(self):
+        return int(self._header[_OVERFLOWS])
+
+    @overflows.setter
+    def overflows(self, value):
+        self._header[_OVERFLOWS] = value
+
+    @property
+    def underruns(self):
+        return int(self._header[_UNDERRUNS])
+
+    def available_range(self):
+        newest = int(self._header[_WRITE_CURSOR])
+        oldest = max(0, int(self._header[_RESERVED]) - self.capacity)
+        return oldest, newest
+
+    def __len__(self):
+        oldest, newest = self.available_range()
+        return newest - oldest
+
+    def write(self, data):
+        """Schreibt Audio-Daten (bytes oder int16-Array) und veröffentlicht danach den Schreib-Zeiger."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(data, dtype=np.int16)
+        else:
+            samples = data
+        start = int(self._header[_WRITE_CURSOR])
+        n = len(samples)
+        if n > self.capacity:
+            start += n - self.capacity
+            samples = samples[n - self.capacity:]
+            n = self.capacity
+        self._header[_RESERVED] = start + n
+
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        self._buffer[offset:offset + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+
+        self._header[_WRITE_CURSOR] = start + n
+        return start + n
+
+    def _check_range(self, start_sample, end_sample):
+        oldest, newest = self.available_range()
+        if start_sample < oldest or end_sample > newest or start_sample > end_sample:
+            self._count_underrun()
+            raise ValueError(
+                f"Bereich [{start_sample}, {end_sample}) nicht verfügbar (Puffer hält [{oldest}, {newest}))"
+            )
+
+    def _count_underrun(self):
+        if self.counter_lock is None:
+            self._header[_UNDERRUNS] += 1
+            return
+        with self.counter_lock:
+            self._header[_UNDERRUNS] += 1
+
+    def view(self, start_sample, end_sample):
+        """View ohne Kopie direkt in den Shared Memory, falls das Fenster nicht über das Ende läuft, sonst None."""
+        self._check_range(start_sample, end_sample)
+        offset = start_sample % self.capacity
+        length = end_sample - start_sample
+        if offset + length > self.capacity:
+            return None
+        return self._buffer[offset:offset + length]
+
+    def read(self, start_sample, end_sample, out=None, dtype=np.float32):
+        """Kopiert (und normalisiert bei float32) das Fenster in einem Durchgang, wie AudioRingBuffer.read()."""
+        self._check_range(start_sample, end_sample)
+        length = end_sample - start_sample
+        if out is None:
+            out = np.empty(length, dtype=dtype)
+        else:
+            out = out[:length]
+        offset = start_sample % self.capacity
+        first = min(length, self.capacity - offset)
+        self._copy(self._buffer[offset:offset + first], out[:first])
+        if first < length:
+            self._copy(self._buffer[:length - first], out[first:])
+
+        oldest, _ = self.available_range()
+        if start_sample < oldest:
+            self._count_underrun()
+            raise ValueError(f"Bereich ab Sample {start_sample} wurde während des Lesens überschrieben")
+        return out
+
+    def _copy(self, src, dst):
+        if dst.dtype == np.float32:
+            np.multiply(src, np.float32(1.0 / 32768.0), out=dst, casting="unsafe")
+        else:
+            dst[:] = src
+
+    def close(self):
+        """Gibt die Abbildung frei, der Besitzer entfernt zusätzlich den Shared Memory."""
+        self._header = None
+        self._buffer = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import sys
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+import stt
+from audio_source import WavFileSource
+from benchmark import transcription_threads
+from memory_monitor import MemoryMonitor, growth_per_hour, rss_kind
+from work_queue import BLOCK, BoundedWorkQueue, ReorderBuffer
+
+SOAK_HOURS = 5 # Simulierte Dauer - unsere Sessions laufen 4-6 Stunden
+SAMPLE_INTERVAL = 1.0 # Sekunden (Wanduhr) zwischen zwei Proben
+WARMUP_FRACTION = 0.1 # Anteil der simulierten Zeit, der nicht bewertet wird (Puffer füllen sich, Caches entstehen)
+MAX_RSS_GROWTH_MB = 10 # MB RSS pro simulierter Stunde, darüber schlägt der Test fehl
+MAX_TRACED_GROWTH_MB = 5 # MB Python-Allokationen (tracemalloc) pro simulierter Stunde
+MAX_THREAD_GROWTH = 0 # Threads, die nach der Aufwärmphase dazukommen dürfen
+MAX_FILE_GROWTH = 0 # Offene Datei-Deskriptoren, die nach der Aufwärmphase dazukommen dürfen
+TOP_ALLOCATIONS = 10 # Zeilen mit dem größten Zuwachs im Bericht
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def level_growth(samples, key, start):
+    """Zuwachs einer ganzzahligen Größe: Median des letzten Drittels minus Median des ersten (ab clock >= start)."""
+    values = [sample[key] for sample in samples if sample["clock"] >= start and sample.get(key) is not None]
+    if len(values) < 3:
+        return None
+    third = len(values) // 3
+    return float(np.median(values[-third:]) - np.median(values[:third]))
+
+
+def evaluate(samples, start, max_rss_growth=MAX_RSS_GROWTH_MB, max_traced_growth=MAX_TRACED_GROWTH_MB,
+             max_thread_growth=MAX_THREAD_GROWTH, max_file_growth=MAX_FILE_GROWTH, rss_source="current"):
+    """Bewertet die Proben ab clock >= start. Gibt (Kennzahlen, Liste der Verstöße) zurück.
+
+    rss_source wie memory_monitor.rss_kind(): Nur ein aktueller RSS wird geprüft - ein Höchststand bleibt nach
+    einer Spitze in der Aufwärmphase flach und verdeckt ein Leck darunter.
+    """
+    rss = growth_per_hour(samples, "rss_bytes", start)
+    traced = growth_per_hour(samples, "traced_bytes", start)
+    summary = {
+        "rss_mb_per_hour": rss / 2**20 if rss is not None else None,
+        "traced_mb_per_hour": traced / 2**20 if traced is not None else None,
+        "objects_per_hour": growth_per_hour(samples, "objects", start),
+        "thread_growth": level_growth(samples, "threads", start),
+        "open_file_growth": level_growth(samples, "open_files", start),
+    }
+    if rss_source != "current":
+        summary["rss_check"] = ("nicht anwendbar: ohne /proc nur der Höchststand des RSS" if rss_source == "peak"
+                                else "nicht anwendbar: RSS nicht messbar")
+    measured = [sample for sample in samples if sample["clock"] >= start]
+    if measured:
+        summary["new_uncollectable"] = measured[-1]["garbage"] - measured[0]["garbage"]
+
+    failures = []
+    if len(measured) < 2 or measured[-1]["clock"] <= measured[0]["clock"]:
+        failures.append("Zu wenige Proben nach der Aufwärmphase")
+    elif rss_source == "current" and (summary["rss_mb_per_hour"] or 0) > max_rss_growth:
+        failures.append(f"RSS wächst um {summary['rss_mb_per_hour']:.1f} MB/h (erlaubt {max_rss_growth})")
+    if summary["traced_mb_per_hour"] is not None and summary["traced_mb_per_hour"] > max_traced_growth:
+        failures.append(f"Python-Allokationen wachsen um {summary['traced_mb_per_hour']:.1f} MB/h "
+                        f"(erlaubt {max_traced_growth})")
+    if summary["thread_growth"] is not None and summary["thread_growth"] > max_thread_growth:
+        failures.append(f"{summary['thread_growth']:.0f} Threads mehr als nach der Aufwärmphase")
+    if summary["open_file_growth"] is not None and summary["open_file_growth"] > max_file_growth:
+        failures.append(f"{summary['open_file_growth']:.0f} offene Dateien mehr als nach der Aufwärmphase")
+    if summary.get("new_uncollectable"):
+        failures.append(f"{summary['new_uncollectable']} nicht freigebbare Objekte in gc.garbage")
+    return summary, failures
+
+
+def pipeline_probes():
+    """Größen, die die Pipeline festhält - sie müssen nach dem Füllen der Puffer flach bleiben."""
+    return {
+        "ring_buffer_seconds": lambda: sum(len(stream.audio_buffer) for stream in stt.speaker_streams) / stt.RATE,
+        "queue_depth": lambda: stt.utterance_queue.qsize(),
+        "results_waiting": lambda: stt.transcript_order.pending_count(),
+        "transcript_lines_in_memory": lambda: (stt.transcript_writer.lines_in_memory
+                                               if stt.transcript_writer is not None else 0),
+        "level_models": lambda: len(stt.level_models),
+    }
+
+
+def probe_summary(samples, start, names):
+    measured = [sample for sample in samples if sample["clock"] >= start] or samples
+    return {name: {"max": max(sample[name] for sample in measured), "end": measured[-1][name],
+                   "per_hour": growth_per_hour(samples, name, start)}
+            for name in names}
+
+
+def run_soak(wav_path, hours=SOAK_HOURS, speed=0, workers=None, batch=1, sample_interval=SAMPLE_INTERVAL,
+             warmup=WARMUP_FRACTION, max_rss_growth=MAX_RSS_GROWTH_MB, max_traced_growth=MAX_TRACED_GROWTH_MB,
+             max_thread_growth=MAX_THREAD_GROWTH, max_file_growth=MAX_FILE_GROWTH, trace=True,
+             memory_budget=False, memory_limit=0, transcript_file="soak_output.txt", debug=False):
+    """Spielt eine WAV-Datei so oft ab, bis hours Stunden Audio durch die komplette Pipeline gelaufen sind.
+
+    Währenddessen hält ein MemoryMonitor RSS, Threads, offene Dateien, GC-Zustand, tracemalloc und die
+    Puffer der Pipeline fest - über der simulierten Audio-Zeit. Gibt den Bericht als dict zurück,
+    "failures" ist leer, wenn nach der Aufwärmphase nichts über die Grenzen hinaus wächst.
+    """
+    stt.DEBUG = debug
+    stt.TRANSCRIPT_FILE = transcript_file
+    stt.TRANSCRIPT_JSONL_FILE = None
+    stt.TRANSCRIPT_STORE_FILE = None
+    stt.MEMORY_BUDGET = memory_budget or bool(memory_limit)
+    stt.MEMORY_LIMIT_MB = memory_limit
+    workers = workers or stt.TRANSCRIPTION_WORKERS
+    stt.configure_ring_buffer(workers, batch)
+    stt.model_manager.model_kwargs["num_workers"] = workers
+    stt.initialize_transcript_file()
+    stt.start_memory_monitor(memory_limit)
+    # Modell vorab laden - es gehört zum Grundbedarf, nicht zum Wachstum
+    stt.model_manager.get()
+
+    duration = wav_duration(wav_path)
+    loop = max(1, math.ceil(hours * 3600 / duration))
+    # Ohne Aufnahmezeiten - die Liste würde selbst mit jedem Chunk wachsen
+    source = WavFileSource(wav_path, speed=speed, loop=loop, record_times=False)
+    warmup_seconds = warmup * loop * duration
+    probes = pipeline_probes()
+    monitor = MemoryMonitor(sample_interval, clock=lambda: source.audio_time if source.rate else 0.0,
+                            probes=probes, trace=trace, mark_at=warmup_seconds, count_objects=True,
+                            log=stt.debug_print)
+
+    # Eigene Warteschlange samt Reihenfolge (Sequenznummern ab 0) für den Lauf - die von stt wird nicht
+    # geschlossen und steht danach wieder bereit
+    previous = stt.utterance_queue, stt.transcript_order
+    stt.utterance_queue = BoundedWorkQueue(stt.WORK_QUEUE_SIZE, BLOCK, merge=stt.merge_utterances,
+                                           on_drop=stt.report_dropped_utterance, lock=stt.timed_lock("utterance_queue"))
+    stt.transcript_order = ReorderBuffer(stt.emit_transcript, lock=stt.timed_lock("transcript_order"))
+    threads = transcription_threads(workers, batch)
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    monitor.start()
+    try:
+        stt.record_audio(source)
+        # Gemessen wird, solange Audio fließt - das Herunterfahren gehört nicht dazu
+        top_allocations = monitor.top_allocations(TOP_ALLOCATIONS)
+        monitor.close()
+        stt.utterance_queue.close()
+        for thread in threads:
+            thread.join()
+        stt.flush_transcript()
+    finally:
+        monitor.close()
+        stt.close_transcript_file()
+        stt.stop_memory_monitor()
+        stt.utterance_queue, stt.transcript_order = previous
+    wall_time = time.perf_counter() - wall_start
+
+    samples = monitor.samples
+    rss_source = rss_kind()
+    summary, failures = evaluate(samples, warmup_seconds, max_rss_growth, max_traced_growth,
+                                 max_thread_growth, max_file_growth, rss_source)
+    first, last = samples[0], samples[-1]
+    rss_values = [sample["rss_bytes"] for sample in samples if sample["rss_bytes"] is not None]
+    size, device, compute_type = stt.model_manager.config
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": {"platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "input": {"file": wav_path, "speed": speed, "loop": loop, "audio_hours": source.audio_time / 3600},
+        "config": {
+            "model": size, "device": device, "compute_type": compute_type, "workers": workers, "batch": batch,
+            "memory_budget": stt.MEMORY_BUDGET, "ring_buffer_seconds": stt.RING_BUFFER_DURATION,
+            "tracemalloc": trace,
+        },
+        "wall_seconds": wall_time,
+        "warmup_audio_seconds": warmup_seconds,
+        "samples": len(samples),
+        # "kind": "peak" heißt, start/end sind Höchststände (z.B. macOS) - kein aktueller Verbrauch
+        "rss_mb": {"start": rss_values[0] / 2**20, "end": rss_values[-1] / 2**20,
+                   "max": max(rss_values) / 2**20, "kind": rss_source} if rss_values else None,
+        "threads": {"start": first["threads"], "end": last["threads"]},
+        "open_files": {"start": first["open_files"], "end": last["open_files"]},
+        "gc": {"collections": [end - start for start, end in zip(first["collections"], last["collections"])],
+               "objects": {"start": first["objects"], "end": last["objects"]}, "garbage": last["garbage"]},
+        "growth": summary,
+        "pipeline": probe_summary(samples, warmup_seconds, probes),
+        "top_allocations": top_allocations,
+        "memory_cap_hits": stt.memory_cap_hits.snapshot(),
+        "failures": failures,
+        "passed": not failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-Test: viele Stunden WAV-Wiedergabe durch die Pipeline, "
+                                                 "Speicher, Threads und Dateien müssen flach bleiben")
+    parser.add_argument("wav", nargs="?", default="test_recording.wav", help="WAV-Datei (16 bit, beliebige Rate)")
+    parser.add_argument("--hours", type=float, default=SOAK_HOURS, help="Simulierte Stunden Audio")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Wiedergabe-Geschwindigkeit: 1 = Echtzeit, 0 = so schnell wie möglich")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Transkriptions-Threads")
+    parser.add_argument("--batch", type=int, default=1, help="Bis zu N wartende Fenster gebündelt rechnen")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL, help="Sekunden zwischen zwei Proben")
+    parser.add_argument("--warmup", type=float, default=WARMUP_FRACTION,
+                        help="Anteil der simulierten Zeit, der nicht bewertet wird")
+    parser.add_argument("--max-rss-growth", type=float, default=MAX_RSS_GROWTH_MB,
+                        help="Erlaubter RSS-Zuwachs in MB pro simulierter Stunde")
+    parser.add_argument("--max-traced-growth", type=float, default=MAX_TRACED_GROWTH_MB,
+                        help="Erlaubter Zuwachs der Python-Allokationen in MB pro simulierter Stunde")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Ohne tracemalloc (schneller, aber ohne Allokations-Zeilen)")
+    parser.add_argument("--memory-budget", action="store_true", help="Mit dem Speicher-Budget von stt.py")
+    parser.add_argument("--memory-limit", type=int, default=0, metavar="MB", help="RSS-Grenze des Speicher-Budgets")
+    parser.add_argument("--transcript", default="soak_output.txt", help="Transkript-Datei des Soak-Tests")
+    parser.add_argument("--output", help="JSON-Bericht in diese Datei schreiben (Standard: stdout)")
+    parser.add_argument("--debug", action="store_true", help="Debug-Ausgaben der Pipeline anzeigen")
+    args = parser.parse_args()
+
+    # Pipeline-Ausgaben nach stderr, damit stdout nur das JSON enthält
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_soak(args.wav, hours=args.hours, speed=args.speed, workers=args.workers, batch=args.batch,
+                          sample_interval=args.interval, warmup=args.warmup, max_rss_growth=args.max_rss_growth,
+                          max_traced_growth=args.max_traced_growth, trace=not args.no_tracemalloc,
+                          memory_budget=args.memory_budget, memory_limit=args.memory_limit,
+                          transcript_file=args.transcript, debug=args.debug)
+    report = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"Bericht gespeichert in '{args.output}'")
+    else:
+        print(report)
+    for failure in result["failures"]:
+        print(f"FEHLER: {failure}", file=sys.stderr)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
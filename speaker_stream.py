@@ -0,0 +1,111 @@
+import collections
+import threading
+import time
+
+
+class SpeakerStream:
+    """Alles, was pro Sprecher (Eingangskanal oder Gerät) getrennt läuft.
+
+    Jeder Sprecher hat eigenen Ringpuffer, Lautstärkemesser, Endpunkterkennung, Merkmale und Stitcher,
+    Sample-Zähler und Audio-Uhr. Modell, Auftrags-Warteschlange und Worker teilen sich alle Sprecher.
+    Für das Zusammenführen in Audio-Zeit-Reihenfolge merkt sich der Stream die Anfänge der
+    eingereihten Äußerungen, die noch kein Ergebnis haben (watermark()).
+    """
+
+    released = False
+
+    def __init__(self, index, name, rate, audio_buffer, volume_meter, endpointer, stitcher):
+        self.index = index
+        self.name = name
+        self.rate = rate
+        self.audio_buffer = audio_buffer
+        self.volume_meter = volume_meter
+        self.endpointer = endpointer
+        self.stitcher = stitcher
+        self.feature_stream = None     # StreamingMelExtractor, parallel zum Ringpuffer adressiert
+        self.vad = None                # StreamingVAD, Sprachwahrscheinlichkeit je Frame, ebenfalls über den Sample-Zähler
+        self.archiver = None           # AudioArchiver, Sample-Positionen wie im Ringpuffer
+        self.clock_start = None        # Uhrzeit (time.time()), zu der Sample 0 aufgenommen wurde
+        self.last_dispatched = None    # Zuletzt eingereihte Äußerung (für die Überlappung nach Schnitten)
+        self.last_line_text = ""       # Zuletzt geschriebene Zeile, Prompt für die Überarbeitung der nächsten
+        self.capture_mark = 0          # Erstes Sample, das noch zu einer neuen Äußerung werden kann
+        self._open = collections.Counter()
+        self._lock = threading.Lock()
+
+    def wall_time(self, seconds):
+        """Uhrzeit, zu der die Audio-Zeit seconds (seit Aufnahmebeginn dieses Sprechers) aufgenommen wurde."""
+        return (self.clock_start or time.time()) + seconds
+
+    def utterance_started(self, start_sample):
+        with self._lock:
+            self._open[start_sample] += 1
+
+    def utterance_finished(self, start_sample):
+        with self._lock:
+            self._open[start_sample] -= 1
+            if self._open[start_sample] <= 0:
+                del self._open[start_sample]
+
+    def open_utterances(self):
+        """Anzahl eingereihter Äußerungen ohne Ergebnis."""
+        with self._lock:
+            return sum(self._open.values())
+
+    def watermark(self):
+        """Uhrzeit, vor der dieser Sprecher keine Zeile mehr beginnen wird (float('inf') nach dem Ende)."""
+        with self._lock:
+            earliest = min(self._open, default=self.capture_mark)
+        earliest = min(earliest, self.capture_mark) / self.rate
+        pending = self.stitcher.pending_start()
+        if pending is not None:
+            earliest = min(earliest, pending)
+        if earliest == float("inf"):
+            return earliest
+        if self.clock_start is None:
+            return float("-inf")   # Aufnahme noch nicht gestartet
+        return self.clock_start + earliest
+
+
+class ReleasedSpeakerStream:
+    """Platzhalter für einen beendeten Sprecher in speaker_streams.
+
+    Behält nur Index, Name und Audio-Uhr - mehr brauchen noch wartende Überarbeitungen nicht. Ringpuffer,
+    Pegel, Endpunkterkennung, Stitcher, Merkmale und VAD des Sprechers werden damit freigegeben.
+    """
+
+    released = True
+    feature_stream = None
+    vad = None
+    archiver = None
+
+    def __init__(self, stream):
+        self.index = stream.index
+        self.name = stream.name
+        self.rate = stream.rate
+        self.clock_start = stream.clock_start
+
+    def wall_time(self, seconds):
+        return (self.clock_start or time.time()) + seconds
+
+    def open_utterances(self):
+        return 0
+
+    def watermark(self):
+        return float("inf")
+
+
+class SharedRingView:
+    """Sicht eines Inferenz-Prozesses auf einen Sprecher: nur der Shared-Memory-Ring zum Lesen der Fenster.
+
+    Pegel, Endpunkterkennung, Stitcher, Merkmale und VAD bleiben im Aufnahme-Prozess.
+    """
+
+    released = False
+    feature_stream = None
+    vad = None
+    archiver = None
+
+    def __init__(self, index, audio_buffer):
+        self.index = index
+        self.name = ""
+        self.audio_buffer = audio_buffer
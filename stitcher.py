@@ -0,0 +1,142 @@
+import re
+import threading
+from collections import namedtuple
+
+# Ein Wort mit absoluter Audio-Zeit in Sekunden seit Aufnahmebeginn
+Word = namedtuple("Word", ["start", "end", "text"])
+
+# Kennzahlen eines Whisper-Segments mit absoluter Audio-Zeit
+SegmentInfo = namedtuple("SegmentInfo", ["start", "end", "avg_logprob", "no_speech_prob"])
+
+# Ergebnis eines Fensters: Wörter und Segmente mit absoluter Zeit, Fensterbeginn/-ende,
+# Beginn der Überlappung zum Folgefenster und Rechenzeit des Modells
+WindowResult = namedtuple("WindowResult", ["words", "window_start", "window_end", "stable_until",
+                                           "segments", "inference_seconds"])
+
+_PUNCTUATION = re.compile(r"[^\w]+")
+
+
+def normalize_word(text):
+    """Vergleichsform eines Wortes: ohne Satzzeichen, Leerzeichen und Groß-/Kleinschreibung."""
+    return _PUNCTUATION.sub("", text).lower()
+
+
+def words_to_text(words):
+    """Setzt Whisper-Wörter (mit führendem Leerzeichen) wieder zu Text zusammen."""
+    return "".join(word.text for word in words).strip()
+
+
+def words_from_segments(segments, offset):
+    """Wandelt faster-whisper Segmente (word_timestamps=True) in Wörter mit absoluter Zeit um."""
+    words = []
+    for segment in segments:
+        for word in segment.words or ():
+            words.append(Word(offset + word.start, offset + word.end, word.word))
+    return words
+
+
+def segments_info(segments, offset):
+    """Kennzahlen der faster-whisper Segmente mit absoluter Zeit."""
+    return [SegmentInfo(offset + segment.start, offset + segment.end, segment.avg_logprob, segment.no_speech_prob)
+            for segment in segments]
+
+
+def group_words_by_segment(words, segments):
+    """Ordnet übernommene Wörter den Segmenten zu, in deren Zeitbereich ihre Mitte liegt.
+
+    Gibt [(SegmentInfo oder None, wörter)] zurück. Wörter außerhalb aller Segmente (z.B. vorläufige
+    Wörter des vorherigen Fensters) kommen zum nächstgelegenen Segment.
+    """
+    if not segments:
+        return [(None, list(words))] if words else []
+    groups = {}
+    for word in words:
+        middle = (word.start + word.end) / 2
+        index = min(range(len(segments)),
+                    key=lambda i: max(segments[i].start - middle, middle - segments[i].end, 0.0))
+        groups.setdefault(index, []).append(word)
+    return [(segments[index], groups[index]) for index in sorted(groups)]
+
+
+class TranscriptStitcher:
+    """Fügt überlappende Fenster zu einem duplikatfreien Wortstrom zusammen (Local-Agreement).
+
+    Wörter, die vollständig vor dem überlappenden Ende eines Fensters liegen, werden sofort
+    übernommen. Wörter im Überlappungsbereich bleiben vorläufig und werden erst übernommen,
+    wenn das nächste Fenster sie bestätigt - bei Abweichung gilt das neuere Fenster, das
+    das Wort vollständig gehört hat. Bereits übernommene Zeitbereiche werden nie erneut ausgegeben.
+    """
+
+    def __init__(self, prompt_words=30, tolerance=0.1):
+        self.prompt_words = prompt_words
+        self.tolerance = tolerance
+        self.committed_until = 0.0   # Absolute Zeit (s), bis zu der Wörter ausgegeben wurden
+        self._recent = []            # Zuletzt übernommene Wörter für den Prompt
+        self._pending = []           # Vorläufige Wörter aus dem Überlappungsbereich
+        self._lock = threading.Lock()
+
+    def process(self, words, window_start, stable_until=None):
+        """Verarbeitet die Wörter eines Fensters und gibt die neu übernommenen Wörter zurück.
+
+        window_start ist der absolute Fensterbeginn, stable_until der Beginn des Bereichs, den das
+        nächste Fenster erneut dekodiert (None = Äußerung ist zu Ende, alles übernehmen).
+        """
+        with self._lock:
+            committed = []
+
+            # Vorläufige Wörter, die das neue Fenster nicht vollständig gehört hat, gelten wie gehört
+            while self._pending and self._pending[0].start < window_start + self.tolerance:
+                committed.append(self._pending.pop(0))
+            if committed:
+                self.committed_until = max(self.committed_until, committed[-1].end)
+
+            # Bereits ausgegebene Zeitbereiche verwerfen (Duplikate aus der Überlappung)
+            new_words = [word for word in words
+                         if (word.start + word.end) / 2 > self.committed_until + self.tolerance / 2]
+
+            # Local-Agreement: übereinstimmender Anfang mit der vorherigen Hypothese wird übernommen
+            agreed = 0
+            for previous, current in zip(self._pending, new_words):
+                if normalize_word(previous.text) != normalize_word(current.text):
+                    break
+                agreed += 1
+            committed.extend(new_words[:agreed])
+            self._pending = []
+
+            for word in new_words[agreed:]:
+                if stable_until is None or word.end <= stable_until:
+                    committed.append(word)
+                else:
+                    self._pending.append(word)
+
+            self._remember(committed)
+            return committed
+
+    def flush(self):
+        """Übernimmt alle noch vorläufigen Wörter, z.B. am Ende der Session."""
+        with self._lock:
+            committed = self._pending
+            self._pending = []
+            self._remember(committed)
+            return committed
+
+    def pending_start(self):
+        """Beginn des ersten noch vorläufigen Wortes (Sekunden) oder None."""
+        with self._lock:
+            return self._pending[0].start if self._pending else None
+
+    def pending_words(self):
+        """Die noch vorläufigen Wörter (Kopie), z.B. für Zwischenergebnisse."""
+        with self._lock:
+            return list(self._pending)
+
+    def prompt(self):
+        """Kontext für das nächste Fenster: zuletzt übernommene plus noch vorläufige Wörter."""
+        with self._lock:
+            words = (self._recent + self._pending)[-self.prompt_words:]
+            return words_to_text(words)
+
+    def _remember(self, committed):
+        if committed:
+            self.committed_until = max(self.committed_until, committed[-1].end)
+            self._recent = (self._recent + committed)[-self.prompt_words:]
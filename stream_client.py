@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import time
+import wave
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765 # wie stream_server.SERVER_PORT
+SEND_DURATION = 0.064 # Sekunden Audio pro Sendung
+
+
+def read_wav(path):
+    """PCM16-Daten, Rate und Kanäle einer WAV-Datei (16 bit, beliebige Rate) - der Server rechnet um."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: Erwartet 16 bit PCM")
+        return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels()
+
+
+async def open_connection(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def replay(path, name, host=SERVER_HOST, port=SERVER_PORT, unix_path=None, speed=1.0, levels=False, show=True):
+    """Spielt eine WAV-Datei als eigenen Stream ab und sammelt die Antworten bis zum "end" des Servers.
+
+    speed=1 sendet in Echtzeit, 0 so schnell wie der Server annimmt. Gibt eine Zusammenfassung als dict zurück.
+    """
+    data, rate, channels = read_wav(path)
+    frame_bytes = 2 * channels
+    loop = asyncio.get_running_loop()
+    reader, writer = await open_connection(host, port, unix_path)
+    hello = {"type": "stream", "name": name, "rate": rate, "channels": channels, "levels": levels}
+    writer.write((json.dumps(hello) + "\n").encode("utf-8"))
+
+    async def send():
+        step = int(rate * SEND_DURATION) * frame_bytes
+        started = loop.time()
+        for offset in range(0, len(data), step):
+            writer.write(data[offset:offset + step])
+            await writer.drain()
+            if speed:
+                await asyncio.sleep(max(0.0, started + (offset + step) / frame_bytes / rate / speed - loop.time()))
+        writer.write_eof()
+        return loop.time()
+
+    sender = asyncio.ensure_future(send())
+    counts = collections.Counter()
+    lines = []
+    error = None
+    sent = None
+    try:
+        async for line in reader:
+            event = json.loads(line)
+            counts[event["type"]] += 1
+            if event["type"] == "final":
+                lines.append(event["text"])
+                if show:
+                    print(f"[{name}] {event['text']}")
+            elif event["type"] == "error":
+                error = event["message"]
+                break
+            elif event["type"] == "end":
+                break
+        if error is None:
+            sent = await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return {
+        "name": name,
+        "file": path,
+        "audio_seconds": len(data) / frame_bytes / rate,
+        "lines": len(lines),
+        "events": dict(counts),
+        "seconds_after_last_audio": loop.time() - sent if sent is not None else None,
+        "error": error,
+        "text": " ".join(lines),
+    }
+
+
+async def subscribe(host=SERVER_HOST, port=SERVER_PORT, unix_path=None, speakers=None, levels=False):
+    """Gibt alle Ereignisse des Servers aus, bis die Verbindung endet."""
+    reader, writer = await open_connection(host, port, unix_path)
+    writer.write((json.dumps({"type": "subscribe", "speakers": speakers, "levels": levels}) + "\n").encode("utf-8"))
+    async for line in reader:
+        print(line.decode("utf-8").rstrip())
+    writer.close()
+
+
+async def replay_all(files, connections=1, **kwargs):
+    """Spielt alle Dateien (jede connections-mal) gleichzeitig ab."""
+    jobs = []
+    for path in files:
+        base = os.path.splitext(os.path.basename(path))[0]
+        for index in range(connections):
+            name = base if connections == 1 else f"{base}-{index + 1}"
+            jobs.append(replay(path, name, **kwargs))
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    wall_time = time.perf_counter() - start_time
+    streams = [result if isinstance(result, dict) else {"error": str(result)} for result in results]
+    audio_seconds = sum(stream.get("audio_seconds", 0) for stream in streams)
+    return {
+        "streams": len(streams),
+        "failed": sum(1 for stream in streams if stream.get("error")),
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall_time,
+        "audio_seconds_per_second": audio_seconds / wall_time if wall_time else None,
+        "results": streams,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spielt WAV-Dateien als Streams zum Stream-Server ab")
+    parser.add_argument("files", nargs="*", help="WAV-Dateien (16 bit, beliebige Rate und Kanäle) - ohne Dateien nur zuhören")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--unix", help="Unix-Socket statt TCP")
+    parser.add_argument("--connections", type=int, default=1, help="Jede Datei über N Verbindungen gleichzeitig senden")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Wiedergabe-Geschwindigkeit: 1 = Echtzeit, 0 = so schnell wie möglich")
+    parser.add_argument("--levels", action="store_true", help="Auch Pegel-Ereignisse empfangen")
+    parser.add_argument("--speakers", help="Beim Zuhören nur diese Sprecher, z.B. 'Anna,Ben'")
+    parser.add_argument("--quiet", action="store_true", help="Zeilen nicht einzeln ausgeben")
+    args = parser.parse_args()
+
+    try:
+        if not args.files:
+            speakers = args.speakers.split(",") if args.speakers else None
+            asyncio.run(subscribe(args.host, args.port, args.unix, speakers, args.levels))
+            return
+        summary = asyncio.run(replay_all(args.files, args.connections, host=args.host, port=args.port,
+                                         unix_path=args.unix, speed=args.speed, levels=args.levels,
+                                         show=not args.quiet))
+    except KeyboardInterrupt:
+        return
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import json
+import threading
+
+import stt
+from audio_source import PushSource
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+CLIENT_QUEUE_SIZE = 1000 # Ereignisse, die pro Client warten dürfen - wer nicht nachkommt, wird abgehängt
+PUSH_BUFFER_BYTES = 2 * stt.RATE # Bytes Audio (1 s), die pro Verbindung auf die Aufnahme warten dürfen
+HELLO_TIMEOUT = 10 # Sekunden bis zur ersten Zeile einer Verbindung
+
+
+class Client:
+    """Empfänger von Ereignissen: begrenzte Warteschlange und Sende-Task pro Verbindung."""
+
+    def __init__(self, writer, queue_size, stream=None, speakers=None, levels=True):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.stream = stream        # Index des eigenen Sprechers (sendende Clients)
+        self.speakers = speakers    # Namen, die ein reiner Zuhörer sehen will (None = alle)
+        self.levels = levels
+        self.sender = None
+
+    def wants(self, event):
+        if event["type"] == "level" and not self.levels:
+            return False
+        if self.stream is not None:
+            return event["stream"] == self.stream
+        return self.speakers is None or event["speaker"] in self.speakers
+
+
+class StreamServer:
+    """Nimmt PCM16-Streams über TCP oder einen Unix-Socket an und schickt Text und Pegel live zurück.
+
+    Jede Verbindung beginnt mit einer JSON-Zeile:
+      {"type": "stream", "name": "Anna", "rate": 48000, "channels": 2}   danach rohes PCM16 bis zum EOF
+      {"type": "subscribe", "speakers": ["Anna"], "levels": false}   nur Ereignisse empfangen
+    Der Server antwortet mit JSON-Zeilen: ready, partial, final, revision, level, end, error.
+    Rate und Kanäle sind frei (Standard 16000 Hz mono), der Server mischt und rechnet selbst auf 16 kHz
+    mono um. Jede sendende Verbindung wird ein eigener Sprecher - Ringpuffer, Endpunkterkennung und Stitcher
+    wie beim Mikrofon, Modell, Warteschlange und Worker teilen sich alle. Nach dem EOF folgen noch
+    die restlichen Zeilen, dann "end".
+    Ereignisse warten pro Client in einer begrenzten Warteschlange. Läuft sie über, wird der Client
+    abgehängt: Zuhörer werden getrennt, sendende Clients bekommen nur keine Ereignisse mehr.
+    """
+
+    def __init__(self, queue_size=CLIENT_QUEUE_SIZE, push_buffer=PUSH_BUFFER_BYTES, log=None):
+        self.queue_size = queue_size
+        self.push_buffer = push_buffer
+        self.log = log or (lambda message: None)
+        self.clients = set()
+        self._handlers = set()
+        self.loop = None
+        self.server = None
+        # Statistik
+        self.connections = 0
+        self.active_streams = 0
+        self.evictions = 0
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT, unix_path=None):
+        self.loop = asyncio.get_running_loop()
+        stt.event_listeners.append(self.publish)
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self, timeout=5):
+        """Nimmt keine Verbindungen mehr an, trennt alle Clients und wartet auf ihre Abwicklung."""
+        if self.server is not None:
+            self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=timeout)
+        if self.publish in stt.event_listeners:
+            stt.event_listeners.remove(self.publish)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    def publish(self, event):
+        """Reicht ein Ereignis aus einem beliebigen Thread an die Clients weiter."""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._broadcast, event)
+
+    def _broadcast(self, event):
+        for client in list(self.clients):
+            if not client.wants(event):
+                continue
+            try:
+                client.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(client)
+
+    def _evict(self, client):
+        self.clients.discard(client)
+        self.evictions += 1
+        client.sender.cancel()
+        if client.stream is None:
+            client.writer.close()
+        self.log(f"Client abgehängt - {self.queue_size} Ereignisse nicht abgeholt")
+
+    def _add_client(self, client):
+        client.sender = asyncio.ensure_future(self._send(client))
+        self.clients.add(client)
+
+    async def _send(self, client):
+        while True:
+            event = await client.queue.get()
+            if event is None:
+                break
+            client.writer.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+            await client.writer.drain()
+            if event["type"] == "end" and event["stream"] == client.stream:
+                break
+
+    async def _finish_client(self, client):
+        """Beendet den Sende-Task eines Zuhörers, der die Verbindung geschlossen hat."""
+        if client in self.clients:
+            self.clients.discard(client)
+            client.sender.cancel()
+        await asyncio.gather(client.sender, return_exceptions=True)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            try:
+                hello = json.loads(await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT))
+            except (asyncio.TimeoutError, ValueError) as e:
+                await self._reply(writer, {"type": "error", "message": f"Ungültige erste Zeile: {e}"})
+                return
+            if hello.get("type") == "stream":
+                await self._ingest(reader, writer, hello)
+            elif hello.get("type") == "subscribe":
+                await self._subscribe(reader, writer, hello)
+            else:
+                await self._reply(writer, {"type": "error", "message": f"Unbekannter Typ {hello.get('type')!r}"})
+        except ConnectionError as e:
+            self.log(f"Verbindung abgebrochen: {e}")
+        finally:
+            writer.close()
+            self._handlers.discard(handler)
+
+    async def _reply(self, writer, event):
+        writer.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def _ingest(self, reader, writer, hello):
+        rate = hello.get("rate", stt.RATE)
+        channels = hello.get("channels", 1)
+        if not isinstance(rate, int) or not isinstance(channels, int) or rate < 1000 or not 1 <= channels <= 32:
+            await self._reply(writer, {"type": "error", "message": f"Ungültige Rate/Kanäle: {rate} Hz, {channels}"})
+            return
+        stream = stt.add_speaker_stream(hello.get("name") or f"Client {self.connections}")
+        client = Client(writer, self.queue_size, stream=stream.index, levels=hello.get("levels", True))
+        self._add_client(client)
+        client.queue.put_nowait({"type": "ready", "stream": stream.index, "speaker": stream.name})
+
+        def on_level(entry):
+            self.publish({"type": "level", "stream": stream.index, "speaker": stream.name, "time": float(entry.time),
+                          "rms": float(entry.rms), "peak": float(entry.peak), "level": int(entry.level)})
+
+        stream.volume_meter.subscribe(on_level)
+        source = PushSource(rate, channels, name=stream.name, max_bytes=self.push_buffer * channels * rate // stt.RATE)
+        recorder = threading.Thread(target=stt.record_audio, args=(source, [stream]),
+                                    name=f"Aufnahme-{stream.name}", daemon=True)
+        recorder.start()
+        self.active_streams += 1
+        self._resize_queue()
+        self.log(f"Stream '{stream.name}' verbunden (Sprecher {stream.index})")
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                # Voller Puffer: nicht weiterlesen, damit TCP den Client bremst
+                while not source.push(data):
+                    await asyncio.sleep(0.01)
+        except RuntimeError:
+            pass # Aufnahme-Thread hat die Quelle bereits beendet
+        finally:
+            source.finish()
+            await self.loop.run_in_executor(None, recorder.join)
+            # Alle Äußerungen dieses Sprechers abwarten, dann die vorläufigen Wörter übernehmen
+            while stream.open_utterances():
+                await asyncio.sleep(0.05)
+            stt.flush_stream(stream)
+            stream.volume_meter.unsubscribe(on_level)
+            self.publish({"type": "end", "stream": stream.index, "speaker": stream.name})
+            self.active_streams -= 1
+            self._resize_queue()
+            await asyncio.gather(client.sender, return_exceptions=True)
+            self.clients.discard(client)
+            # Schließt auch die Archiv-Session - das schreibt noch Dateien, daher nicht in der Event-Loop
+            await self.loop.run_in_executor(None, stt.release_speaker_stream, stream)
+            self.log(f"Stream '{stream.name}' beendet ({source.bytes_received // (2 * channels) / rate:.1f}s Audio)")
+
+    def _resize_queue(self):
+        # Jeder Stream bekommt so viele Plätze in der gemeinsamen Warteschlange wie ein Mikrofon allein
+        stt.utterance_queue.resize(stt.WORK_QUEUE_SIZE * max(1, self.active_streams))
+
+    async def _subscribe(self, reader, writer, hello):
+        speakers = hello.get("speakers")
+        client = Client(writer, self.queue_size, speakers=set(speakers) if speakers else None,
+                        levels=hello.get("levels", False))
+        self._add_client(client)
+        client.queue.put_nowait({"type": "ready", "stream": None, "speaker": None})
+        # Bis der Zuhörer die Verbindung schließt (oder abgehängt wird)
+        while await reader.read(1024):
+            pass
+        await self._finish_client(client)
+
+    def stats(self):
+        return {"connections": self.connections, "active_streams": self.active_streams,
+                "clients": len(self.clients), "evictions": self.evictions}
+
+
+async def serve(args):
+    server = StreamServer(queue_size=args.queue_size, log=stt.debug_print)
+    await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Stream-Server lauscht auf {where}. Drücken Sie Ctrl+C zum Beenden.")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        stt.debug_print(f"Stream-Server: {server.stats()}")
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nimmt Audio-Streams über das Netzwerk an und schickt Text zurück")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--unix", help="Unix-Socket statt TCP")
+    parser.add_argument("--workers", type=int, default=stt.TRANSCRIPTION_WORKERS, help="Anzahl Transkriptions-Threads")
+    parser.add_argument("--batch", type=int, default=stt.INFERENCE_BATCH_SIZE,
+                        help="Bis zu N wartende Fenster gebündelt rechnen (empfohlen bei vielen Streams)")
+    parser.add_argument("--archive", default=stt.AUDIO_ARCHIVE_DIR, metavar="DIR",
+                        help="Audio jeder Verbindung in diesem Verzeichnis archivieren")
+    parser.add_argument("--queue-size", type=int, default=CLIENT_QUEUE_SIZE, help="Ereignisse pro Client")
+    parser.add_argument("--metrics-port", type=int, default=stt.METRICS_PORT,
+                        help="Prometheus-Metriken unter http://127.0.0.1:PORT/metrics (0 = aus)")
+    parser.add_argument("--memory-budget", action="store_true", default=stt.MEMORY_BUDGET,
+                        help="Puffer, Modell-Cache und Transkript im Speicher begrenzen (stt.MEMORY_*)")
+    parser.add_argument("--memory-limit", type=int, default=stt.MEMORY_LIMIT_MB, metavar="MB",
+                        help="RSS-Grenze in MB, darüber wird der Modell-Cache geleert (schaltet --memory-budget ein)")
+    parser.add_argument("--debug", action="store_true", help="Debug-Ausgaben der Pipeline anzeigen")
+    args = parser.parse_args()
+
+    stt.DEBUG = args.debug
+    stt.MEMORY_BUDGET = args.memory_budget or bool(args.memory_limit)
+    stt.MEMORY_LIMIT_MB = args.memory_limit
+    stt.configure_ring_buffer(args.workers, args.batch)
+    # Sprecher entstehen erst mit den Verbindungen
+    stt.setup_speakers([])
+    stt.initialize_transcript_file()
+    stt.start_metrics(args.metrics_port)
+    stt.start_memory_monitor(stt.MEMORY_LIMIT_MB)
+    stt.model_manager.model_kwargs["num_workers"] = args.workers
+    stt.model_manager.start()
+    if args.batch > 1:
+        stt.start_batch_engine(args.batch)
+    else:
+        for worker_index in range(args.workers):
+            threading.Thread(target=stt.transcribe_audio, name=f"Transkription-{worker_index + 1}", daemon=True).start()
+    stt.start_refiner()
+    if args.archive:
+        stt.start_audio_archive(args.archive)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Stream-Server beendet.")
+    finally:
+        stt.flush_transcript()
+        if stt.refiner is not None:
+            stt.refiner.close(timeout=stt.REFINEMENT_SHUTDOWN_TIMEOUT)
+        stt.close_transcript_file()
+        stt.close_audio_archive()
+        stt.stop_memory_monitor()
+        stt.stop_metrics()
+
+
+if __name__ == "__main__":
+    main()
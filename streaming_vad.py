@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+FRAME_SAMPLES = 512 # Silero-VAD bewertet Frames zu 512 Samples (32 ms bei 16 kHz)
+CONTEXT_SAMPLES = 64 # Vorlauf aus dem vorherigen Frame, den das Modell mit jedem Frame sieht
+MAX_BLOCK_FRAMES = 256 # Höchstens so viele Frames (~8 s) pro Modell-Aufruf, damit kein Sprecher lange wartet
+
+
+def load_silero_session():
+    """ONNX-Sitzung des Silero-VAD, das faster-whisper mitbringt (eine für alle Sprecher)."""
+    from faster_whisper.vad import get_vad_model
+    return get_vad_model().session
+
+
+class StreamingVAD:
+    """Silero-VAD eines Sprechers, der seinen rekurrenten Zustand über alle Blöcke behält.
+
+    Jeder Frame wird genau einmal bewertet. Die Sprachwahrscheinlichkeiten liegen in einem Ring,
+    der wie der Audio-Ringpuffer über den Sample-Zähler adressiert wird: Frame k deckt die Samples
+    [k * 512, (k + 1) * 512) ab. Das Ergebnis ist dasselbe wie bei einem Durchlauf über das ganze Audio.
+    """
+
+    def __init__(self, session, capacity, frame_samples=FRAME_SAMPLES, context_samples=CONTEXT_SAMPLES):
+        self.session = session
+        self.frame_samples = frame_samples
+        self.context_samples = context_samples
+        self.capacity = int(capacity) // frame_samples # in Frames
+        self.probabilities = np.zeros(self.capacity, dtype=np.float32)
+        self.frames_done = 0
+        self.seconds = 0.0 # Rechenzeit insgesamt
+        self._h = np.zeros((1, 1, 128), dtype=np.float32)
+        self._c = np.zeros((1, 1, 128), dtype=np.float32)
+        self._context = np.zeros(context_samples, dtype=np.float32)
+        self._done = threading.Condition()
+
+    @property
+    def samples_done(self):
+        """Erstes Sample, das noch nicht bewertet ist."""
+        return self.frames_done * self.frame_samples
+
+    @property
+    def probability(self):
+        """Sprachwahrscheinlichkeit des zuletzt bewerteten Frames (z.B. für die Anzeige)."""
+        if not self.frames_done:
+            return 0.0
+        return float(self.probabilities[(self.frames_done - 1) % self.capacity])
+
+    def process(self, samples):
+        """Bewertet die nächsten Frames (float32 in [-1, 1), Länge ein Vielfaches von frame_samples)."""
+        started = time.perf_counter()
+        frames = np.asarray(samples, dtype=np.float32).reshape(-1, self.frame_samples)
+        contexts = np.concatenate([self._context[None], frames[:-1, -self.context_samples:]])
+        output, self._h, self._c = self.session.run(
+            None, {"input": np.concatenate([contexts, frames], axis=1), "h": self._h, "c": self._c})
+        self._context = frames[-1, -self.context_samples:].copy()
+        self._store(output.reshape(-1))
+        self.seconds += time.perf_counter() - started
+        return output.reshape(-1)
+
+    def skip(self, frames):
+        """Überspringt Frames, deren Audio schon überschrieben ist - sie gelten als Sprache, der Zustand beginnt neu."""
+        self._h[:] = 0
+        self._c[:] = 0
+        self._context[:] = 0
+        self._store(np.ones(frames, dtype=np.float32))
+
+    def _store(self, probabilities):
+        start = self.frames_done % self.capacity
+        count = len(probabilities)
+        if count > self.capacity:
+            probabilities = probabilities[-self.capacity:]
+            start = (self.frames_done + count - self.capacity) % self.capacity
+        first = min(len(probabilities), self.capacity - start)
+        self.probabilities[start:start + first] = probabilities[:first]
+        self.probabilities[:len(probabilities) - first] = probabilities[first:]
+        with self._done:
+            self.frames_done += count
+            self._done.notify_all()
+
+    def wait(self, end_sample, timeout=None):
+        """Wartet, bis alle vollständigen Frames vor end_sample bewertet sind. Gibt False bei Timeout zurück."""
+        with self._done:
+            return self._done.wait_for(lambda: self.frames_done >= end_sample // self.frame_samples, timeout)
+
+    def frame_probabilities(self, start_sample, end_sample):
+        """Gibt (erster Frame, Wahrscheinlichkeiten) der bewerteten Frames zurück, die [start, end) berühren."""
+        first = max(start_sample // self.frame_samples, self.frames_done - self.capacity, 0)
+        last = min(-(-end_sample // self.frame_samples), self.frames_done)
+        if last <= first:
+            return first, np.zeros(0, dtype=np.float32)
+        indices = np.arange(first, last) % self.capacity
+        return first, self.probabilities[indices]
+
+    def speech_spans(self, start_sample, end_sample, threshold=0.5, min_silence=8000, pad=6400, min_speech=0,
+                     max_speech=0):
+        """Sprachabschnitte in [start_sample, end_sample) als absolute Sample-Bereiche [(start, end)].
+
+        Wie faster-whisper: Sprache beginnt ab threshold und endet erst, wenn die Wahrscheinlichkeit
+        min_silence Samples lang unter threshold - 0.15 liegt. Abschnitte kürzer als min_speech fallen weg,
+        längere als max_speech werden an ihrer letzten Pause geteilt, ohne Pause hart (0 = unbegrenzt).
+        Die Abschnitte werden um pad Samples verlängert und zusammengelegt, wenn sie sich dadurch berühren -
+        außer sie würden dadurch wieder länger als max_speech, dann teilen sie sich die Lücke.
+        """
+        first, probabilities = self.frame_probabilities(start_sample, end_sample)
+        neg_threshold = max(threshold - 0.15, 0.01)
+        min_silence_frames = max(1, int(min_silence) // self.frame_samples)
+        max_speech_frames = max(1, int(max_speech) // self.frame_samples) if max_speech else 0
+        spans = []
+        speech_start = None
+        silence_start = None
+        last_pause = None # (Beginn, Ende) der letzten kurzen Pause im laufenden Abschnitt
+        for index, probability in enumerate(probabilities):
+            if max_speech_frames and speech_start is not None and index - speech_start >= max_speech_frames:
+                if silence_start is not None:
+                    spans.append((speech_start, silence_start))
+                    speech_start = silence_start = None
+                elif last_pause is not None:
+                    spans.append((speech_start, last_pause[0]))
+                    speech_start = last_pause[1]
+                else:
+                    spans.append((speech_start, index))
+                    speech_start = index
+                last_pause = None
+            if probability >= threshold:
+                if silence_start is not None:
+                    last_pause = (silence_start, index)
+                silence_start = None
+                if speech_start is None:
+                    speech_start = index
+            elif speech_start is not None and probability < neg_threshold:
+                if silence_start is None:
+                    silence_start = index
+                if index - silence_start >= min_silence_frames:
+                    spans.append((speech_start, silence_start))
+                    speech_start = silence_start = last_pause = None
+        if speech_start is not None:
+            spans.append((speech_start, silence_start if silence_start is not None else len(probabilities)))
+        spans = [(start, end) for start, end in spans
+                 if end > start and (end - start) * self.frame_samples >= min_speech]
+
+        merged = []
+        for start, end in spans:
+            start = max(start_sample, (first + start) * self.frame_samples - int(pad))
+            end = min(end_sample, (first + end) * self.frame_samples + int(pad))
+            if merged and start <= merged[-1][1]:
+                if not max_speech or max(merged[-1][1], end) - merged[-1][0] <= max_speech:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                    continue
+                middle = (start + merged[-1][1]) // 2
+                merged[-1] = (merged[-1][0], middle)
+                start = middle
+            if end > start:
+                merged.append((start, end))
+        return merged
+
+
+class VADWorker:
+    """Hintergrund-Thread, der neues Audio aller Sprecher aus ihren Ringpuffern liest und bewertet.
+
+    sources() liefert die aktuellen Paare (StreamingVAD, Ringpuffer) - Sprecher können zur Laufzeit
+    dazukommen. notify() weckt den Thread nach jedem aufgenommenen Chunk, die Aufnahme selbst rechnet
+    nichts. Läuft mit niedriger Priorität (nice), damit Aufnahme und Transkription Vorrang haben.
+    """
+
+    def __init__(self, sources, poll_interval=0.1, nice=10, log=None):
+        self.sources = sources
+        self.poll_interval = poll_interval
+        self.nice = nice
+        self.log = log or (lambda message: None)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="VAD", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self):
+        self._wake.set()
+
+    def close(self, timeout=None):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except (AttributeError, OSError) as e:
+            self.log(f"Priorität des VAD konnte nicht gesenkt werden: {e}")
+        while not self._stopped.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            busy = True
+            while busy and not self._stopped.is_set():
+                busy = False
+                for vad, audio_buffer in self.sources():
+                    try:
+                        busy |= self.advance(vad, audio_buffer)
+                    except Exception as e:
+                        self.log(f"FEHLER im VAD: {e}")
+
+    def advance(self, vad, audio_buffer):
+        """Bewertet bis zu MAX_BLOCK_FRAMES neue Frames eines Sprechers. Gibt True zurück, wenn noch mehr wartet."""
+        oldest, newest = audio_buffer.available_range()
+        start = vad.samples_done
+        if start < oldest:
+            # Zu weit zurückgefallen: das Audio ist weg, Frames als Sprache markieren und neu ansetzen
+            skipped = -(-(oldest - start) // vad.frame_samples)
+            self.log(f"VAD {skipped} Frames hinter dem Ringpuffer - übersprungen")
+            vad.skip(skipped)
+            start = vad.samples_done
+        frames = min((newest - start) // vad.frame_samples, MAX_BLOCK_FRAMES)
+        if frames <= 0:
+            return False
+        try:
+            samples = audio_buffer.read(start, start + frames * vad.frame_samples)
+        except ValueError:
+            return True # Während des Lesens überschrieben - beim nächsten Durchlauf überspringen
+        vad.process(samples)
+        return (newest - vad.samples_done) >= vad.frame_samples
@@ -1,30 +1,107 @@
-import pyaudio
 import numpy as np
-from faster_whisper import WhisperModel
-import collections
 import threading
+import multiprocessing
+import argparse
 import time
 import os
+import json
+import contextlib
+import collections
+import gc
 from datetime import datetime
-import math
+from ring_buffer import AudioRingBuffer
+from endpointing import UtteranceEndpointer
+from work_queue import BoundedWorkQueue, ReorderBuffer, TimeOrderedMerge
+from stitcher import (TranscriptStitcher, WindowResult, words_from_segments, words_to_text, segments_info,
+                      group_words_by_segment)
+from model_manager import ModelManager
+from audio_source import MicrophoneSource
+from shm_ring import SharedAudioRing
+from volume_meter import VolumeMeter
+from transcript_writer import TranscriptWriter
+from transcript_store import TranscriptStore
+from mel_features import StreamingMelExtractor, PrecomputedFeatureExtractor
+from scheduler import LoadScheduler, speech_fraction
+from refinement import Refiner, RefinementJob
+from speaker_stream import ReleasedSpeakerStream, SharedRingView, SpeakerStream
+from audio_archive import AudioArchiver
+from batch_engine import BatchInferenceEngine, split_batch_segments
+from resampler import InputConverter
+from metrics import MetricsRegistry, TimedLock, CallTimer, RATIO_BUCKETS, start_http_server, SnapshotWriter
+from profiler import SamplingProfiler
+from streaming_vad import StreamingVAD, VADWorker, load_silero_session
+from memory_monitor import MemoryMonitor, process_rss, thread_count, open_file_count
 
 # --- Konfiguration ---
-AUDIO_FORMAT = pyaudio.paInt16
-CHANNELS = 1
+CHANNELS = 1 # Kanäle des Eingabegeräts - bei mehr als einem ist jeder Kanal ein eigener Sprecher (--channels)
+INPUT_DEVICES = None # z.B. "1,3,4": je Eingabegerät ein Sprecher mit eigenem Aufnahme-Thread (--devices)
+SPEAKER_NAMES = None # z.B. "Anna,Ben,Carla" - Standard: "Sprecher 1", "Sprecher 2", ... (--speakers)
 RATE = 16000  # 16 kHz ist Standard für Whisper
+CAPTURE_RATE = None # Aufnahme-Rate des Geräts: None = native Rate, wird selbst auf RATE umgerechnet (16000 = Betriebssystem rechnet um)
 CHUNK_SIZE = 1024 # Größe jedes Audio-Chunks
-BUFFER_DURATION = 8 # Sekunden: Erhöht von 3 auf 8 für längere, kohärentere Texte
-OVERLAP_DURATION = 2 # Sekunden: Überlappung zwischen Transkriptionen für besseren Kontext
+BUFFER_DURATION = 8 # Sekunden: Maximale Länge einer Äußerung, längere werden an einer leisen Stelle geschnitten
+OVERLAP_DURATION = 1 # Sekunden: Überlappung nach einem erzwungenen Schnitt (Duplikate werden über Wort-Zeitstempel entfernt)
+INITIAL_PROMPT = "Hallo" # Prompt für das erste Fenster, danach dient der bisherige Text als Kontext
+
+# Transkriptions-Pipeline: begrenzte Warteschlange und mehrere Worker auf einem gemeinsamen Modell
+TRANSCRIPTION_WORKERS = 2 # Anzahl paralleler Transkriptions-Threads (faster-whisper num_workers)
+WORK_QUEUE_SIZE = 4 # Maximale Anzahl wartender Äußerungen
+BACKPRESSURE_POLICY = "coalesce" # Bei voller Warteschlange: "block", "drop_oldest" oder "coalesce"
+MAX_COALESCED_DURATION = 3 * BUFFER_DURATION # Sekunden: Maximale Länge zusammengelegter Äußerungen
+INFERENCE_PROCESSES = 0 # 0 = Transkription in Threads, >0 = eigene Prozesse, die über Shared Memory lesen (--processes)
+INFERENCE_BATCH_SIZE = 1 # >1 = wartende Fenster aller Sprecher gebündelt rechnen statt in Workern (--batch)
+INFERENCE_BATCH_WAIT = 0.05 # Sekunden: So lange wartet ein Batch nach dem ersten Fenster auf weitere
+
+def ring_buffer_duration(workers=TRANSCRIPTION_WORKERS, batch_size=1, processes=0):
+    """Sekunden, die der Ringpuffer je Sprecher fassen muss: alle wartenden und laufenden Fenster samt Überlappung.
+
+    Mit processes > 0 sind je Prozess bis zu zwei Fenster unterwegs - eines in Arbeit, eines in dessen Job-Warteschlange.
+    """
+    in_flight = 2 * processes if processes > 0 else max(workers, batch_size)
+    return (WORK_QUEUE_SIZE + in_flight) * MAX_COALESCED_DURATION + OVERLAP_DURATION
+
+# Sekunden: Kapazität des Ringpuffers - muss alle wartenden und laufenden Aufträge abdecken
+RING_BUFFER_DURATION = ring_buffer_duration(TRANSCRIPTION_WORKERS, INFERENCE_BATCH_SIZE, INFERENCE_PROCESSES)
+
+# Modell-Konfigurationen (size, device, compute_type) in Fallback-Reihenfolge - verwende CPU da es in Tests funktioniert hat
+MODEL_CONFIGS = [
+    ("base", "cpu", "float32"),
+    ("tiny", "cpu", "float32"),
+]
+WARMUP_DURATION = 0.5 # Sekunden Stille für den Aufwärm-Durchlauf nach dem Laden
+BEAM_SIZE = 5 # Beam-Suche beim Dekodieren (1 = greedy, deutlich schneller)
+CPU_THREADS = 0 # Threads pro Modell-Worker (0 = Standard von CTranslate2)
+PROFILE_FILE = "stt_profile.json" # Vom Autotuner (autotune.py) erzeugtes Profil, überschreibt die Werte oben
+PRECOMPUTED_FEATURES = True # log-Mel schon bei der Aufnahme berechnen (nur Thread-Modus, ersetzt den VAD-Filter im Modell)
+FEATURE_MELS = 80 # Mel-Bänder des Modells (80, large-v3: 128) - bei Abweichung wird normal gerechnet
 
 # Datei für Transkriptionen
 TRANSCRIPT_FILE = "transcript.txt"
+TRANSCRIPT_JSONL_FILE = "transcript.jsonl" # Strukturierte Einträge pro Segment (None = aus)
+TRANSCRIPT_STORE_FILE = "transcripts.sqlite3" # Durchsuchbares Archiv aller Sessions, siehe transcript_store.py (None = aus)
+TRANSCRIPT_FLUSH_INTERVAL = 1.0 # Sekunden: Geschriebene Zeilen werden spätestens so oft auf die Platte gebracht
+TRANSCRIPT_FSYNC_INTERVAL = 10.0 # Sekunden: Abstand der fsync-Aufrufe (zusätzlich beim Beenden)
+TRANSCRIPT_ROTATE_BYTES = 0 # Neue Datei ab dieser Größe der Textdatei (0 = aus)
+TRANSCRIPT_ROTATE_INTERVAL = 0 # Sekunden: Neue Datei nach dieser Zeit, z.B. 3600 (0 = aus)
+TRANSCRIPT_MAX_LINES = 2000 # Zeilen der Textdatei im Speicher (überarbeitbar), mit MEMORY_BUDGET MEMORY_TRANSCRIPT_LINES
+TRANSCRIPT_REWRITE_INTERVAL = 60.0 # Sekunden: Überarbeitete Zeilen landen höchstens so oft in der Textdatei (und beim Beenden)
+
+# Audio-Archiv: Aufnahme als int16-Chunks auf der Platte, Ausschnitte per audio_archive.py (oder --archive)
+AUDIO_ARCHIVE_DIR = None # z.B. "audio_archive" (None = aus)
+AUDIO_ARCHIVE_CHUNK_DURATION = 60 # Sekunden pro Chunk-Datei
+AUDIO_ARCHIVE_MAX_BYTES = 2 * 1024 ** 3 # Älteste Chunks werden gelöscht, sobald das Archiv größer ist (0 = unbegrenzt)
+AUDIO_ARCHIVE_MAX_AGE = 30 * 24 * 3600 # Sekunden: Ältere Chunks werden gelöscht (0 = unbegrenzt)
 
 # Debug-Modus
 DEBUG = True
 
-# Lautstärkepegel-Variable (global)
-current_volume_level = 0  # 0 = niemand spricht, 1-4 = spricht (leise bis sehr laut)
-volume_lock = threading.Lock()
+# Metriken und Profiling
+METRICS_PORT = 0 # Prometheus-Endpunkt http://127.0.0.1:PORT/metrics (und /metrics.json), 0 = aus (--metrics-port)
+METRICS_SNAPSHOT_FILE = None # z.B. "stt_metrics.json": regelmäßiger JSON-Schnappschuss aller Metriken (--metrics-file)
+METRICS_SNAPSHOT_INTERVAL = 10 # Sekunden zwischen zwei Schnappschüssen
+METRICS_LOCK_TIMING = False # Warte- und Haltezeiten der Ringpuffer-, Warteschlangen- und Ausgabe-Locks messen (kostet pro Zugriff)
+PROFILE_TRANSCRIBE = False # Stichproben-Profiler um model.transcribe, nur Thread- und Batch-Modus (--profile)
+PROFILE_OUTPUT_FILE = "stt_transcribe.folded" # Gefaltete Stacks des Profilers (flamegraph.pl, speedscope)
 
 # Schwellenwerte für Lautstärkepegel (diese können je nach Mikrofon angepasst werden)
 VOLUME_THRESHOLDS = {
@@ -34,104 +111,791 @@ VOLUME_THRESHOLDS = {
     3: 0.1,     # Laute Stimme
     4: 0.2      # Sehr laut (Schreien/sehr nah am Mikrofon)
 }
+VOLUME_HISTORY_DURATION = 10 # Sekunden Pegel-Historie für den Visualizer (volume_meter.snapshot() je Sprecher)
+
+# Endpunkterkennung: Äußerungen werden nach Sprechpausen sofort an die Transkription übergeben
+ENDPOINT_SPEECH_THRESHOLD = 2 * VOLUME_THRESHOLDS[0] # RMS ab dem Sprache beginnt (Hysterese zur Stille-Schwelle)
+ENDPOINT_HANGOVER = 0.6 # Sekunden: So lange muss es still sein, bis eine Äußerung endet
+ENDPOINT_MIN_SPEECH = 0.15 # Sekunden: Mindestdauer über der Sprach-Schwelle (filtert Klicks)
+ENDPOINT_PRE_ROLL = 0.3 # Sekunden: Vorlauf vor dem erkannten Sprachbeginn
+ENDPOINT_CUT_SEARCH = 1.0 # Sekunden: Suchbereich für die leiseste Schnittstelle vor BUFFER_DURATION
+
+# Streaming-VAD: Silero bewertet jeden Frame genau einmal im Hintergrund, statt vad_filter über jedes Fenster laufen zu lassen
+STREAMING_VAD = True
+VAD_THRESHOLD = 0.5 # Sprachwahrscheinlichkeit, ab der ein Frame als Sprache zählt
+VAD_MIN_SILENCE = 0.5 # Sekunden unter der Schwelle, bis ein Sprachabschnitt endet (wie min_silence_duration_ms=500)
+VAD_SPEECH_PAD = 0.4 # Sekunden Rand vor und nach jedem Sprachabschnitt
+VAD_MIN_SPEECH = 0.25 # Sekunden: Kürzere Sprachabschnitte (Klicks, Räuspern) werden verworfen
+VAD_MAX_SPEECH = 30 # Sekunden: Längere Sprachabschnitte werden an einer Pause geteilt (ein Whisper-Fenster)
+VAD_WAIT = 0.5 # Sekunden, die die Transkription auf den VAD wartet - danach wie ohne VAD (vad_filter bzw. Pegel)
+
+# Lastabhängige Steuerung: Qualitätsstufen von der besten zur billigsten - (Modell oder None = Hauptmodell, Beam oder None = BEAM_SIZE)
+SCHEDULER_LEVELS = [
+    (None, None),                   # Hauptmodell mit voller Beam-Suche
+    (None, 1),                      # Hauptmodell, greedy
+    (("tiny", "cpu", "int8"), 1),   # Kleines Modell, int8, greedy
+]
+SCHEDULER_MIN_SPEECH_FRACTION = 0.1 # Fenster mit weniger Sprachanteil (laut VAD, sonst Chunks über ENDPOINT_SPEECH_THRESHOLD) werden übersprungen
+SCHEDULER_STEP_DOWN_RTF = 0.8 # Gemittelter Echtzeitfaktor, ab dem eine Stufe billiger gerechnet wird
+SCHEDULER_STEP_UP_RTF = 0.35 # Darunter (und bei leerer Warteschlange) wieder eine Stufe besser
+
+# Zweite Stufe: Entwurfszeilen werden bei freier CPU mit einem größeren Modell neu dekodiert und im Transkript ersetzt
+REFINEMENT_MODEL = ("small", "cpu", "int8") # (size, device, compute_type), None = aus
+REFINEMENT_BEAM_SIZE = 5
+REFINEMENT_QUEUE_SIZE = 50 # Maximale Anzahl wartender Zeilen, bei Überlauf bleibt der älteste Entwurf stehen
+REFINEMENT_MARGIN = 0.2 # Sekunden Audio vor und nach den Wörtern einer Zeile
+REFINEMENT_SHUTDOWN_TIMEOUT = 10 # Sekunden, die beim Beenden noch überarbeitet wird - der Rest bleibt Entwurf
+
+# Speicher-Budget für lange Sessions: Obergrenzen für Puffer und Modell-Cache, jedes Erreichen wird gemeldet (soak_test.py prüft)
+MEMORY_BUDGET = False # Obergrenzen unten durchsetzen (--memory-budget)
+MEMORY_RING_BUFFER_DURATION = 60 # Sekunden: Höchstgröße von Ringpuffer, Merkmalen und VAD je Sprecher (mind. ein zusammengelegtes Fenster)
+MEMORY_LEVEL_MODELS = 1 # Zusätzliche Modelle für billigere Scheduler-Stufen - das am längsten unbenutzte wird entladen (0 = nur Hauptmodell)
+MEMORY_TRANSCRIPT_LINES = 500 # Zeilen der Textdatei im Speicher (überarbeitbar) - ältere stehen nur noch auf der Platte
+MEMORY_LIMIT_MB = 0 # RSS-Grenze: beim Überschreiten werden die zusätzlichen Modelle entladen (0 = keine, --memory-limit)
+MEMORY_CHECK_INTERVAL = 10 # Sekunden zwischen zwei Prüfungen der RSS-Grenze
 
 def debug_print(message):
-    """Debug-Ausgabe mit Zeitstempel"""
+    """Debug-Ausgabe mit Zeitstempel.
+
+    Im Hot Path (pro Chunk, pro Fenster) nur hinter "if DEBUG:" aufrufen - sonst wird der
+    f-String auch bei ausgeschaltetem Debug-Modus formatiert.
+    """
     if DEBUG:
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         print(f"[DEBUG {timestamp}] {message}")
 
-# Modell laden - verwende CPU da es in Tests funktioniert hat
-debug_print("Lade Whisper-Modell...")
-try:
-    model = WhisperModel("base", device="cpu", compute_type="float32")
-    debug_print("✓ Whisper-Modell erfolgreich geladen (base/cpu/float32)")
-except Exception as e:
-    debug_print(f"FEHLER beim Laden des Modells: {e}")
-    # Fallback auf tiny
+# --- Metriken: Prometheus-Text über start_metrics() oder metrics.render(), JSON über metrics.snapshot() ---
+metrics = MetricsRegistry()
+chunk_read_time = metrics.histogram("stt_chunk_read_seconds", "Wartezeit auf einen Chunk der Audio-Quelle")
+chunk_process_time = metrics.histogram("stt_chunk_process_seconds",
+                                       "Verarbeitung eines Chunks (Umrechnung, Pegel, Ringpuffer, Merkmale, Endpunkt)")
+input_overflows = metrics.counter("stt_input_overflows_total", "Eingangs-Überläufe der Audio-Quelle (Audio verloren)")
+lock_wait_time = metrics.histogram("stt_lock_wait_seconds", "Wartezeit bis zum Erwerb eines Locks", ["lock"])
+lock_hold_time = metrics.histogram("stt_lock_hold_seconds", "Haltezeit eines Locks", ["lock"])
+window_feature_time = metrics.histogram("stt_window_feature_seconds", "Merkmale eines Fensters bereitstellen")
+window_encode_time = metrics.histogram("stt_window_encode_seconds", "Encoder-Zeit je Fenster")
+window_decode_time = metrics.histogram("stt_window_decode_seconds",
+                                       "Rechenzeit je Fenster außerhalb des Encoders (Dekodieren, ggf. Merkmale)")
+window_rtf = metrics.histogram("stt_window_rtf", "Echtzeitfaktor je Fenster (Rechenzeit / Audio-Dauer)",
+                               buckets=RATIO_BUCKETS)
+batch_wait_time = metrics.histogram("stt_batch_wait_seconds", "Wartezeit eines Fensters auf seinen Batch")
+transcript_latency = metrics.histogram("stt_audio_to_text_seconds", "Ende des Audios bis zur geschriebenen Zeile",
+                                       ["speaker"])
+memory_cap_hits = metrics.counter("stt_memory_cap_hits_total", "Wie oft eine Obergrenze des Speicher-Budgets gegriffen hat",
+                                  ["cap"])
+metrics.gauge("stt_process_resident_bytes", "Arbeitsspeicher (RSS) des Prozesses", callback=process_rss)
+metrics.gauge("stt_process_threads", "Threads des Prozesses (inkl. nativer)", callback=thread_count)
+metrics.gauge("stt_process_open_files", "Offene Datei-Deskriptoren", callback=open_file_count)
+metrics.counter("stt_gc_collections_total", "Läufe des Garbage Collectors", ["generation"],
+                callback=lambda: {(str(generation),): stats["collections"] for generation, stats in enumerate(gc.get_stats())})
+
+def timed_lock(name):
+    """Lock für Ringpuffer und Warteschlangen - mit METRICS_LOCK_TIMING eines, das Warte- und Haltezeit misst."""
+    return TimedLock(name, lock_wait_time, lock_hold_time) if METRICS_LOCK_TIMING else None
+
+def speaker_label(stream):
+    return stream.name or str(stream.index)
+
+memory_caps_reported = set()
+
+def report_memory_cap(cap, message):
+    """Meldet, dass eine Obergrenze des Speicher-Budgets gegriffen hat - sichtbar beim ersten Mal, danach nur gezählt."""
+    memory_cap_hits.inc(cap=cap)
+    if cap not in memory_caps_reported:
+        memory_caps_reported.add(cap)
+        print(f"Speicher-Budget: {message}")
+
+def load_tuning_profile(path=PROFILE_FILE):
+    """Übernimmt Modell, compute_type, cpu_threads und beam_size aus dem Autotuner-Profil, falls vorhanden."""
+    global MODEL_CONFIGS, BEAM_SIZE, CPU_THREADS
+    if not os.path.exists(path):
+        return None
     try:
-        model = WhisperModel("tiny", device="cpu", compute_type="float32")
-        debug_print("✓ Fallback auf tiny Modell erfolgreich")
-    except Exception as e2:
-        debug_print(f"KRITISCHER FEHLER: Kein Modell konnte geladen werden: {e2}")
-        exit(1)
-
-# Ein Puffer für Audio-Daten
-audio_buffer = collections.deque()
-buffer_lock = threading.Lock()
-transcribing = False # Flag, um Mehrfach-Transkriptionen zu verhindern
-file_lock = threading.Lock() # Lock für Thread-sichere Dateischreibung
-
-def calculate_volume_level(audio_data):
-    """Berechnet den Lautstärkepegel von Audio-Daten und gibt einen Wert von 0-4 zurück."""
-    global current_volume_level
-    
-    # Konvertiere Audio-Daten zu numpy array und normalisiere
-    audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-    
-    # Berechne RMS (Root Mean Square) als Maß für die Lautstärke
-    rms = np.sqrt(np.mean(audio_np**2))
-    
-    # Bestimme Lautstärkepegel basierend auf Schwellenwerten
-    new_level = 0
-    if rms >= VOLUME_THRESHOLDS[4]:
-        new_level = 4  # Sehr laut
-    elif rms >= VOLUME_THRESHOLDS[3]:
-        new_level = 3  # Laut
-    elif rms >= VOLUME_THRESHOLDS[2]:
-        new_level = 2  # Normal
-    elif rms >= VOLUME_THRESHOLDS[1]:
-        new_level = 1  # Leise
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        tuned_config = (profile["model"], "cpu", profile["compute_type"])
+        MODEL_CONFIGS = [tuned_config] + [config for config in MODEL_CONFIGS if config != tuned_config]
+        BEAM_SIZE = int(profile["beam_size"])
+        CPU_THREADS = int(profile["cpu_threads"])
+    except (OSError, ValueError, KeyError) as e:
+        debug_print(f"Profil '{path}' konnte nicht geladen werden, verwende Standardwerte: {e}")
+        return None
+    debug_print(f"Profil '{path}' geladen: {tuned_config[0]}/{tuned_config[2]}, cpu_threads={CPU_THREADS}, beam_size={BEAM_SIZE}")
+    return profile
+
+load_tuning_profile()
+
+# Modell wird erst beim Start im Hintergrund geladen - Import und Aufnahmestart bleiben schnell
+model_manager = ModelManager(
+    MODEL_CONFIGS,
+    model_kwargs=dict(num_workers=TRANSCRIPTION_WORKERS, cpu_threads=CPU_THREADS),
+    warmup_samples=int(WARMUP_DURATION * RATE),
+    log=debug_print,
+)
+
+def report_scheduler_decision(decision):
+    """Schreibt jede Entscheidung des Schedulers als Metrik-Zeile ins Debug-Log."""
+    debug_print(f"METRIK scheduler {json.dumps(decision)}")
+
+# Überspringt stille Fenster und wechselt bei Überlast auf billigere Stufen (und zurück)
+scheduler = LoadScheduler(
+    SCHEDULER_LEVELS,
+    min_speech_fraction=SCHEDULER_MIN_SPEECH_FRACTION,
+    step_down_rtf=SCHEDULER_STEP_DOWN_RTF,
+    step_up_rtf=SCHEDULER_STEP_UP_RTF,
+    queue_high=max(2, WORK_QUEUE_SIZE // 2),
+    on_decision=report_scheduler_decision,
+)
+level_models = collections.OrderedDict() # Modell-Konfiguration -> ModelManager für billigere Stufen, zuletzt benutztes am Ende
+level_models_lock = threading.Lock()
+
+def model_for_level(level, model):
+    """Modell für eine Qualitätsstufe - bis ein zusätzliches Modell geladen ist, rechnet das Hauptmodell weiter."""
+    config = tuple(level.model_config) if level.model_config else None
+    if config is None or config == model_manager.config:
+        return model
+    with level_models_lock:
+        manager = level_models.get(config)
+        if manager is None and MEMORY_BUDGET and len(level_models) >= MEMORY_LEVEL_MODELS:
+            if not MEMORY_LEVEL_MODELS:
+                report_memory_cap("level_models", f"kein zusätzliches Modell {config[0]}/{config[2]}, das Hauptmodell rechnet")
+                return model
+            evicted, evicted_manager = level_models.popitem(last=False)
+            unload_level_model(evicted_manager)
+            report_memory_cap("level_models", f"Modell {evicted[0]}/{evicted[2]} entladen für {config[0]}/{config[2]}")
+        if manager is None:
+            manager = level_models[config] = ModelManager(
+                [config],
+                model_kwargs=model_manager.model_kwargs,
+                warmup_samples=model_manager.warmup_samples,
+                loader=model_manager.loader,
+                log=debug_print,
+            ).start()
+        level_models.move_to_end(config)
+    return manager.model if manager.ready and manager.model is not None else model
+
+def unload_level_model(manager):
+    """Vergisst ein Stufen-Modell samt Batch-Pipeline - freigegeben ist es, sobald kein Worker es mehr benutzt."""
+    if manager.model is not None:
+        batched_pipelines.pop(id(manager.model), None)
+
+def unload_level_models():
+    """Entlädt alle zusätzlichen Stufen-Modelle (z.B. beim Überschreiten von MEMORY_LIMIT_MB)."""
+    with level_models_lock:
+        managers = list(level_models.values())
+        level_models.clear()
+    for manager in managers:
+        unload_level_model(manager)
+    return len(managers)
+
+# Modell der Überarbeitungs-Stufe - wird erst im Überarbeitungs-Thread geladen (erbt dessen niedrige Priorität)
+refinement_manager = ModelManager(
+    [REFINEMENT_MODEL] if REFINEMENT_MODEL else [],
+    model_kwargs=dict(num_workers=1, cpu_threads=CPU_THREADS),
+    warmup_samples=int(WARMUP_DURATION * RATE),
+    log=debug_print,
+)
+refiner = None # Refiner, wird im Hauptprogramm gestartet
+live_jobs = 0 # Äußerungen, die gerade live transkribiert werden
+live_jobs_lock = threading.Lock()
+line_counter = 0 # Fortlaufende Id der Transkript-Zeilen
+refinements_pending = collections.Counter() # Sprecher-Index -> eingereihte Überarbeitungen
+refinements_lock = threading.Lock()
+
+transcript_writer = None # Schreib-Thread für Text und JSONL, wird von initialize_transcript_file() gestartet
+feature_lock = threading.Lock()
+
+def create_speaker_stream(index, name=""):
+    """Ringpuffer (int16, adressiert über den Sample-Zähler), Pegel, Endpunkterkennung und Stitcher eines Sprechers."""
+    return SpeakerStream(
+        index,
+        name,
+        RATE,
+        audio_buffer=AudioRingBuffer(RING_BUFFER_DURATION * RATE, dtype=np.int16, lock=timed_lock("ring_buffer")),
+        # Lautstärkemesser mit Pegel-Historie (RMS, Spitze, Pegel pro ~64 ms) für den Visualizer
+        volume_meter=VolumeMeter(VOLUME_THRESHOLDS, RATE, history_duration=VOLUME_HISTORY_DURATION),
+        endpointer=UtteranceEndpointer(
+            silence_threshold=VOLUME_THRESHOLDS[0],
+            speech_threshold=ENDPOINT_SPEECH_THRESHOLD,
+            hangover=ENDPOINT_HANGOVER * RATE,
+            min_speech=ENDPOINT_MIN_SPEECH * RATE,
+            max_utterance=BUFFER_DURATION * RATE,
+            pre_roll=ENDPOINT_PRE_ROLL * RATE,
+            cut_search=ENDPOINT_CUT_SEARCH * RATE,
+        ),
+        # Fügt überlappende Fenster ohne doppelte Wörter zusammen
+        stitcher=TranscriptStitcher(),
+    )
+
+# Ein Stream pro Sprecher (Kanal oder Gerät) - ohne Mehrkanal-Aufnahme nur einer
+speaker_streams = [create_speaker_stream(0)]
+speaker_merge = None # TimeOrderedMerge, führt bei mehreren Sprechern die Zeilen nach Sprechzeit zusammen
+speaker_streams_lock = threading.Lock()
+
+def setup_speakers(names):
+    """Legt je Sprecher einen Stream an. Ab zwei Sprechern werden die Zeilen nach Sprechzeit zusammengeführt."""
+    global speaker_streams, speaker_merge
+    speaker_streams = [create_speaker_stream(index, name) for index, name in enumerate(names)]
+    speaker_merge = TimeOrderedMerge(len(names), publish_line) if len(names) > 1 else None
+    debug_print(f"{len(names)} Sprecher: {', '.join(names)}")
+    return speaker_streams
+
+def add_speaker_stream(name):
+    """Legt zur Laufzeit einen weiteren Sprecher an (z.B. je Verbindung des Stream-Servers).
+
+    Der Platz eines beendeten Sprechers wird wiederverwendet, sobald keine Überarbeitung mehr auf ihn wartet -
+    so wächst speaker_streams bei einem lange laufenden Server nicht mit jeder Verbindung.
+    Ohne speaker_merge: Die Zeilen jedes Sprechers bleiben in Reihenfolge, untereinander gilt die Auftragsreihenfolge.
+    """
+    with speaker_streams_lock, refinements_lock:
+        index = next((stream.index for stream in speaker_streams
+                      if stream.released and not refinements_pending[stream.index]), len(speaker_streams))
+        stream = create_speaker_stream(index, name)
+        if index < len(speaker_streams):
+            speaker_streams[index] = stream
+        else:
+            speaker_streams.append(stream)
+    if audio_archive_dir is not None:
+        start_stream_archiver(stream)
+    return stream
+
+def release_speaker_stream(stream):
+    """Ersetzt einen beendeten Sprecher durch einen Platzhalter - erst, wenn alle seine Äußerungen ein Ergebnis haben.
+
+    Der Platzhalter behält Index, Name und Uhr für wartende Überarbeitungen, alles andere wird freigegeben
+    und die Archiv-Session des Sprechers abgeschlossen (blockiert, bis sie geschrieben ist).
+    add_speaker_stream() vergibt den Platz neu, sobald diese erledigt sind.
+    Auch die Metriken des Sprechers verschwinden, damit die Labels nicht mit jeder Verbindung mehr werden.
+    """
+    with speaker_streams_lock:
+        speaker_streams[stream.index] = ReleasedSpeakerStream(stream)
+    close_stream_archiver(stream)
+    transcript_latency.remove(speaker=speaker_label(stream))
+
+def apply_memory_budget():
+    """Begrenzt mit MEMORY_BUDGET die Ringpuffer - vor setup_speakers() und dem Start der Aufnahme aufrufen.
+
+    Merkmale und VAD übernehmen die Kapazität des Ringpuffers, bereits angelegte leere Ringpuffer werden ersetzt.
+    """
+    global RING_BUFFER_DURATION
+    if not MEMORY_BUDGET:
+        return
+    # Ein zusammengelegtes Fenster samt Überlappung muss immer hineinpassen
+    limit = max(MEMORY_RING_BUFFER_DURATION, MAX_COALESCED_DURATION + OVERLAP_DURATION)
+    if RING_BUFFER_DURATION <= limit:
+        return
+    report_memory_cap("ring_buffer", f"Ringpuffer je Sprecher auf {limit}s begrenzt (statt {RING_BUFFER_DURATION}s)")
+    RING_BUFFER_DURATION = limit
+    resize_empty_rings()
+
+def configure_ring_buffer(workers=TRANSCRIPTION_WORKERS, batch_size=1, processes=0):
+    """Richtet RING_BUFFER_DURATION nach der Laufzeit-Konfiguration aus (--workers, --batch, --processes).
+
+    Vor setup_speakers() bzw. add_speaker_stream() aufrufen. Mit MEMORY_BUDGET gilt danach dessen Obergrenze.
+    """
+    global RING_BUFFER_DURATION
+    RING_BUFFER_DURATION = ring_buffer_duration(workers, batch_size, processes)
+    apply_memory_budget()
+    resize_empty_rings()
+    debug_print(f"Ringpuffer je Sprecher: {RING_BUFFER_DURATION}s")
+
+def resize_empty_rings():
+    """Ersetzt noch leere Ringpuffer in der Größe RING_BUFFER_DURATION.
+
+    Merkmale und VAD entstehen erst beim Start der Aufnahme und übernehmen die Größe von selbst.
+    """
+    for stream in speaker_streams:
+        if stream.released or stream.audio_buffer.total_written != 0:
+            continue
+        if stream.audio_buffer.capacity != RING_BUFFER_DURATION * RATE:
+            stream.audio_buffer = AudioRingBuffer(RING_BUFFER_DURATION * RATE, dtype=np.int16, lock=timed_lock("ring_buffer"))
+
+def merge_utterances(pending, utterance):
+    """Legt zwei wartende Äußerungen desselben Sprechers zu einem Fenster zusammen, solange es nicht zu lang wird."""
+    if utterance.stream != pending.stream or utterance.end_sample - pending.start_sample > MAX_COALESCED_DURATION * RATE:
+        return None
+    speaker_streams[utterance.stream].utterance_finished(utterance.start_sample)
+    return pending._replace(end_sample=utterance.end_sample, forced=utterance.forced)
+
+def report_dropped_utterance(seq, utterance):
+    """Hält verworfene Äußerungen im Transkript fest, statt sie stillschweigend zu verlieren."""
+    duration = (utterance.end_sample - utterance.start_sample) / RATE
+    debug_print(f"WARNUNG: Äußerung #{seq} ({duration:.1f}s) verworfen - Transkription überlastet")
+    transcript_order.submit(seq, (utterance, f"[{duration:.1f}s Audio nicht transkribiert - Transkription überlastet]"))
+
+utterance_queue = BoundedWorkQueue(
+    WORK_QUEUE_SIZE,
+    policy=BACKPRESSURE_POLICY,
+    merge=merge_utterances,
+    on_drop=report_dropped_utterance,
+    lock=timed_lock("utterance_queue"),
+)
+
+def calculate_volume_level(audio_data, stream=None):
+    """Berechnet den Lautstärkepegel von Audio-Daten und gibt (Pegel 0-4, RMS) zurück."""
+    return (stream or speaker_streams[0]).volume_meter.update(audio_data)
+
+def get_current_volume_level(stream_index=0):
+    """Gibt den aktuellen Lautstärkepegel eines Sprechers zurück (ohne Lock, für häufiges Abfragen geeignet)."""
+    return speaker_streams[stream_index].volume_meter.level
+
+def get_current_speech_probability(stream_index=0):
+    """Sprachwahrscheinlichkeit des zuletzt vom VAD bewerteten Frames eines Sprechers (None ohne VAD)."""
+    vad = speaker_streams[stream_index].vad
+    return vad.probability if vad is not None else None
+
+# Callbacks listener(text, audio_end) für jede geschriebene Zeile - audio_end in Sekunden, None bei Hinweiszeilen
+transcript_listeners = []
+# Callbacks listener(event) mit Zwischenergebnissen, fertigen und überarbeiteten Zeilen als dict (z.B. Stream-Server)
+event_listeners = []
+
+def notify(event_type, stream, **fields):
+    """Meldet ein Ereignis eines Sprechers an alle event_listeners (aufgerufen aus Worker- und Aufnahme-Threads)."""
+    event = {"type": event_type, "stream": stream.index, "speaker": stream.name, **fields}
+    for listener in event_listeners:
+        listener(event)
+
+def emit_transcript(seq, job):
+    """Übernimmt fertige Ergebnisse in Audio-Reihenfolge, egal welcher Worker zuerst fertig war.
+
+    job ist (Äußerung, Ergebnis). Bei mehreren Sprechern wartet die Zeile in speaker_merge, bis
+    kein anderer Sprecher mehr eine frühere liefern kann.
+    """
+    utterance, result = job
+    stream = speaker_streams[utterance.stream]
+    line = None
+    if isinstance(result, WindowResult):
+        committed = stream.stitcher.process(result.words, result.window_start, result.stable_until)
+        if committed:
+            line = (words_to_text(committed), committed, result, result.window_end)
+        if event_listeners:
+            # Wörter der Überlappung, die erst das nächste Fenster bestätigt
+            pending = stream.stitcher.pending_words()
+            if pending:
+                notify("partial", stream, text=words_to_text(pending), start=pending[0].start, end=pending[-1].end)
+    elif result:
+        line = (result, None, None, None) # Hinweiszeile (z.B. verworfenes Audio)
+    if line is not None and speaker_merge is None:
+        publish_line(stream.index, line)
+    elif line is not None:
+        start = line[1][0].start if line[1] else utterance.start_sample / RATE
+        speaker_merge.push(stream.index, stream.wall_time(start), line)
+    stream.utterance_finished(utterance.start_sample)
+    if speaker_merge is not None:
+        speaker_merge.advance(stream.index, stream.watermark())
+
+def publish_line(stream_index, line):
+    """Schreibt eine fertige Zeile eines Sprechers ins Transkript und meldet sie an Überarbeitung und Listener."""
+    stream = speaker_streams[stream_index]
+    text, words, result, audio_end = line
+    line_id = write_to_transcript(text, words, result, stream)
+    if words:
+        submit_refinement(line_id, words, text, stream)
+    if event_listeners:
+        notify("final", stream, line_id=line_id, text=text, start=words[0].start if words else None,
+               end=words[-1].end if words else None)
+    for listener in transcript_listeners:
+        listener(text, audio_end)
+
+def flush_stream(stream):
+    """Übernimmt die noch vorläufigen Wörter der letzten Überlappung eines Sprechers."""
+    words = stream.stitcher.flush()
+    if not words:
+        return
+    line = (words_to_text(words), words, None, None)
+    if speaker_merge is None:
+        publish_line(stream.index, line)
     else:
-        new_level = 0  # Stille
-    
-    # Thread-sichere Aktualisierung der globalen Variable
-    with volume_lock:
-        current_volume_level = new_level
-    
-    return new_level, rms
+        speaker_merge.push(stream.index, stream.wall_time(words[0].start), line)
 
-def get_current_volume_level():
-    """Gibt den aktuellen Lautstärkepegel thread-sicher zurück."""
-    with volume_lock:
-        return current_volume_level
+def flush_transcript():
+    """Übernimmt die noch vorläufigen Wörter der letzten Überlappung ins Transkript."""
+    for stream in speaker_streams:
+        if not stream.released:
+            flush_stream(stream)
+    if speaker_merge is not None:
+        speaker_merge.flush()
 
-def write_to_transcript(text):
-    """Schreibt den transkribierten Text in die transcript.txt Datei."""
-    with file_lock:
-        try:
-            with open(TRANSCRIPT_FILE, "a", encoding="utf-8") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"[{timestamp}] {text}\n")
-                f.flush()  # Sofort in die Datei schreiben
-            debug_print(f"Text gespeichert: {text}")
-            print(f"[{timestamp}] Text gespeichert: {text}")
-        except Exception as e:
-            debug_print(f"Fehler beim Schreiben in die Datei: {e}")
+transcript_order = ReorderBuffer(emit_transcript, lock=timed_lock("transcript_order"))
+
+# Zustände, die erst beim Auslesen der Metriken abgefragt werden - im Betrieb kosten sie nichts
+metrics.gauge("stt_queue_depth", "Wartende Äußerungen", callback=lambda: utterance_queue.qsize())
+metrics.gauge("stt_queue_capacity", "Plätze der Warteschlange", callback=lambda: utterance_queue.maxsize)
+metrics.counter("stt_queue_coalesced_total", "Zusammengelegte Äußerungen", callback=lambda: utterance_queue.coalesced)
+metrics.counter("stt_queue_dropped_total", "Verworfene Äußerungen", callback=lambda: utterance_queue.dropped)
+metrics.gauge("stt_results_waiting", "Fertige Ergebnisse, die auf einen Vorgänger warten",
+              callback=lambda: transcript_order.pending_count())
+metrics.gauge("stt_ring_buffer_seconds", "Audio im Ringpuffer", ["speaker"],
+              callback=lambda: {(speaker_label(stream),): len(stream.audio_buffer) / RATE for stream in speaker_streams
+                                if not stream.released})
+metrics.counter("stt_ring_buffer_underruns_total", "Fenster, die vor dem Lesen überschrieben wurden", ["speaker"],
+                callback=lambda: {(speaker_label(stream),): stream.audio_buffer.underruns for stream in speaker_streams
+                                  if not stream.released})
+metrics.gauge("stt_scheduler_level", "Qualitätsstufe des Schedulers (0 = beste)", callback=lambda: scheduler.level_index)
+metrics.counter("stt_windows_skipped_total", "Fenster ohne Sprache, die nicht transkribiert wurden",
+                callback=lambda: scheduler.skipped)
+metrics.counter("stt_windows_transcribed_total", "Transkribierte Fenster", callback=lambda: scheduler.transcribed)
+metrics.gauge("stt_vad_lag_seconds", "Aufgenommenes Audio, das der VAD noch nicht bewertet hat", ["speaker"],
+              callback=lambda: {(speaker_label(stream),): (stream.audio_buffer.total_written - stream.vad.samples_done) / RATE
+                                for stream in speaker_streams if stream.vad is not None})
+metrics.counter("stt_vad_cpu_seconds_total", "Rechenzeit des Streaming-VAD", ["speaker"],
+                callback=lambda: {(speaker_label(stream),): stream.vad.seconds for stream in speaker_streams
+                                  if stream.vad is not None})
+
+def dispatch_utterance(utterance):
+    """Reiht eine fertige Äußerung zur Transkription ein (blockiert nur bei BACKPRESSURE_POLICY="block")."""
+    stream = speaker_streams[utterance.stream]
+    # Nach einem erzwungenen Schnitt etwas Kontext aus der vorherigen Äußerung mitnehmen
+    previous = stream.last_dispatched
+    stream.last_dispatched = utterance
+    if previous is not None and previous.forced and previous.end_sample == utterance.start_sample:
+        utterance = utterance._replace(start_sample=utterance.start_sample - OVERLAP_DURATION * RATE)
+    stream.utterance_started(utterance.start_sample)
+    seq = utterance_queue.put(utterance)
+    if DEBUG:
+        debug_print(f"Äußerung #{seq} eingereiht: {(utterance.end_sample - utterance.start_sample)/RATE:.2f}s "
+                    f"(Warteschlange: {utterance_queue.qsize()}/{WORK_QUEUE_SIZE})")
+
+def transcript_records(words, result=None, line_id=None, revision=0, stream=None):
+    """JSONL-Einträge pro Segment: Zeilen-Id und Fassung, Sprecher, Audio-Zeit, Whisper-Kennzahlen und Latenz."""
+    stream = stream or speaker_streams[0]
+    segments = result.segments if result is not None else []
+    latency = time.time() - stream.wall_time(result.window_end) if result is not None else None
+    records = []
+    for segment, segment_words in group_words_by_segment(words, segments):
+        record = {
+            "type": "segment",
+            "id": line_id,
+            "revision": revision,
+            "start": round(segment_words[0].start, 3),
+            "end": round(segment_words[-1].end, 3),
+            "time": datetime.fromtimestamp(stream.wall_time(segment_words[0].start)).isoformat(timespec="milliseconds"),
+            "text": words_to_text(segment_words),
+            "avg_logprob": segment.avg_logprob if segment is not None else None,
+            "no_speech_prob": segment.no_speech_prob if segment is not None else None,
+            "inference_seconds": round(result.inference_seconds, 3) if result is not None else None,
+            "latency_seconds": round(latency, 3) if latency is not None else None,
+        }
+        if stream.name:
+            record["speaker"] = stream.name
+        records.append(record)
+    return records
+
+def transcript_line(timestamp, text, stream):
+    """Textzeile mit Uhrzeit und - bei mehreren Sprechern - dem Namen des Sprechers."""
+    return f"[{timestamp}] {stream.name}: {text}" if stream.name else f"[{timestamp}] {text}"
+
+def write_to_transcript(text, words=None, result=None, stream=None):
+    """Übergibt eine Zeile an den Transkript-Schreiber (Text mit Sprechzeit, dazu JSONL pro Segment).
+
+    Ohne Wörter ist es eine Hinweiszeile, sie bekommt die aktuelle Uhrzeit.
+    Gibt die Id der Zeile zurück, unter der sie später überarbeitet werden kann.
+    """
+    global line_counter
+    stream = stream or speaker_streams[0]
+    line_counter += 1
+    line_id = line_counter
+    if words:
+        timestamp = datetime.fromtimestamp(stream.wall_time(words[0].start)).strftime("%H:%M:%S")
+        records = transcript_records(words, result, line_id, stream=stream)
+    else:
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        records = [{"type": "marker", "time": datetime.now().isoformat(timespec="milliseconds"), "text": text}]
+    line = transcript_line(timestamp, text, stream)
+    if transcript_writer is not None:
+        transcript_writer.write(line, records, line_id)
+    if result is not None:
+        transcript_latency.observe(time.time() - stream.wall_time(result.window_end), speaker=speaker_label(stream))
+    debug_print(f"Text gespeichert: {text}")
+    print(f"{line}" if stream.name else f"[{timestamp}] Text gespeichert: {text}")
+    return line_id
+
+def live_job_started():
+    global live_jobs
+    with live_jobs_lock:
+        live_jobs += 1
+
+def live_job_finished():
+    global live_jobs
+    with live_jobs_lock:
+        live_jobs -= 1
+
+def live_path_idle():
+    """True, wenn keine Äußerung wartet oder gerade live transkribiert wird."""
+    return utterance_queue.qsize() == 0 and live_jobs == 0
+
+def submit_refinement(line_id, words, text, stream):
+    """Reiht eine Entwurfszeile mit einer Kopie ihres Audios (int16) zur Überarbeitung ein."""
+    prompt, stream.last_line_text = stream.last_line_text, text
+    if refiner is None or not words:
+        return
+    start, end = words[0].start, words[-1].end
+    oldest_sample, newest_sample = stream.audio_buffer.available_range()
+    start_sample = max(int((start - REFINEMENT_MARGIN) * RATE), oldest_sample)
+    end_sample = min(int((end + REFINEMENT_MARGIN) * RATE), newest_sample)
+    try:
+        audio = stream.audio_buffer.read(start_sample, end_sample, dtype=np.int16)
+    except ValueError as e:
+        debug_print(f"Zeile {line_id} wird nicht überarbeitet: {e}")
+        return
+    with refinements_lock:
+        refinements_pending[stream.index] += 1
+    refiner.submit(RefinementJob(line_id, start, end, start_sample / RATE, audio, text, prompt, stream.index))
+
+def refinement_done(job):
+    """Zählt eine erledigte (oder verworfene) Überarbeitung - danach darf der Platz des Sprechers neu vergeben werden."""
+    with refinements_lock:
+        refinements_pending[job.stream] -= 1
+        if refinements_pending[job.stream] <= 0:
+            del refinements_pending[job.stream]
+
+def refine_line(job):
+    """Dekodiert eine Entwurfszeile mit dem Überarbeitungs-Modell und ersetzt sie, falls sich der Text ändert."""
+    model = refinement_manager.get()
+    audio_np = np.multiply(job.audio, np.float32(1.0 / 32768.0), dtype=np.float32)
+    inference_start = time.perf_counter()
+    segments, _ = model.transcribe(
+        audio_np,
+        beam_size=REFINEMENT_BEAM_SIZE,
+        language="de",
+        initial_prompt=job.prompt or INITIAL_PROMPT,
+        word_timestamps=True,
+        vad_filter=False,
+    )
+    segments = list(segments)
+    inference_seconds = time.perf_counter() - inference_start
+    # Nur die Wörter der Zeile - der Rand gehört zu den Nachbarzeilen
+    words = [word for word in words_from_segments(segments, job.audio_start)
+             if job.start <= (word.start + word.end) / 2 <= job.end]
+    text = words_to_text(words)
+    if not text or text == job.draft:
+        return False
+    result = WindowResult(words, job.audio_start, job.audio_start + len(job.audio) / RATE, None,
+                          segments_info(segments, job.audio_start), inference_seconds)
+    stream = speaker_streams[job.stream]
+    timestamp = datetime.fromtimestamp(stream.wall_time(words[0].start)).strftime("%H:%M:%S")
+    if transcript_writer is not None:
+        transcript_writer.revise(job.line_id, transcript_line(timestamp, text, stream),
+                                 transcript_records(words, result, job.line_id, revision=1, stream=stream))
+    if event_listeners:
+        notify("revision", stream, line_id=job.line_id, text=text, start=words[0].start, end=words[-1].end)
+    debug_print(f"Text überarbeitet (Zeile {job.line_id}): {job.draft!r} -> {text!r}")
+    return True
+
+def start_refiner():
+    """Startet die Überarbeitungs-Stufe (nur mit REFINEMENT_MODEL)."""
+    global refiner
+    if not REFINEMENT_MODEL:
+        return None
+    refiner = Refiner(refine_line, live_path_idle, maxsize=REFINEMENT_QUEUE_SIZE, on_done=refinement_done,
+                      log=debug_print).start()
+    debug_print(f"Überarbeitung mit {REFINEMENT_MODEL[0]}/{REFINEMENT_MODEL[2]} gestartet.")
+    return refiner
+
+def transcript_header(continuation):
+    start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if continuation:
+        return f"=== Fortsetzung der Transkriptions-Session am {start_time} ===\n\n"
+    return f"=== Transkriptions-Session gestartet am {start_time} ===\n\n"
 
 def initialize_transcript_file():
-    """Initialisiert die Transkript-Datei mit einem Header."""
-    with open(TRANSCRIPT_FILE, "w", encoding="utf-8") as f:
-        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"=== Transkriptions-Session gestartet am {start_time} ===\n\n")
+    """Legt die Transkript-Dateien mit Header an und startet den Schreib-Thread."""
+    global transcript_writer
+    store = None
+    if TRANSCRIPT_STORE_FILE:
+        try:
+            store = TranscriptStore(TRANSCRIPT_STORE_FILE)
+        except Exception as e:
+            debug_print(f"Transkript-Archiv '{TRANSCRIPT_STORE_FILE}' nicht verfügbar: {e}")
+    transcript_writer = TranscriptWriter(
+        TRANSCRIPT_FILE,
+        TRANSCRIPT_JSONL_FILE,
+        flush_interval=TRANSCRIPT_FLUSH_INTERVAL,
+        fsync_interval=TRANSCRIPT_FSYNC_INTERVAL,
+        rotate_bytes=TRANSCRIPT_ROTATE_BYTES,
+        rotate_interval=TRANSCRIPT_ROTATE_INTERVAL,
+        header=transcript_header,
+        store=store,
+        max_lines=MEMORY_TRANSCRIPT_LINES if MEMORY_BUDGET else TRANSCRIPT_MAX_LINES,
+        on_limit=lambda frozen: report_memory_cap(
+            "transcript_lines", f"nur die letzten {MEMORY_TRANSCRIPT_LINES} Zeilen bleiben im Speicher und überarbeitbar")
+            if MEMORY_BUDGET else None,
+        rewrite_interval=TRANSCRIPT_REWRITE_INTERVAL,
+        log=debug_print,
+    )
+    transcript_writer.start()
     debug_print(f"Transkript-Datei '{TRANSCRIPT_FILE}' initialisiert.")
 
-def record_audio():
-    """Nimmt Audio vom Mikrofon auf und fügt es dem Puffer hinzu."""
+def close_transcript_file():
+    """Schreibt den Ende-Marker, bringt alle Zeilen auf die Platte und beendet den Schreib-Thread."""
+    global transcript_writer
+    if transcript_writer is None:
+        return
+    end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    transcript_writer.close(footer=f"\n=== Session beendet am {end_time} ===")
+    transcript_writer = None
+
+vad_session = None # ONNX-Sitzung des Silero-VAD, von allen Sprechern geteilt (False = nicht verfügbar)
+vad_worker = None # VADWorker, bewertet neues Audio aller Sprecher im Hintergrund
+vad_lock = threading.Lock() # Sitzung und Worker nur einmal anlegen - Aufnahme-Threads starten gleichzeitig
+
+def create_vad():
+    """Streaming-VAD eines Sprechers mit der Kapazität des Ringpuffers - None, wenn Silero nicht verfügbar ist."""
+    global vad_session
+    with vad_lock:
+        if vad_session is None:
+            try:
+                vad_session = load_silero_session()
+            except Exception as e:
+                debug_print(f"Streaming-VAD nicht verfügbar: {e}")
+                vad_session = False
+    if not vad_session:
+        return None
+    return StreamingVAD(vad_session, RING_BUFFER_DURATION * RATE)
+
+def start_vad_worker():
+    """Startet den VAD-Thread für alle Sprecher (einmal)."""
+    global vad_worker
+    with vad_lock:
+        if vad_worker is None:
+            vad_worker = VADWorker(lambda: [(stream.vad, stream.audio_buffer) for stream in speaker_streams
+                                            if stream.vad is not None], log=debug_print).start()
+    return vad_worker
+
+def utterance_speech(utterance):
+    """Sprachabschnitte einer Äußerung laut Streaming-VAD als absolute Sample-Bereiche.
+
+    None, wenn es für den Sprecher keinen VAD gibt oder er nicht innerhalb von VAD_WAIT aufholt.
+    """
+    vad = speaker_streams[utterance.stream].vad
+    if vad is None or not vad.wait(utterance.end_sample, VAD_WAIT):
+        return None
+    return vad.speech_spans(utterance.start_sample, utterance.end_sample, VAD_THRESHOLD,
+                            VAD_MIN_SILENCE * RATE, VAD_SPEECH_PAD * RATE, VAD_MIN_SPEECH * RATE, VAD_MAX_SPEECH * RATE)
+
+def clamp_speech(speech, window_start, window_end):
+    """Beschneidet Sprachabschnitte auf [window_start, window_end) und lässt leere weg (None bleibt None).
+
+    read_window() kann den Fensteranfang nach vorn schieben, wenn der Anfang schon überschrieben ist.
+    """
+    if speech is None:
+        return None
+    spans = [(max(start, window_start), min(end, window_end)) for start, end in speech]
+    return [(start, end) for start, end in spans if start < end]
+
+def window_speech_fraction(audio_np, window_start, window_end, speech):
+    """Sprachanteil eines Fensters: aus den VAD-Abschnitten, ohne VAD aus dem Pegel der Chunks."""
+    if speech is None:
+        return speech_fraction(audio_np, ENDPOINT_SPEECH_THRESHOLD, CHUNK_SIZE)
+    covered = sum(max(0, min(end, window_end) - max(start, window_start)) for start, end in speech)
+    return covered / max(1, window_end - window_start)
+
+def create_feature_stream():
+    """Streaming-log-Mel mit derselben Filterbank wie faster-whisper, Kapazität wie der Ringpuffer."""
+    try:
+        from faster_whisper.feature_extractor import FeatureExtractor
+    except ImportError as e:
+        debug_print(f"Vorberechnete Merkmale nicht verfügbar: {e}")
+        return None
+    extractor = FeatureExtractor(feature_size=FEATURE_MELS, sampling_rate=RATE)
+    capacity = RING_BUFFER_DURATION * RATE // extractor.hop_length
+    return StreamingMelExtractor(extractor.mel_filters, capacity, extractor.n_fft, extractor.hop_length)
+
+def prepare_features(model, window_start, window_end, audio_np, stream):
+    """Hinterlegt die vorberechneten Merkmale des Fensters für den nächsten transcribe()-Aufruf dieses Threads."""
+    stream = stream.feature_stream
+    extractor = getattr(model, "feature_extractor", None)
+    if stream is None or extractor is None or extractor.mel_filters.shape[0] != stream.n_mels:
+        return None
+    if not isinstance(extractor, PrecomputedFeatureExtractor):
+        with feature_lock:
+            if not isinstance(model.feature_extractor, PrecomputedFeatureExtractor):
+                model.feature_extractor = PrecomputedFeatureExtractor(model.feature_extractor)
+            extractor = model.feature_extractor
+    features = stream.window_features(window_start, window_end, audio_np)
+    if features is None:
+        return None
+    extractor.prepare(features)
+    return extractor
+
+audio_archive_dir = None # Verzeichnis des laufenden Audio-Archivs, auch für später angelegte Sprecher
+
+def start_audio_archive(directory):
+    """Startet das Audio-Archiv (eine Session je Sprecher) - vor der Aufnahme, damit es bei Sample 0 beginnt.
+
+    Sprecher, die danach mit add_speaker_stream() dazukommen, bekommen ihre Session beim Anlegen.
+    """
+    global audio_archive_dir
+    os.makedirs(directory, exist_ok=True)
+    audio_archive_dir = directory
+    started = time.time()
+    for stream in speaker_streams:
+        start_stream_archiver(stream, started)
+
+def start_stream_archiver(stream, started=None):
+    stream.archiver = AudioArchiver(
+        audio_archive_dir,
+        RATE,
+        chunk_duration=AUDIO_ARCHIVE_CHUNK_DURATION,
+        max_bytes=AUDIO_ARCHIVE_MAX_BYTES,
+        max_age=AUDIO_ARCHIVE_MAX_AGE,
+        log=debug_print,
+    ).start(started, name=stream.name)
+    debug_print(f"Audio-Archiv: '{stream.archiver.directory}'")
+
+def close_stream_archiver(stream):
+    if stream.archiver is None:
+        return
+    stream.archiver.close()
+    if stream.archiver.dropped_samples:
+        debug_print(f"WARNUNG: {stream.archiver.dropped_samples / RATE:.1f}s Audio nicht archiviert "
+                    f"(als Stille aufgefüllt)")
+    stream.archiver = None
+
+def close_audio_archive():
+    global audio_archive_dir
+    audio_archive_dir = None
+    for stream in speaker_streams:
+        close_stream_archiver(stream)
+
+def record_audio(source=None, streams=None):
+    """Nimmt Audio von der Quelle (Standard: Mikrofon) auf und fügt es den Puffern der Sprecher hinzu.
+
+    Kanal i der Quelle gehört zu streams[i] (Standard: alle Sprecher) - mehrere Geräte laufen
+    in je einem eigenen Aufnahme-Thread mit einem Stream. Bei nur einem Stream werden alle Kanäle
+    der Quelle gemischt. Quellen mit anderer Rate werden blockweise auf RATE umgerechnet.
+    """
+    streams = streams or speaker_streams
     debug_print("Starte Audio-Aufnahme Thread...")
     
-    p = pyaudio.PyAudio()
+    if source is None:
+        source = MicrophoneSource(CAPTURE_RATE, len(streams) if len(streams) > 1 else None, CHUNK_SIZE)
+    # Vor dem Öffnen der Quelle, damit kein Audio liegen bleibt; die Frames zählen ab Sample 0 des Ringpuffers
+    for stream in streams:
+        if PRECOMPUTED_FEATURES and stream.audio_buffer.total_written == 0:
+            stream.feature_stream = create_feature_stream()
+        if STREAMING_VAD and stream.vad is None and stream.audio_buffer.total_written == 0:
+            stream.vad = create_vad()
+    if any(stream.vad is not None for stream in streams):
+        start_vad_worker()
+    source.open()
+    clock_start = time.time()
+    for stream in streams:
+        stream.clock_start = clock_start
     
     # Debug: Zeige ausgewähltes Gerät
-    default_input = p.get_default_input_device_info()
-    debug_print(f"Verwende Eingabegerät: {default_input['name']}")
-    debug_print(f"Standard Sample Rate: {default_input['defaultSampleRate']}")
-    
-    stream = p.open(format=AUDIO_FORMAT,
-                    channels=CHANNELS,
-                    rate=RATE,
-                    input=True,
-                    frames_per_buffer=CHUNK_SIZE)
+    debug_print(f"Verwende Eingabegerät: {source.device_name}")
+    debug_print(f"Standard Sample Rate: {source.default_sample_rate}")
+    if source.channels != len(streams) and len(streams) > 1:
+        source.close()
+        raise ValueError(f"Quelle liefert {source.channels} Kanäle, erwartet {len(streams)} (ein Kanal je Sprecher)")
+    # Native Rate und Kanäle der Quelle: blockweise mischen und auf RATE umrechnen
+    converter = None
+    if source.rate != RATE or source.channels != len(streams):
+        converter = InputConverter(source.rate, source.channels, RATE, mix=len(streams) == 1)
+        debug_print(f"Umrechnung {source.rate} Hz / {source.channels} Kanal/Kanäle -> {RATE} Hz / {len(streams)}")
+    # Gleiche Chunk-Dauer wie bei RATE
+    chunk_frames = max(1, CHUNK_SIZE * source.rate // RATE)
 
     debug_print("Audio-Stream geöffnet. Beginne Aufnahme...")
     print("Starte Audioaufnahme. Sprechen Sie jetzt...")
@@ -140,136 +904,587 @@ def record_audio():
     volume_debug_counter = 0
     try:
         while True:
-            data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+            read_start = time.perf_counter()
+            data = source.read(chunk_frames)
+            process_start = time.perf_counter()
+            chunk_read_time.observe(process_start - read_start)
+            if not data:
+                debug_print("Ende der Audio-Quelle erreicht.")
+                break
+            if converter is not None:
+                channels = converter.process(data).T
+                if not channels.shape[1]:
+                    continue
+            elif len(streams) == 1:
+                channels = (data,)
+            else:
+                # Kanäle ohne Kopie trennen: jede Zeile der Transponierten ist eine Sicht mit Schrittweite
+                channels = np.frombuffer(data, dtype=np.int16).reshape(-1, len(streams)).T
+            
+            # Eingangs-Überläufe sichtbar machen statt sie stillschweigend zu übergehen. Die Daten des Chunks
+            # sind gültig, nur die von PortAudio verworfenen Frames fehlen - der Sample-Zähler hinkt der Uhr nach
+            overflows = getattr(source, "overflows", 0)
+            overflowed = overflows != streams[0].audio_buffer.overflows
+            if overflowed:
+                input_overflows.inc(overflows - streams[0].audio_buffer.overflows)
+                for stream in streams:
+                    stream.audio_buffer.overflows = overflows
+                debug_print(f"WARNUNG: Eingangs-Überlauf - Audio verloren ({overflows} insgesamt)")
             
-            # Berechne Lautstärkepegel für diesen Chunk
-            volume_level, rms_value = calculate_volume_level(data)
+            levels = []
+            for stream, samples in zip(streams, channels):
+                # Berechne Lautstärkepegel für diesen Chunk
+                volume_level, rms_value = calculate_volume_level(samples, stream)
+                levels.append((stream, volume_level, rms_value))
+                
+                # Schreibt direkt in den vorab reservierten Ringpuffer
+                end_sample = stream.audio_buffer.write(samples)
+                # log-Mel der neuen Samples - beim Transkribieren wird nur noch zusammengesetzt
+                if stream.feature_stream is not None:
+                    stream.feature_stream.process(samples)
+                # Audio-Uhr nachführen, falls die Quelle schneller als Echtzeit liefert (z.B. WAV-Wiedergabe),
+                # nach einem Überlauf neu ansetzen - die verlorenen Frames fehlen im Sample-Zähler
+                anchor = time.time() - end_sample / RATE
+                stream.clock_start = anchor if overflowed else min(stream.clock_start, anchor)
+                # Kopie für das Archiv - geschrieben wird im Archiv-Thread
+                if stream.archiver is not None:
+                    stream.archiver.write(samples, end_sample, stream.wall_time(end_sample / RATE))
+                
+                # Fertige Äußerungen sofort an die Transkription übergeben
+                utterance = stream.endpointer.process(rms_value, end_sample)
+                if utterance is not None:
+                    dispatch_utterance(utterance._replace(stream=stream.index))
+                stream.capture_mark = stream.endpointer.open_start
+                if speaker_merge is not None:
+                    speaker_merge.advance(stream.index, stream.watermark())
+            # Neues Audio für den VAD - bewertet wird in dessen Thread
+            if vad_worker is not None:
+                vad_worker.notify()
+            chunk_counter += 1
             volume_debug_counter += 1
+            chunk_process_time.observe(time.perf_counter() - process_start)
             
             # Debug: Zeige Lautstärke alle 25 Chunks (ca. alle 1,6 Sekunden bei 16kHz)
-            if volume_debug_counter % 25 == 0:
+            if DEBUG and volume_debug_counter % 25 == 0:
                 level_names = ["STILLE", "LEISE", "NORMAL", "LAUT", "SEHR LAUT"]
-                debug_print(f"Lautstärkepegel: {volume_level} ({level_names[volume_level]}) - RMS: {rms_value:.4f}")
+                for stream, volume_level, rms_value in levels:
+                    speaker = f" {stream.name}" if stream.name else ""
+                    debug_print(f"Lautstärkepegel{speaker}: {volume_level} ({level_names[volume_level]}) - RMS: {rms_value:.4f}")
             
-            with buffer_lock:
-                audio_buffer.append(data)
-                chunk_counter += 1
-                
-                # Debug: Zeige Puffer-Status alle 50 Chunks
-                if chunk_counter % 50 == 0:
-                    debug_print(f"Chunk {chunk_counter} hinzugefügt. Puffer-Größe: {len(audio_buffer)}")
-                
-                # FIXED: Verwende math.ceil für korrekte Chunk-Anzahl
-                max_chunks = math.ceil(BUFFER_DURATION * RATE / CHUNK_SIZE)
-                while len(audio_buffer) > max_chunks:
-                    audio_buffer.popleft()
+            # Debug: Zeige Puffer-Status alle 50 Chunks
+            if DEBUG and chunk_counter % 50 == 0:
+                debug_print(f"Chunk {chunk_counter} hinzugefügt. Puffer-Füllstand: {len(streams[0].audio_buffer)} samples")
                     
     except KeyboardInterrupt:
         debug_print("Audio-Aufnahme durch Benutzer beendet.")
         print("Audioaufnahme beendet.")
     finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
+        for stream in streams:
+            utterance = stream.endpointer.flush()
+            if utterance is not None:
+                dispatch_utterance(utterance._replace(stream=stream.index))
+            stream.capture_mark = float("inf") # Keine neuen Äußerungen mehr
+            if speaker_merge is not None:
+                speaker_merge.advance(stream.index, stream.watermark())
+        source.close()
         debug_print("Audio-Resources freigegeben.")
 
-def transcribe_audio():
-    """Transkribiert den Audio-Puffer in regelmäßigen Abständen und schreibt in Datei."""
-    global transcribing
-    debug_print("Starte Transkriptions-Thread...")
-    
-    transcription_counter = 0
-    
-    while True:
-        # Reduzierte Überprüfungsfrequenz für längere Chunks
-        time.sleep(BUFFER_DURATION - OVERLAP_DURATION) # Überprüfe alle 6 Sekunden (8-2)
-        transcription_counter += 1
-        debug_print(f"Transkriptions-Check #{transcription_counter}")
-        
-        if transcribing:
-            debug_print("Transkription bereits aktiv, überspringe...")
-            continue
+def read_window(utterance):
+    """Liest das Fenster einer Äußerung aus dem Ringpuffer ihres Sprechers.
 
-        with buffer_lock:
-            # FIXED: Berechne required_bytes basierend auf tatsächlichen Chunks
-            max_chunks = math.ceil(BUFFER_DURATION * RATE / CHUNK_SIZE)
-            required_buffer_length_bytes = max_chunks * CHUNK_SIZE * 2  # 2 bytes per sample
-            
-            current_buffer_length_bytes = sum(len(chunk) for chunk in audio_buffer)
+    Gibt (window_start, window_end, audio_np) oder eine Hinweiszeile (Audio bereits überschrieben) zurück.
+    """
+    stream = speaker_streams[utterance.stream]
+    audio_buffer = stream.audio_buffer
+    oldest_sample, _ = audio_buffer.available_range()
+    window_start = max(utterance.start_sample, oldest_sample)
+    window_end = utterance.end_sample
+    if stream.feature_stream is not None:
+        # Fenster auf Frame-Grenzen legen, damit die vorberechneten Frames passen
+        hop = stream.feature_stream.hop_length
+        window_start -= window_start % hop
+        if window_start < oldest_sample:
+            window_start += hop
+        window_end -= window_end % hop
 
-            debug_print(f"Puffer-Status: {current_buffer_length_bytes} bytes vorhanden, {required_buffer_length_bytes} bytes benötigt")
-            debug_print(f"Puffer-Chunks: {len(audio_buffer)} / {max_chunks}")
+    # Eine einzige Kopie inkl. Normalisierung auf float32 - die Aufnahme läuft währenddessen weiter
+    try:
+        audio_np = audio_buffer.read(window_start, window_end)
+    except ValueError as e:
+        debug_print(f"Fenster konnte nicht gelesen werden: {e}")
+        return f"[{(window_end - window_start)/RATE:.1f}s Audio nicht transkribiert - bereits überschrieben]"
 
-            # Reduziere Schwellenwert für bessere Responsivität 
-            min_required_bytes = int(required_buffer_length_bytes * 0.8)  # 80% der Zielgröße
+    if DEBUG:
+        debug_print(f"Audio-Array erstellt: {len(audio_np)} samples ({len(audio_np)/RATE:.2f}s)")
+        debug_print(f"Audio-Level (RMS): {np.sqrt(np.mean(audio_np**2)):.4f}")
+    return window_start, window_end, audio_np
 
-            if current_buffer_length_bytes < min_required_bytes:
-                debug_print(f"Nicht genug Audio für Transkription (benötigt mindestens {min_required_bytes} bytes).")
-                continue # Nicht genug Audio für eine aussagekräftige Transkription
+encode_timer_lock = threading.Lock()
+transcribe_profiler = None # SamplingProfiler, mit PROFILE_TRANSCRIBE bzw. --profile
 
-            debug_print("Ausreichend Audio vorhanden, starte Transkription...")
+def encode_timer(model):
+    """Misst die Encoder-Zeit des Modells je Thread - ersetzt dafür einmalig model.encode (falls vorhanden)."""
+    encode = getattr(model, "encode", None)
+    if encode is None or isinstance(encode, CallTimer):
+        return encode
+    with encode_timer_lock:
+        if not isinstance(model.encode, CallTimer):
+            model.encode = CallTimer(model.encode)
+        return model.encode
 
-            # Kombinieren Sie die Chunks zu einem einzigen Numpy-Array
-            audio_data = b''.join(list(audio_buffer))
-            audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+def record_window_metrics(audio_seconds, inference_seconds, encoder, windows=1):
+    """Encoder- und Restzeit sowie Echtzeitfaktor eines Modell-Durchlaufs, bei einem Batch gleichmäßig je Fenster.
 
-            debug_print(f"Audio-Array erstellt: {len(audio_np)} samples ({len(audio_np)/RATE:.2f}s)")
-            debug_print(f"Audio-Level (RMS): {np.sqrt(np.mean(audio_np**2)):.4f}")
+    Die Aufteilung gibt es nur bei Modellen mit encode() (faster-whisper), sonst nur den Echtzeitfaktor.
+    """
+    if encoder is not None:
+        encode_seconds = encoder.take()
+        for _ in range(windows):
+            window_encode_time.observe(encode_seconds / windows)
+            window_decode_time.observe((inference_seconds - encode_seconds) / windows)
+    if audio_seconds > 0:
+        window_rtf.observe(inference_seconds / audio_seconds)
 
-            # VERBESSERT: Behalte Überlappung anstatt kompletter Löschung
-            chunks_to_remove = math.ceil((BUFFER_DURATION - OVERLAP_DURATION) * RATE / CHUNK_SIZE)
-            debug_print(f"Entferne {chunks_to_remove} Chunks, behalte {OVERLAP_DURATION}s Überlappung")
-            
-            for _ in range(min(chunks_to_remove, len(audio_buffer))):
-                audio_buffer.popleft()
-            
-            debug_print(f"Audio-Puffer teilweise geleert. Verbleibende Chunks: {len(audio_buffer)}")
-            
-        transcribing = True # Setzen Sie das Flag vor der Transkription
-        debug_print("Transkription gestartet...")
+def profile_section():
+    """Abschnitt für den Stichproben-Profiler - ohne Profiler ein leerer Kontext."""
+    profiler = transcribe_profiler
+    return profiler.section() if profiler is not None else contextlib.nullcontext()
 
-        try:
-            # Erweiterte Transkriptions-Parameter für bessere Qualität
+def transcribe_window(model, utterance, prompt, speech=None):
+    """Transkribiert das Fenster einer Äußerung aus dem Ringpuffer.
+
+    speech sind die Sprachabschnitte (absolute Samples) - ohne Angabe aus dem Streaming-VAD des Sprechers.
+    Nur diese Abschnitte dekodiert das Modell (clip_timestamps), ein VAD-Durchlauf pro Fenster entfällt.
+    Gibt ein WindowResult, eine Hinweiszeile (Audio bereits überschrieben) oder None (keine Sprache) zurück.
+    """
+    stream = speaker_streams[utterance.stream]
+    window = read_window(utterance)
+    if isinstance(window, str):
+        return window
+    window_start, window_end, audio_np = window
+    if speech is None:
+        speech = utterance_speech(utterance)
+    speech = clamp_speech(speech, window_start, window_end)
+    
+    # Fenster ohne nennenswerte Sprache gar nicht erst dem Modell geben
+    fraction = window_speech_fraction(audio_np, window_start, window_end, speech)
+    if not scheduler.should_transcribe(fraction) or speech == []:
+        if DEBUG:
+            debug_print(f"Fenster übersprungen: Sprachanteil {fraction:.0%}")
+        return None
+    level = scheduler.level
+    model = model_for_level(level, model)
+    
+    debug_print("Transkription gestartet...")
+
+    # Erweiterte Transkriptions-Parameter für bessere Qualität
+    # Wort-Zeitstempel erlauben das Entfernen der Überlappung, der bisherige Text dient als Prompt
+    # Mit vorberechneten Merkmalen entfällt der VAD-Filter: die Endpunkterkennung schneidet bereits an Sprechpausen
+    # Mit dem Streaming-VAD dekodiert das Modell nur dessen Sprachabschnitte (Zeiten bleiben relativ zum Fenster)
+    clips = [(edge - window_start) / RATE for span in speech for edge in span] if speech else "0"
+    inference_start = time.perf_counter()
+    precomputed = prepare_features(model, window_start, window_end, audio_np, stream)
+    window_feature_time.observe(time.perf_counter() - inference_start)
+    encoder = encode_timer(model)
+    try:
+        with profile_section():
             segments, info = model.transcribe(
                 audio_np, 
-                beam_size=5, 
+                beam_size=level.beam_size or BEAM_SIZE, 
                 language="de", 
-                initial_prompt="Hallo",
-                vad_filter=True,  # Voice Activity Detection
-                vad_parameters=dict(min_silence_duration_ms=500)  # Kürzere Pausen ignorieren
+                initial_prompt=prompt or INITIAL_PROMPT,
+                word_timestamps=True,
+                vad_filter=precomputed is None and speech is None,  # Voice Activity Detection
+                vad_parameters=dict(min_silence_duration_ms=500),  # Kürzere Pausen ignorieren
+                clip_timestamps=clips,
             )
-            
-            debug_print(f"Transkription abgeschlossen. Sprache: {info.language} (Wahrscheinlichkeit: {info.language_probability:.2f})")
-            
-            # Sammle alle Segmente zu einem zusammenhängenden Text
-            full_text_parts = []
-            segment_count = 0
-            for segment in segments:
-                segment_count += 1
-                text = segment.text.strip()
-                debug_print(f"Segment {segment_count}: '{text}' ({segment.start:.2f}s - {segment.end:.2f}s)")
-                if text:
-                    full_text_parts.append(text)
-            
-            # Kombiniere alle Segmente zu einem Text
-            if full_text_parts:
-                full_text = " ".join(full_text_parts)
-                write_to_transcript(full_text)
-            else:
-                debug_print("Keine Segmente gefunden - möglicherweise Stille oder zu leise")
-                
+            # Segmente einsammeln (erst dabei rechnet das Modell)
+            segments = list(segments)
+    finally:
+        if precomputed is not None:
+            precomputed.prepare(None)
+    inference_seconds = time.perf_counter() - inference_start
+    record_window_metrics((window_end - window_start) / RATE, inference_seconds, encoder)
+    scheduler.record((window_end - window_start) / RATE, inference_seconds, utterance_queue.qsize())
+    
+    if DEBUG:
+        debug_print(f"Transkription abgeschlossen. Sprache: {info.language} (Wahrscheinlichkeit: {info.language_probability:.2f})")
+        for segment_count, segment in enumerate(segments, 1):
+            debug_print(f"Segment {segment_count}: '{segment.text.strip()}' ({segment.start:.2f}s - {segment.end:.2f}s)")
+    # Wörter auf absolute Audio-Zeit umrechnen
+    words = words_from_segments(segments, window_start / RATE)
+    
+    if not words:
+        debug_print("Keine Segmente gefunden - möglicherweise Stille oder zu leise")
+        return None
+    # Nach einem erzwungenen Schnitt dekodiert das nächste Fenster die letzte Überlappung erneut
+    stable_until = (window_end - OVERLAP_DURATION * RATE) / RATE if utterance.forced else None
+    return WindowResult(words, window_start / RATE, window_end / RATE, stable_until,
+                        segments_info(segments, window_start / RATE), inference_seconds)
+
+def transcribe_audio():
+    """Worker: Transkribiert Äußerungen aus der Warteschlange und gibt sie geordnet an das Transkript weiter."""
+    debug_print(f"Starte Transkriptions-Thread {threading.current_thread().name}...")
+    
+    # Bis das Modell bereit ist, sammeln sich Äußerungen in der Warteschlange und im Ringpuffer
+    try:
+        model = model_manager.get()
+    except RuntimeError as e:
+        debug_print(f"Transkriptions-Thread beendet: {e}")
+        return
+    
+    while True:
+        # Warte auf die nächste fertige Äußerung statt auf einen festen Timer
+        job = utterance_queue.get()
+        if job is None:
+            break # Warteschlange geschlossen
+        seq, utterance = job
+        if DEBUG:
+            debug_print(f"Transkriptions-Auftrag #{seq}")
+
+        live_job_started()
+        result = None
+        try:
+            result = transcribe_window(model, utterance, speaker_streams[utterance.stream].stitcher.prompt())
         except Exception as e:
             debug_print(f"FEHLER bei der Transkription: {e}")
             print(f"Fehler bei der Transkription: {e}")
         finally:
-            transcribing = False # Setzen Sie das Flag zurück
-            debug_print("Transkription beendet, Flag zurückgesetzt.")
+            # Jede Sequenznummer muss abgegeben werden, sonst warten alle späteren Ergebnisse
+            transcript_order.submit(seq, (utterance, result))
+            live_job_finished()
+            if DEBUG:
+                debug_print(f"Transkription #{seq} beendet.")
+
+# --- Batch-Modus: wartende Fenster aller Sprecher in einem Durchlauf rechnen ---
+batch_engine = None # BatchInferenceEngine, ersetzt im Batch-Modus die Transkriptions-Threads
+batched_pipelines = {} # id(Modell) -> BatchedInferencePipeline
+
+def batched_pipeline(model):
+    """BatchedInferencePipeline zu einem geladenen Modell (einmal pro Modell angelegt)."""
+    pipeline = batched_pipelines.get(id(model))
+    if pipeline is None:
+        from faster_whisper import BatchedInferencePipeline
+        pipeline = batched_pipelines[id(model)] = BatchedInferencePipeline(model)
+    return pipeline
+
+def transcribe_batch(model, utterances):
+    """Transkribiert mehrere Fenster (auch verschiedener Sprecher) in gebündelten Durchläufen.
+
+    Gibt je Äußerung dasselbe zurück wie transcribe_window(). Ein einzelnes Fenster geht den normalen
+    Weg mit dem Prompt seines Sprechers. Sonst gibt es einen Durchlauf je Prompt, damit jeder Sprecher
+    mit seinem eigenen Kontext dekodiert wird.
+    """
+    if len(utterances) == 1:
+        utterance = utterances[0]
+        return [transcribe_window(model, utterance, speaker_streams[utterance.stream].stitcher.prompt())]
+
+    results = [None] * len(utterances)
+    groups = {} # Prompt -> Fenster
+    for index, utterance in enumerate(utterances):
+        window = read_window(utterance)
+        if isinstance(window, str):
+            results[index] = window
+            continue
+        speech = clamp_speech(utterance_speech(utterance), window[0], window[1])
+        fraction = window_speech_fraction(window[2], window[0], window[1], speech)
+        if not scheduler.should_transcribe(fraction) or speech == []:
+            if DEBUG:
+                debug_print(f"Fenster übersprungen: Sprachanteil {fraction:.0%}")
+            continue
+        prompt = speaker_streams[utterance.stream].stitcher.prompt()
+        groups.setdefault(prompt, []).append((index, *window, speech))
+    if not groups:
+        return results
+    level = scheduler.level
+    model = model_for_level(level, model)
+    for prompt, windows in groups.items():
+        transcribe_batch_group(model, level, prompt, windows, utterances, results)
+    return results
+
+def transcribe_batch_group(model, level, prompt, windows, utterances, results):
+    """Dekodiert Fenster mit gemeinsamem Prompt in einem Durchlauf und trägt sie in results ein.
+
+    Die Fenster werden aneinandergehängt; clip_timestamps enthält je Fenster dessen Sprachabschnitte
+    (ohne Streaming-VAD das ganze Fenster), so sieht das Modell dasselbe Audio wie in transcribe_window().
+    Die Merkmale berechnet die Pipeline selbst.
+    """
+    clip_starts = np.cumsum([0] + [len(audio_np) for *_, audio_np, _ in windows]) / RATE
+    clips = []
+    for (_, window_start, window_end, _, speech), clip_start in zip(windows, clip_starts):
+        for start, end in speech or [(window_start, window_end)]:
+            clips.append({"start": clip_start + (start - window_start) / RATE,
+                          "end": clip_start + (end - window_start) / RATE})
+    if DEBUG:
+        debug_print(f"Batch-Transkription gestartet: {len(windows)} Fenster, {len(clips)} Abschnitte, "
+                    f"{clip_starts[-1]:.2f}s Audio")
+    inference_start = time.perf_counter()
+    encoder = encode_timer(model)
+    with profile_section():
+        segments, info = batched_pipeline(model).transcribe(
+            np.concatenate([audio_np for *_, audio_np, _ in windows]),
+            beam_size=level.beam_size or BEAM_SIZE,
+            language="de",
+            initial_prompt=prompt or INITIAL_PROMPT,
+            word_timestamps=True,
+            clip_timestamps=clips,
+            batch_size=len(clips),
+        )
+        segments = list(segments)
+    inference_seconds = time.perf_counter() - inference_start
+    record_window_metrics(clip_starts[-1], inference_seconds, encoder, len(windows))
+    scheduler.record(clip_starts[-1], inference_seconds, utterance_queue.qsize())
+
+    for (index, window_start, window_end, *_), clip_start, window_segments in zip(
+            windows, clip_starts, split_batch_segments(segments, list(clip_starts[:-1]))):
+        # Zeiten der Pipeline beziehen sich auf das aneinandergehängte Audio
+        offset = window_start / RATE - clip_start
+        words = words_from_segments(window_segments, offset)
+        if not words:
+            continue
+        utterance = utterances[index]
+        stable_until = (window_end - OVERLAP_DURATION * RATE) / RATE if utterance.forced else None
+        results[index] = WindowResult(words, window_start / RATE, window_end / RATE, stable_until,
+                                      segments_info(window_segments, offset), inference_seconds)
+
+def run_inference_batch(utterances):
+    """run_batch der BatchInferenceEngine: wartet beim ersten Batch auf das Modell."""
+    for _ in utterances:
+        live_job_started()
+    return transcribe_batch(model_manager.get(), utterances)
+
+def deliver_batch_result(seq, utterance, result, timing):
+    """Gibt ein Batch-Ergebnis an die geordnete Ausgabe seines Sprechers weiter."""
+    if DEBUG:
+        debug_print(f"Transkription #{seq} beendet (Batch aus {timing.batch_size}, "
+                    f"{timing.waited * 1000:.0f} ms gewartet, {timing.inference:.2f}s gerechnet).")
+    batch_wait_time.observe(timing.waited)
+    transcript_order.submit(seq, (utterance, result))
+    live_job_finished()
+
+def start_batch_engine(max_batch_size=INFERENCE_BATCH_SIZE, max_wait=INFERENCE_BATCH_WAIT):
+    """Startet die Batch-Inferenz anstelle der Transkriptions-Threads."""
+    global batch_engine
+    batch_engine = BatchInferenceEngine(utterance_queue, run_inference_batch, deliver_batch_result,
+                                        max_batch_size=max_batch_size, max_wait=max_wait, log=debug_print).start()
+    debug_print(f"Batch-Inferenz gestartet (bis zu {max_batch_size} Fenster, {max_wait * 1000:.0f} ms Wartezeit).")
+    return batch_engine
+
+# --- Mehrprozess-Modus: Inferenz in eigenen Prozessen, Audio über Shared Memory ---
+inference_error = None # Fehlermeldung, falls ein Inferenz-Prozess kein Modell laden konnte
+
+def inference_process_main(ring_names, counter_lock, job_queue, result_queue):
+    """Einstiegspunkt eines Inferenz-Prozesses: liest Fenster direkt aus den Shared-Memory-Ringen der Sprecher.
+
+    Die Qualitätsstufe kommt mit jedem Auftrag vom Scheduler des Aufnahme-Prozesses - nur dort ist die
+    Warteschlange zu sehen.
+    """
+    global speaker_streams
+    speaker_streams = [SharedRingView(index, SharedAudioRing.attach(ring_name, counter_lock))
+                       for index, ring_name in enumerate(ring_names)]
+    try:
+        model = model_manager.get()
+    except RuntimeError as e:
+        result_queue.put((None, str(e)))
+        return
+    try:
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+            seq, utterance, prompt, speech, level_index = job
+            scheduler.level_index = level_index
+            result = None
+            try:
+                result = transcribe_window(model, utterance, prompt, speech)
+            except Exception as e:
+                debug_print(f"FEHLER bei der Transkription: {e}")
+            result_queue.put((seq, (utterance, result)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        result_queue.put((None, None)) # Prozess beendet
+        for stream in speaker_streams:
+            stream.audio_buffer.close()
+
+def feed_inference_processes(job_queue, count):
+    """Reicht Aufträge aus der begrenzten Warteschlange an die Prozesse weiter (inkl. Prompt und Sprachabschnitten)."""
+    while True:
+        job = utterance_queue.get()
+        if job is None:
+            for _ in range(count):
+                job_queue.put(None)
+            return
+        seq, utterance = job
+        live_job_started()
+        job_queue.put((seq, utterance, speaker_streams[utterance.stream].stitcher.prompt(), utterance_speech(utterance),
+                       scheduler.level_index))
+
+def collect_inference_results(result_queue, count):
+    """Übernimmt Ergebnisse der Prozesse in die geordnete Transkript-Ausgabe.
+
+    Rechenzeit und Tiefe der Warteschlange gehen hier an den Scheduler, der die Stufe für alle Prozesse wählt.
+    """
+    global inference_error
+    finished = 0
+    while finished < count:
+        seq, result = result_queue.get()
+        if seq is None:
+            finished += 1
+            if result is not None:
+                inference_error = result
+            continue
+        _, window = result
+        if isinstance(window, WindowResult):
+            scheduler.record(window.window_end - window.window_start, window.inference_seconds, utterance_queue.qsize())
+        transcript_order.submit(seq, result)
+        live_job_finished()
+
+def start_inference_processes(count):
+    """Ersetzt den Ringpuffer durch Shared Memory und startet count Inferenz-Prozesse mit je eigenem Modell.
+
+    Gibt den Thread zurück, der die Ergebnisse einsammelt - er endet, wenn alle Prozesse beendet sind.
+    """
+    global PRECOMPUTED_FEATURES, RING_BUFFER_DURATION
+    PRECOMPUTED_FEATURES = False # Die Frames lägen nur im Aufnahme-Prozess
+    # Die VAD-Puffer entstehen erst beim Start der Aufnahme und übernehmen diese Größe
+    RING_BUFFER_DURATION = ring_buffer_duration(processes=count)
+    apply_memory_budget()
+    context = multiprocessing.get_context("spawn")
+    counter_lock = context.Lock()
+    for stream in speaker_streams:
+        stream.audio_buffer = SharedAudioRing.create(RING_BUFFER_DURATION * RATE, counter_lock)
+    ring_names = [stream.audio_buffer.name for stream in speaker_streams]
+    job_queue = context.Queue(maxsize=count)
+    result_queue = context.Queue()
+    for index in range(count):
+        process = context.Process(target=inference_process_main, name=f"Inferenz-{index + 1}",
+                                  args=(ring_names, counter_lock, job_queue, result_queue), daemon=True)
+        process.start()
+    threading.Thread(target=feed_inference_processes, args=(job_queue, count), daemon=True).start()
+    collector = threading.Thread(target=collect_inference_results, args=(result_queue, count), daemon=True)
+    collector.start()
+    debug_print(f"{count} Inferenz-Prozesse gestartet (Shared Memory {', '.join(ring_names)}).")
+    return collector
+
+# --- Export der Metriken und Profiler ---
+metrics_server = None # HTTP-Server für /metrics
+metrics_snapshots = None # SnapshotWriter für METRICS_SNAPSHOT_FILE
+
+def start_metrics(port=METRICS_PORT, snapshot_file=METRICS_SNAPSHOT_FILE, interval=METRICS_SNAPSHOT_INTERVAL):
+    """Startet den Prometheus-Endpunkt auf localhost und/oder die regelmäßigen JSON-Schnappschüsse."""
+    global metrics_server, metrics_snapshots
+    if port:
+        metrics_server = start_http_server(metrics, port)
+        debug_print(f"Metriken unter http://127.0.0.1:{metrics_server.server_address[1]}/metrics")
+    if snapshot_file:
+        metrics_snapshots = SnapshotWriter(metrics, snapshot_file, interval, log=debug_print).start()
+        debug_print(f"Metriken alle {interval}s nach '{snapshot_file}'")
+
+def stop_metrics():
+    """Schreibt den letzten Schnappschuss und beendet den Endpunkt."""
+    global metrics_server, metrics_snapshots
+    if metrics_snapshots is not None:
+        metrics_snapshots.close()
+        metrics_snapshots = None
+    if metrics_server is not None:
+        metrics_server.shutdown()
+        metrics_server.server_close()
+        metrics_server = None
+
+# --- Speicher-Grenze ---
+memory_monitor = None # MemoryMonitor, prüft MEMORY_LIMIT_MB
+
+def memory_limit_exceeded(rss):
+    """Gibt beim Überschreiten der RSS-Grenze den Modell-Cache frei."""
+    unloaded = unload_level_models()
+    gc.collect()
+    report_memory_cap("rss", f"{rss / 2**20:.0f} MB belegt, Grenze {MEMORY_LIMIT_MB} MB - "
+                             f"{unloaded} zusätzliche(s) Modell(e) entladen")
+    debug_print(f"WARNUNG: RSS {rss / 2**20:.0f} MB über MEMORY_LIMIT_MB={MEMORY_LIMIT_MB}")
+
+def start_memory_monitor(limit_mb=MEMORY_LIMIT_MB):
+    """Prüft alle MEMORY_CHECK_INTERVAL Sekunden den Arbeitsspeicher gegen limit_mb (nur mit MEMORY_BUDGET)."""
+    global memory_monitor
+    if not MEMORY_BUDGET or not limit_mb or memory_monitor is not None:
+        return memory_monitor
+    memory_monitor = MemoryMonitor(MEMORY_CHECK_INTERVAL, max_samples=0, limit_bytes=limit_mb * 2**20,
+                                   on_limit=memory_limit_exceeded, log=debug_print).start()
+    debug_print(f"Speicher-Grenze {limit_mb} MB wird alle {MEMORY_CHECK_INTERVAL}s geprüft.")
+    return memory_monitor
+
+def stop_memory_monitor():
+    global memory_monitor
+    if memory_monitor is not None:
+        memory_monitor.close()
+        memory_monitor = None
+
+def start_transcribe_profiler():
+    """Startet den Stichproben-Profiler um model.transcribe."""
+    global transcribe_profiler
+    transcribe_profiler = SamplingProfiler().start()
+    debug_print(f"Profiler um model.transcribe aktiv (alle {transcribe_profiler.interval * 1000:.0f} ms).")
+    return transcribe_profiler
+
+def stop_transcribe_profiler(path=PROFILE_OUTPUT_FILE):
+    """Beendet den Profiler, schreibt die gefalteten Stacks und gibt die teuersten Funktionen aus."""
+    global transcribe_profiler
+    profiler, transcribe_profiler = transcribe_profiler, None
+    if profiler is None:
+        return
+    profiler.close()
+    profiler.write_collapsed(path)
+    print(f"Profil von model.transcribe ({profiler.samples} Stichproben) in '{path}' gespeichert.")
+    for name, fraction in profiler.top(5):
+        print(f"  {fraction:6.1%}  {name}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live-Transkription vom Mikrofon")
+    parser.add_argument("--processes", type=int, default=INFERENCE_PROCESSES,
+                        help="Inferenz in N eigenen Prozessen über Shared Memory (0 = Threads)")
+    parser.add_argument("--batch", type=int, default=INFERENCE_BATCH_SIZE,
+                        help="Bis zu N wartende Fenster gebündelt rechnen (1 = Transkriptions-Threads)")
+    parser.add_argument("--archive", default=AUDIO_ARCHIVE_DIR, metavar="DIR",
+                        help="Aufgenommenes Audio in diesem Verzeichnis archivieren")
+    parser.add_argument("--channels", type=int, default=CHANNELS,
+                        help="Kanäle des Eingabegeräts, jeder Kanal ist ein eigener Sprecher")
+    parser.add_argument("--devices", default=INPUT_DEVICES,
+                        help="Geräte-Indizes (z.B. 1,3,4), jedes Gerät ist ein eigener Sprecher")
+    parser.add_argument("--speakers", default=SPEAKER_NAMES, help="Namen der Sprecher, z.B. 'Anna,Ben,Carla'")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="Prometheus-Metriken unter http://127.0.0.1:PORT/metrics (0 = aus)")
+    parser.add_argument("--metrics-file", default=METRICS_SNAPSHOT_FILE,
+                        help=f"JSON-Schnappschuss der Metriken alle {METRICS_SNAPSHOT_INTERVAL}s in diese Datei")
+    parser.add_argument("--profile", action="store_true", default=PROFILE_TRANSCRIBE,
+                        help=f"Stichproben-Profiler um model.transcribe, Ergebnis in '{PROFILE_OUTPUT_FILE}'")
+    parser.add_argument("--memory-budget", action="store_true", default=MEMORY_BUDGET,
+                        help="Puffer, Modell-Cache und Transkript im Speicher begrenzen (MEMORY_*), Erreichen wird gemeldet")
+    parser.add_argument("--memory-limit", type=int, default=MEMORY_LIMIT_MB, metavar="MB",
+                        help="RSS-Grenze in MB, darüber wird der Modell-Cache geleert (schaltet --memory-budget ein)")
+    args = parser.parse_args()
+
     debug_print("=== STT PROGRAMM STARTET ===")
     
+    # Ringpuffer-Größe (samt Speicher-Budget) vor dem Anlegen der Sprecher, damit sie gleich passend entstehen
+    MEMORY_BUDGET = args.memory_budget or bool(args.memory_limit)
+    MEMORY_LIMIT_MB = args.memory_limit
+    configure_ring_buffer(TRANSCRIPTION_WORKERS, args.batch, args.processes)
+    
+    # Ein Stream pro Kanal bzw. Gerät
+    devices = [int(device) for device in str(args.devices).split(",")] if args.devices else None
+    speaker_count = len(devices) if devices else args.channels
+    if speaker_count > 1 or args.speakers:
+        names = args.speakers.split(",") if args.speakers else [f"Sprecher {index + 1}" for index in range(speaker_count)]
+        if len(names) != speaker_count:
+            parser.error(f"--speakers nennt {len(names)} Namen, es gibt aber {speaker_count} Sprecher (Kanäle bzw. Geräte)")
+        setup_speakers([name.strip() for name in names])
+    
     # Initialisiere die Transkript-Datei
     initialize_transcript_file()
+    start_metrics(args.metrics_port, args.metrics_file)
+    start_memory_monitor(MEMORY_LIMIT_MB)
+    if args.profile:
+        start_transcribe_profiler()
     
     print(f"Transkriptionen werden in '{TRANSCRIPT_FILE}' gespeichert.")
     print("Lautstärkepegel wird in Echtzeit erfasst: 0=Stille, 1=Leise, 2=Normal, 3=Laut, 4=Sehr Laut")
@@ -277,28 +1492,77 @@ if __name__ == "__main__":
     debug_print(f"Konfiguration: RATE={RATE}, CHUNK_SIZE={CHUNK_SIZE}, BUFFER_DURATION={BUFFER_DURATION}")
     debug_print(f"Lautstärke-Schwellenwerte: {VOLUME_THRESHOLDS}")
     
-    # Starten Sie den Aufnahme-Thread
-    record_thread = threading.Thread(target=record_audio)
-    record_thread.daemon = True # Der Thread wird beendet, wenn das Hauptprogramm beendet wird
-    record_thread.start()
+    # Im Mehrprozess-Modus muss der Shared-Memory-Ring vor der Aufnahme existieren
+    if args.processes > 0:
+        start_inference_processes(args.processes)
+    # Überarbeitung der Entwürfe mit dem größeren Modell, nur bei freier CPU
+    start_refiner()
+    if args.archive:
+        start_audio_archive(args.archive)
+
+    # Starten Sie den Aufnahme-Thread (bei mehreren Geräten einen pro Gerät)
+    if devices:
+        for device, stream in zip(devices, speaker_streams):
+            source = MicrophoneSource(CAPTURE_RATE, None, CHUNK_SIZE, device_index=device)
+            record_thread = threading.Thread(target=record_audio, args=(source, [stream]), daemon=True)
+            record_thread.start()
+    else:
+        record_thread = threading.Thread(target=record_audio)
+        record_thread.daemon = True # Der Thread wird beendet, wenn das Hauptprogramm beendet wird
+        record_thread.start()
     debug_print("Audio-Thread gestartet.")
 
-    # Starten Sie den Transkriptions-Thread
-    transcribe_thread = threading.Thread(target=transcribe_audio)
-    transcribe_thread.daemon = True
-    transcribe_thread.start()
-    debug_print("Transkriptions-Thread gestartet.")
+    if args.processes == 0:
+        # Modell parallel zur Aufnahme im Hintergrund laden
+        model_manager.start()
+
+        if args.batch > 1:
+            start_batch_engine(args.batch)
+        else:
+            # Starten Sie die Transkriptions-Threads
+            for worker_index in range(TRANSCRIPTION_WORKERS):
+                transcribe_thread = threading.Thread(target=transcribe_audio, name=f"Transkription-{worker_index + 1}")
+                transcribe_thread.daemon = True
+                transcribe_thread.start()
+            debug_print(f"{TRANSCRIPTION_WORKERS} Transkriptions-Threads gestartet.")
 
     # Halten Sie das Hauptprogramm am Laufen
     try:
         debug_print("Hauptprogramm läuft. Drücken Sie Ctrl+C zum Beenden.")
         while True:
             time.sleep(1)
+            if model_manager.ready and model_manager.model is None:
+                print(f"Kein Whisper-Modell konnte geladen werden: {model_manager.error}")
+                exit(1)
+            if inference_error is not None:
+                print(f"Kein Whisper-Modell konnte geladen werden: {inference_error}")
+                exit(1)
     except KeyboardInterrupt:
         debug_print("Programm durch Benutzer beendet.")
+        debug_print(f"Warteschlange: {utterance_queue.coalesced} zusammengelegt, {utterance_queue.dropped} verworfen, "
+                    f"Höchststand {utterance_queue.high_watermark}/{WORK_QUEUE_SIZE}")
+        for stream in speaker_streams:
+            debug_print(f"Ringpuffer{' ' + stream.name if stream.name else ''}: {stream.audio_buffer.overflows} Eingangs-Überläufe, "
+                        f"{stream.audio_buffer.underruns} überschriebene Fenster")
+        debug_print(f"Scheduler: {scheduler.stats()}")
+        if batch_engine is not None:
+            debug_print(f"Batch-Inferenz: {batch_engine.stats()}")
+        if memory_caps_reported:
+            debug_print(f"Speicher-Budget: {memory_cap_hits.snapshot()}")
         print("Programm beendet.")
+        # Noch vorläufige Wörter aus der letzten Überlappung übernehmen
+        flush_transcript()
+        if refiner is not None:
+            # Wartende Zeilen noch überarbeiten, solange die Zeit reicht
+            refiner.close(timeout=REFINEMENT_SHUTDOWN_TIMEOUT)
+            debug_print(f"Überarbeitung: {refiner.refined} geändert, {refiner.unchanged} unverändert, "
+                        f"{refiner.failed} fehlgeschlagen")
         # Schreibe Ende-Marker in die Datei
-        with file_lock:
-            with open(TRANSCRIPT_FILE, "a", encoding="utf-8") as f:
-                end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"\n=== Session beendet am {end_time} ===\n")
\ No newline at end of file
+        close_transcript_file()
+        close_audio_archive()
+        stop_transcribe_profiler()
+        stop_memory_monitor()
+        stop_metrics()
+        for stream in speaker_streams:
+            if isinstance(stream.audio_buffer, SharedAudioRing):
+                stream.audio_buffer.close()
\ No newline at end of file
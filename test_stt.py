@@ -223,6 +223,1645 @@ def test_buffer_simulation():
         print(f"FEHLER bei Puffer-Test: {e}")
         return False
 
+def test_ring_buffer():
+    """Test 7: Ringpuffer mit Sample-Zähler wie im Hauptprogramm"""
+    print("\n=== TEST 7: Ringpuffer ===")
+    try:
+        from ring_buffer import AudioRingBuffer
+        
+        RATE = 16000
+        CHUNK_SIZE = 1024
+        BUFFER_DURATION = 3
+        
+        ring = AudioRingBuffer(2 * BUFFER_DURATION * RATE, dtype=np.int16)
+        reference = np.random.randint(-1000, 1000, 5 * BUFFER_DURATION * RATE, dtype=np.int16)
+        
+        # Fülle Puffer chunkweise, so dass er mehrfach überläuft
+        for start in range(0, len(reference), CHUNK_SIZE):
+            ring.write(reference[start:start + CHUNK_SIZE].tobytes())
+        
+        oldest, newest = ring.available_range()
+        print(f"Sample-Zähler: {newest}, verfügbar ab Sample {oldest}")
+        if newest != len(reference) or newest - oldest != ring.capacity:
+            print("FEHLER: Sample-Zähler stimmt nicht")
+            return False
+        
+        # Fenster über das Puffer-Ende hinweg lesen
+        window_start = newest - BUFFER_DURATION * RATE
+        audio_np = ring.read(window_start, newest)
+        expected = reference[window_start:newest].astype(np.float32) / 32768.0
+        if not np.allclose(audio_np, expected):
+            print("FEHLER: Gelesenes Fenster weicht ab")
+            return False
+        
+        # Überschriebene Bereiche dürfen nicht gelesen werden
+        try:
+            ring.read(0, CHUNK_SIZE)
+            print("FEHLER: Überschriebener Bereich wurde gelesen")
+            return False
+        except ValueError:
+            pass
+        
+        print(f"Fenster-Länge: {len(audio_np)} samples ({len(audio_np)/RATE:.2f}s)")
+        print("✓ Ringpuffer funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Ringpuffer-Test: {e}")
+        return False
+
+def test_endpointing():
+    """Test 8: Endpunkterkennung mit simuliertem Lautstärkeverlauf"""
+    print("\n=== TEST 8: Endpunkterkennung ===")
+    try:
+        from endpointing import UtteranceEndpointer
+        
+        RATE = 16000
+        CHUNK_SIZE = 1024
+        
+        endpointer = UtteranceEndpointer(
+            silence_threshold=0.005,
+            speech_threshold=0.01,
+            hangover=0.6 * RATE,
+            min_speech=0.15 * RATE,
+            max_utterance=8 * RATE,
+            pre_roll=0.3 * RATE,
+            cut_search=1.0 * RATE,
+        )
+        
+        # 2s Stille, 2s Sprache, 1s Stille, 12s Sprache am Stück, 1s Stille
+        rms_values = [0.001] * 31 + [0.05] * 31 + [0.001] * 16 + [0.05] * 188 + [0.001] * 16
+        utterances = []
+        end_sample = 0
+        for rms in rms_values:
+            end_sample += CHUNK_SIZE
+            utterance = endpointer.process(rms, end_sample)
+            if utterance is not None:
+                utterances.append(utterance)
+                print(f"Äußerung: {utterance.start_sample/RATE:.2f}s - {utterance.end_sample/RATE:.2f}s (erzwungen: {utterance.forced})")
+        
+        if len(utterances) != 3:
+            print(f"FEHLER: 3 Äußerungen erwartet, {len(utterances)} gefunden")
+            return False
+        if utterances[0].forced or not utterances[1].forced:
+            print("FEHLER: Schnittgründe stimmen nicht")
+            return False
+        if any(u.end_sample - u.start_sample > 8 * RATE for u in utterances):
+            print("FEHLER: Maximale Länge überschritten")
+            return False
+        
+        print("✓ Endpunkterkennung funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Endpunkt-Test: {e}")
+        return False
+
+def test_work_queue():
+    """Test 9: Begrenzte Warteschlange mit mehreren Workern und geordneter Ausgabe"""
+    print("\n=== TEST 9: Warteschlange und Worker ===")
+    try:
+        import random
+        from work_queue import BoundedWorkQueue, ReorderBuffer, DROP_OLDEST
+        
+        emitted = []
+        order = ReorderBuffer(lambda seq, result: emitted.append(result))
+        work = BoundedWorkQueue(2, policy=DROP_OLDEST, on_drop=lambda seq, item: order.submit(seq, f"verworfen {item}"))
+        
+        def worker():
+            while True:
+                job = work.get()
+                if job is None:
+                    break
+                seq, item = job
+                time.sleep(random.uniform(0.001, 0.01))  # Simulierte, unterschiedlich lange Inferenz
+                order.submit(seq, f"fertig {item}")
+        
+        workers = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in workers:
+            thread.start()
+        
+        for item in range(50):
+            work.put(item)
+            time.sleep(0.001)
+        work.close()
+        for thread in workers:
+            thread.join()
+        
+        print(f"Ausgegeben: {len(emitted)}, verworfen: {work.dropped}, Höchststand: {work.high_watermark}")
+        if len(emitted) != 50:
+            print("FEHLER: Nicht alle Aufträge wurden ausgegeben oder gemeldet")
+            return False
+        if [int(result.split()[-1]) for result in emitted] != list(range(50)):
+            print("FEHLER: Ergebnisse nicht in Audio-Reihenfolge")
+            return False
+        
+        # Vergrößern gibt einen wartenden Erzeuger frei
+        work = BoundedWorkQueue(1)
+        work.put("a")
+        producer = threading.Thread(target=work.put, args=("b",))
+        producer.start()
+        time.sleep(0.05)
+        work.resize(2)
+        producer.join(timeout=1)
+        if producer.is_alive() or work.qsize() != 2:
+            print("FEHLER: resize() gibt wartende Erzeuger nicht frei")
+            return False
+        
+        print("✓ Warteschlange und Reihenfolge funktionieren")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Warteschlangen-Test: {e}")
+        return False
+
+def test_stitcher():
+    """Test 10: Zusammenfügen überlappender Fenster über Wort-Zeitstempel"""
+    print("\n=== TEST 10: Überlappung ohne Duplikate ===")
+    try:
+        from stitcher import TranscriptStitcher, Word, words_to_text
+        
+        stitcher = TranscriptStitcher()
+        
+        # Fenster 1: 0-8s, Überlappung ab 7s - "Heidenheim" liegt im Überlappungsbereich
+        window_1 = [Word(0.5, 1.0, " Es"), Word(1.0, 1.4, " war"), Word(1.4, 2.0, " einmal"),
+                    Word(6.0, 6.9, " kommt"), Word(7.1, 7.9, " Heidenheim")]
+        # Fenster 2: 7-12s, hört "Heidenheim" erneut und bestätigt es
+        window_2 = [Word(7.1, 7.9, " Heidenheim."), Word(8.2, 8.6, " Und"), Word(8.6, 9.3, " Stadeinbad.")]
+        
+        first = words_to_text(stitcher.process(window_1, 0.0, stable_until=7.0))
+        second = words_to_text(stitcher.process(window_2, 7.0, stable_until=None))
+        print(f"Zeile 1: '{first}'")
+        print(f"Zeile 2: '{second}'")
+        
+        if first != "Es war einmal kommt" or second != "Heidenheim. Und Stadeinbad.":
+            print("FEHLER: Wörter doppelt oder verloren")
+            return False
+        if stitcher.flush():
+            print("FEHLER: Nach Äußerungsende dürfen keine vorläufigen Wörter übrig sein")
+            return False
+        
+        print("✓ Überlappung wird ohne Duplikate zusammengefügt")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Stitcher-Test: {e}")
+        return False
+
+def test_model_manager():
+    """Test 11: Modell im Hintergrund laden, Fallback und Aufwärm-Durchlauf"""
+    print("\n=== TEST 11: Modell-Manager ===")
+    try:
+        from model_manager import ModelManager
+        
+        class SlowModel:
+            """Platzhalter mit der transcribe-Schnittstelle von WhisperModel"""
+            def __init__(self):
+                self.calls = 0
+            def transcribe(self, audio, **kwargs):
+                self.calls += 1
+                return iter([]), None
+        
+        def loader(size, device, compute_type):
+            time.sleep(0.2)  # Simulierte Ladezeit
+            if size == "base":
+                raise RuntimeError("base nicht verfügbar")
+            return SlowModel()
+        
+        start_time = time.perf_counter()
+        manager = ModelManager([("base", "cpu", "float32"), ("tiny", "cpu", "float32")], loader=loader).start()
+        start_duration = time.perf_counter() - start_time
+        print(f"start() kehrte nach {start_duration*1000:.1f}ms zurück")
+        if start_duration > 0.1:
+            print("FEHLER: Laden blockiert den Aufrufer")
+            return False
+        
+        model = manager.get(timeout=5)
+        print(f"Geladen: {manager.config} nach {manager.load_time:.2f}s, Aufwärm-Aufrufe: {model.calls}")
+        if manager.config[0] != "tiny" or model.calls != 1:
+            print("FEHLER: Fallback oder Aufwärm-Durchlauf fehlt")
+            return False
+        
+        print("✓ Modell-Manager funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Modell-Manager-Test: {e}")
+        return False
+
+def test_wav_replay():
+    """Test 12: WAV-Wiedergabe als Ersatz für das Mikrofon"""
+    print("\n=== TEST 12: WAV-Wiedergabe ===")
+    try:
+        from audio_source import WavFileSource
+        
+        CHUNK_SIZE = 1024
+        SPEED = 20
+        
+        source = WavFileSource("test_recording.wav", speed=SPEED).open()
+        with wave.open("test_recording.wav", "rb") as wf:
+            expected_frames = wf.getnframes()
+        
+        start_time = time.perf_counter()
+        frames = []
+        while True:
+            data = source.read(CHUNK_SIZE)
+            if not data:
+                break
+            frames.append(data)
+        duration = time.perf_counter() - start_time
+        source.close()
+        
+        audio_np = np.frombuffer(b''.join(frames), dtype=np.int16)
+        print(f"Wiedergegeben: {len(audio_np)} samples ({source.audio_time:.2f}s Audio in {duration:.2f}s)")
+        if len(audio_np) != expected_frames:
+            print("FEHLER: Anzahl der Samples stimmt nicht")
+            return False
+        if duration < 0.9 * source.audio_time / SPEED:
+            print("FEHLER: Wiedergabe schneller als eingestellt")
+            return False
+        if source.capture_time(source.frames_delivered) is None:
+            print("FEHLER: Aufnahmezeit des letzten Samples fehlt")
+            return False
+        
+        print("✓ WAV-Wiedergabe funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei WAV-Wiedergabe-Test: {e}")
+        return False
+
+def test_autotune_selection():
+    """Test 13: Wortfehlerrate und Profilauswahl des Autotuners"""
+    print("\n=== TEST 13: Autotuner-Auswahl ===")
+    try:
+        from autotune import word_error_rate, select_profile, peak_rss_mb
+        from memory_monitor import process_rss
+        
+        reference = "Es war einmal eine Drag Queen."
+        wer = word_error_rate(reference, "Es war einmal bei einer Truck Queen")
+        print(f"Wortfehlerrate: {wer:.2%}")
+        if abs(wer - 0.5) > 1e-9 or word_error_rate(reference, "es war einmal eine drag queen") != 0.0:
+            print("FEHLER: Wortfehlerrate falsch berechnet")
+            return False
+        
+        results = [
+            {"model": "base", "compute_type": "float32", "cpu_threads": 4, "beam_size": 5, "real_time_factor": 0.9, "word_error_rate": 0.1},
+            {"model": "base", "compute_type": "int8", "cpu_threads": 4, "beam_size": 1, "real_time_factor": 0.3, "word_error_rate": 0.15},
+            {"model": "tiny", "compute_type": "int8", "cpu_threads": 4, "beam_size": 1, "real_time_factor": 0.1, "word_error_rate": 0.5},
+        ]
+        profile = select_profile(results, max_rtf=0.5, max_wer=0.2)
+        print(f"Gewählt: {profile['model']}/{profile['compute_type']} beam={profile['beam_size']}")
+        if profile is not results[1] or select_profile(results, max_rtf=0.05) is not None:
+            print("FEHLER: Falsche Konfiguration gewählt")
+            return False
+        
+        # Höchststand in MB (ohne resource-Modul, z.B. unter Windows: None) - etwa so groß wie der aktuelle RSS oder größer
+        peak, current = peak_rss_mb(), process_rss()
+        print(f"RSS-Höchststand: {peak} MB, aktuell: {current / 2**20 if current else None} MB")
+        if peak is not None and current is not None and not current / 2**20 <= peak * 1.1:
+            print("FEHLER: RSS-Höchststand in falscher Einheit")
+            return False
+        
+        print("✓ Autotuner-Auswahl funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Autotuner-Test: {e}")
+        return False
+
+def test_batch_sharding():
+    """Test 14: Memory-Map und Aufteilung an Stille-Grenzen für den Batch-Modus"""
+    print("\n=== TEST 14: Batch-Sharding ===")
+    try:
+        from batch_transcribe import open_wav_memmap, chunk_rms, find_shards
+        
+        samples, rate, channels = open_wav_memmap("test_recording.wav")
+        with wave.open("test_recording.wav", "rb") as wf:
+            reference = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if not np.array_equal(samples[:, 0], reference):
+            print("FEHLER: Memory-Map liefert andere Samples als das wave-Modul")
+            return False
+        
+        rms = chunk_rms(samples)
+        shards = find_shards(rms, rate, len(samples), shard_duration=2, cut_search=1)
+        print(f"{len(samples)/rate:.2f}s Audio -> {len(shards)} Shards: "
+              + ", ".join(f"{start/rate:.2f}-{end/rate:.2f}s" for start, end in shards))
+        
+        if not shards or any(end - start > 2 * rate + 1024 for start, end in shards[:-1]):
+            print("FEHLER: Shards fehlen oder sind zu lang")
+            return False
+        if any(shards[i][1] > shards[i + 1][0] for i in range(len(shards) - 1)):
+            print("FEHLER: Shards überlappen")
+            return False
+        
+        print("✓ Batch-Sharding funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Batch-Sharding-Test: {e}")
+        return False
+
+def test_shared_ring():
+    """Test 15: Shared-Memory-Ringpuffer zwischen Aufnahme- und Inferenz-Prozess"""
+    print("\n=== TEST 15: Shared-Memory-Ringpuffer ===")
+    try:
+        from shm_ring import SharedAudioRing
+        
+        writer = SharedAudioRing.create(1000)
+        reader = SharedAudioRing.attach(writer.name)
+        try:
+            samples = (np.arange(2500) % 32768).astype(np.int16)
+            for start in range(0, len(samples), 300):
+                writer.write(samples[start:start + 300].tobytes())
+            
+            oldest, newest = reader.available_range()
+            print(f"Geschrieben: {writer.total_written}, lesbar beim Leser: [{oldest}, {newest})")
+            if (oldest, newest) != (1500, 2500):
+                print("FEHLER: Leser sieht einen falschen Bereich")
+                return False
+            
+            window = reader.read(1800, 2200, dtype=np.int16) # Läuft über das Puffer-Ende
+            if not np.array_equal(window, samples[1800:2200]):
+                print("FEHLER: Gelesenes Fenster stimmt nicht")
+                return False
+            
+            try:
+                reader.read(1000, 1200)
+                print("FEHLER: Überschriebener Bereich wurde nicht erkannt")
+                return False
+            except ValueError:
+                pass
+            writer.overflows = 3
+            if writer.underruns != 1 or reader.overflows != 3:
+                print("FEHLER: Zähler werden nicht zwischen Schreiber und Leser geteilt")
+                return False
+        finally:
+            reader.close()
+            writer.close()
+        
+        # Mikrofon im Callback-Modus: ein Überlauf wird gezählt, das Audio des Blocks bleibt erhalten
+        from audio_source import MicrophoneSource, PA_INPUT_OVERFLOW
+        source = MicrophoneSource(16000, 1, 4)
+        source._max_bytes = 32
+        source._callback(bytes([1] * 8), 4, None, 0)
+        source._callback(bytes([2] * 8), 4, None, PA_INPUT_OVERFLOW)
+        chunks = [source.read(4), source.read(4)]
+        print(f"Mikrofon: {source.overflows} Überlauf, gelesen {[chunk[0] for chunk in chunks]}")
+        if source.overflows != 1 or chunks != [bytes([1] * 8), bytes([2] * 8)]:
+            print("FEHLER: Überlauf verwirft Audio oder wird nicht gezählt")
+            return False
+        for value in range(3, 9): # Aufnahme kommt nicht nach: ältestes Audio fällt weg, zählt als Überlauf
+            source._callback(bytes([value] * 8), 4, None, 0)
+        source.close()
+        if source.overflows != 3 or source.read(4) != b"":
+            print("FEHLER: Voller Puffer oder Schließen falsch behandelt")
+            return False
+        
+        # Im Mehrprozess-Modus sind je Prozess zwei Fenster unterwegs (Job-Warteschlange und in Arbeit)
+        import stt
+        expected = (stt.WORK_QUEUE_SIZE + 2 * 3) * stt.MAX_COALESCED_DURATION + stt.OVERLAP_DURATION
+        if stt.ring_buffer_duration(processes=3) != expected:
+            print(f"FEHLER: Ringpuffer für 3 Prozesse {stt.ring_buffer_duration(processes=3)}s statt {expected}s")
+            return False
+        
+        print("✓ Shared-Memory-Ringpuffer funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Shared-Memory-Test: {e}")
+        return False
+
+def test_volume_meter():
+    """Test 16: Lautstärkemesser mit Pegel-Historie und Abonnement"""
+    print("\n=== TEST 16: Lautstärkemesser ===")
+    try:
+        from volume_meter import VolumeMeter
+        
+        thresholds = {0: 0.005, 1: 0.02, 2: 0.05, 3: 0.1, 4: 0.2}
+        meter = VolumeMeter(thresholds, 16000, history_duration=0.64, bin_duration=0.064)
+        received = []
+        meter.subscribe(received.append)
+        
+        for amplitude, expected_level in [(0.001, 0), (0.03, 1), (0.07, 2), (0.15, 3), (0.5, 4)]:
+            chunk = (np.sin(np.arange(1024) / 5) * amplitude * np.sqrt(2) * 32767).astype(np.int16)
+            level, rms = meter.update(chunk.tobytes())
+            reference = np.sqrt(np.mean((chunk.astype(np.float32) / 32768.0) ** 2))
+            print(f"Amplitude {amplitude}: Pegel {level}, RMS {rms:.4f} (Referenz {reference:.4f})")
+            if level != expected_level or abs(rms - reference) > 1e-4:
+                print("FEHLER: Pegel oder RMS stimmt nicht")
+                return False
+        
+        for _ in range(20):
+            meter.update(chunk.tobytes())
+        times, rms, peak, levels = meter.snapshot()
+        print(f"Historie: {len(times)} Einträge bis {times[-1]:.3f}s, {len(received)} Benachrichtigungen")
+        if len(times) != meter.capacity or len(received) != 25 or not np.all(np.diff(times) > 0):
+            print("FEHLER: Historie oder Benachrichtigungen unvollständig")
+            return False
+        if levels[-1] != 4 or abs(peak[-1] - 0.5 * np.sqrt(2)) > 0.01 or meter.level != 4:
+            print("FEHLER: Letzter Historien-Eintrag falsch")
+            return False
+        
+        print("✓ Lautstärkemesser funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Lautstärkemesser-Test: {e}")
+        return False
+
+def test_transcript_writer():
+    """Test 17: Gepufferter Transkript-Schreiber mit JSONL und Rotation"""
+    print("\n=== TEST 17: Transkript-Schreiber ===")
+    try:
+        import glob
+        import json
+        import tempfile
+        from transcript_writer import TranscriptWriter
+        
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "transcript.txt")
+            jsonl_path = os.path.join(directory, "transcript.jsonl")
+            writer = TranscriptWriter(text_path, jsonl_path, flush_interval=0.05, rotate_bytes=200,
+                                      header=lambda continuation: "=== Fortsetzung ===\n" if continuation else "=== Start ===\n")
+            writer.start()
+            for index in range(10):
+                writer.write(f"[00:00:{index:02d}] Zeile {index} " + "x" * 20,
+                             [{"type": "segment", "start": index, "end": index + 0.5, "text": f"Zeile {index}"}])
+            writer.close(footer="=== Ende ===")
+            
+            text_files = sorted(glob.glob(os.path.join(directory, "transcript*.txt")))
+            jsonl_files = sorted(glob.glob(os.path.join(directory, "transcript*.jsonl")))
+            print(f"{writer.rotations} Rotationen, {len(text_files)} Text- und {len(jsonl_files)} JSONL-Dateien")
+            if writer.rotations == 0 or len(text_files) != writer.rotations + 1 or len(jsonl_files) != len(text_files):
+                print("FEHLER: Rotation hat nicht funktioniert")
+                return False
+            
+            records = []
+            for path in jsonl_files:
+                with open(path, "r", encoding="utf-8") as f:
+                    records.extend(json.loads(line) for line in f)
+            text = ""
+            for path in [path for path in text_files if path != text_path] + [text_path]: # Aktive Datei zuletzt
+                with open(path, "r", encoding="utf-8") as f:
+                    text += f.read()
+            if sorted(record["start"] for record in records) != list(range(10)):
+                print("FEHLER: JSONL-Einträge fehlen")
+                return False
+            if text.count("Zeile") != 10 or "=== Fortsetzung ===" not in text or not text.rstrip().endswith("=== Ende ==="):
+                print("FEHLER: Textdateien unvollständig")
+                return False
+
+            # Mit der Rotation ist auch das Archiv festgeschrieben - ohne auf den nächsten Flush zu warten
+            import contextlib
+            import sqlite3
+            from transcript_store import TranscriptStore
+            store_path = os.path.join(directory, "archiv.sqlite3")
+            writer = TranscriptWriter(os.path.join(directory, "archiv.txt"), None, flush_interval=60, rotate_bytes=100,
+                                      store=TranscriptStore(store_path))
+            writer.start()
+            writer.write("[00:00:00] " + "x" * 120, [{"type": "segment", "id": 1, "start": 0.0, "end": 1.0,
+                                                      "time": "2026-10-17T20:00:00", "text": "x"}], 1)
+            deadline = time.time() + 5
+            while writer.rotations == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            with contextlib.closing(sqlite3.connect(store_path)) as connection:
+                committed = connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+            writer.close()
+            print(f"Nach der Rotation festgeschrieben: {committed} Segment(e)")
+            if committed != 1:
+                print("FEHLER: Archiv bei der Rotation nicht festgeschrieben")
+                return False
+
+        print("✓ Transkript-Schreiber funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Transkript-Schreiber-Test: {e}")
+        return False
+
+def test_transcript_store():
+    """Test 18: Transkript-Archiv mit Volltext- und Zeitraumsuche"""
+    print("\n=== TEST 18: Transkript-Archiv ===")
+    try:
+        import tempfile
+        from transcript_store import TranscriptStore
+        
+        with tempfile.TemporaryDirectory() as directory:
+            store = TranscriptStore(os.path.join(directory, "archiv.sqlite3"))
+            day = datetime(2026, 10, 1, 19, 0).timestamp()
+            words = ["Drache", "Taverne", "Würfel", "Zauber", "Schwert", "Gold"]
+            for session in range(2):
+                session_id = store.start_session(day + session * 86400)
+                records = [{"type": "segment", "start": i * 5.0, "end": i * 5.0 + 4,
+                            "time": day + session * 86400 + i * 5.0,
+                            "text": f"Die Gruppe findet {words[i % len(words)]} Nummer {i}"}
+                           for i in range(5000)]
+                records[1234]["text"] = "Wir reisen morgen nach Heidenheim an der Brenz"
+                store.add_segments(session_id, records)
+                store.commit()
+            
+            start_time = time.perf_counter()
+            keyword = store.search("Heidenheim")
+            phrase = store.search("nach Heidenheim", phrase=True, since=datetime(2026, 10, 2))
+            umlaut = store.search("wurfel", limit=10000) # Umlaute werden beim Index ignoriert
+            time_range = store.search(since=day + 600, until=day + 660)
+            elapsed = time.perf_counter() - start_time
+            store.close()
+        
+        print(f"Stichwort: {len(keyword)}, Wortfolge: {len(phrase)}, Umlaut: {len(umlaut)}, "
+              f"Zeitraum: {len(time_range)} Treffer in {elapsed * 1000:.1f} ms")
+        if len(keyword) != 2 or len(phrase) != 1 or phrase[0].session_id != 2:
+            print("FEHLER: Volltextsuche liefert falsche Treffer")
+            return False
+        if len(umlaut) != 2 * 833 or len(time_range) != 12:
+            print("FEHLER: Umlaut- oder Zeitraumsuche liefert falsche Treffer")
+            return False
+        
+        print("✓ Transkript-Archiv funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Transkript-Archiv-Test: {e}")
+        return False
+
+def test_mel_features():
+    """Test 19: Vorberechnete log-Mel-Merkmale entsprechen denen von faster-whisper"""
+    print("\n=== TEST 19: Vorberechnete Merkmale ===")
+    try:
+        from faster_whisper.feature_extractor import FeatureExtractor
+        from mel_features import StreamingMelExtractor, PrecomputedFeatureExtractor
+        
+        extractor = FeatureExtractor()
+        with wave.open("test_recording.wav", "rb") as wf:
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        
+        stream = StreamingMelExtractor(extractor.mel_filters, capacity_frames=1000)
+        for start in range(0, len(samples), 1024):
+            stream.process(samples[start:start + 1024].tobytes())
+        
+        # Fenster bis zum Aufnahmeende (letzte Frames aus dem Fenster-Audio) und mitten in der Aufnahme
+        end = len(samples) - len(samples) % 160
+        for window_start, window_end in [(16000, end), (16000, end - 480)]:
+            audio = samples[window_start:window_end].astype(np.float32) / 32768.0
+            expected = extractor(audio)
+            features = stream.window_features(window_start, window_end, audio)
+            # Die letzten zwei Frames hören mitten in der Aufnahme echtes Audio statt Stille
+            difference = np.abs(features - expected)[:, :-2].max()
+            print(f"Fenster {window_start/16000:.2f}-{window_end/16000:.2f}s: {features.shape[1]} Frames, "
+                  f"max. Abweichung {difference:.2e}")
+            if features.shape != expected.shape or difference > 1e-4:
+                print("FEHLER: Merkmale weichen von faster-whisper ab")
+                return False
+        
+        wrapper = PrecomputedFeatureExtractor(extractor)
+        wrapper.prepare(features)
+        if wrapper(audio) is not features or wrapper(audio).shape != expected.shape or wrapper.hop_length != 160:
+            print("FEHLER: Vorbereitete Merkmale werden nicht genau einmal verwendet")
+            return False
+        
+        print("✓ Vorberechnete Merkmale funktionieren")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Merkmals-Test: {e}")
+        return False
+
+def test_scheduler():
+    """Test 20: Lastabhängiger Scheduler (stille Fenster, Stufenwechsel)"""
+    print("\n=== TEST 20: Last-Scheduler ===")
+    try:
+        from scheduler import LoadScheduler, speech_fraction
+        
+        silence = np.zeros(16000, dtype=np.float32)
+        speech = silence.copy()
+        speech[:8192] = 0.1 * np.sin(np.arange(8192) / 3)
+        print(f"Sprachanteil: Stille {speech_fraction(silence, 0.01):.2f}, halb Sprache {speech_fraction(speech, 0.01):.2f}")
+        if speech_fraction(silence, 0.01) != 0.0 or abs(speech_fraction(speech, 0.01) - 8 / 15) > 1e-6:
+            print("FEHLER: Sprachanteil falsch berechnet")
+            return False
+        
+        decisions = []
+        scheduler = LoadScheduler([(None, None), (None, 1), (("tiny", "cpu", "int8"), 1)],
+                                  cooldown=2, on_decision=decisions.append)
+        if scheduler.should_transcribe(0.05) or not scheduler.should_transcribe(0.5):
+            print("FEHLER: Stilles Fenster nicht übersprungen")
+            return False
+        
+        # Überlast: Rechenzeit 1,5x Audiodauer -> zwei Stufen nach unten, nicht weiter
+        levels = [scheduler.record(4.0, 6.0, queue_depth=1).beam_size for _ in range(8)]
+        print(f"Stufen unter Last: {levels}")
+        if scheduler.level_index != 2 or scheduler.step_downs != 2:
+            print("FEHLER: Scheduler ist nicht auf die billigste Stufe gewechselt")
+            return False
+        
+        # Wieder Luft: schnelle Fenster und leere Warteschlange -> zurück zur besten Stufe
+        for _ in range(8):
+            scheduler.record(4.0, 0.4, queue_depth=0)
+        print(f"Entscheidungen: {[d['decision'] for d in decisions]}, Statistik: {scheduler.stats()}")
+        if scheduler.level_index != 0 or scheduler.step_ups != 2 or len(decisions) != 5:
+            print("FEHLER: Scheduler ist nicht zur besten Stufe zurückgekehrt")
+            return False
+        
+        print("✓ Last-Scheduler funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Scheduler-Test: {e}")
+        return False
+
+def test_refinement():
+    """Test 21: Überarbeitung von Entwurfszeilen (Refiner, Ersetzen in Textdatei, JSONL und Archiv)"""
+    print("\n=== TEST 21: Überarbeitung ===")
+    try:
+        import json
+        import tempfile
+        from refinement import Refiner, RefinementJob
+        from transcript_writer import TranscriptWriter
+        from transcript_store import TranscriptStore
+        
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "transcript.txt")
+            jsonl_path = os.path.join(directory, "transcript.jsonl")
+            store = TranscriptStore(os.path.join(directory, "archiv.sqlite3"))
+            writer = TranscriptWriter(text_path, jsonl_path, flush_interval=0.05, store=store)
+            writer.start()
+            
+            def record(line_id, text, revision):
+                return {"type": "segment", "id": line_id, "revision": revision, "start": float(line_id),
+                        "end": line_id + 0.9, "time": "2026-10-17T20:00:00", "text": text}
+            
+            drafts = {1: "Der Truck Queen greift an", 2: "Alle würfeln Initiative", 3: "Der Dragween fliegt davon"}
+            for line_id, text in drafts.items():
+                writer.write(f"[20:00:0{line_id}] {text}", [record(line_id, text, 0)], line_id)
+            
+            # Überarbeitung erst, wenn die Live-Stufe frei ist
+            idle = threading.Event()
+            corrections = {1: "Der Drachenkönig greift an", 3: "Der Drache fliegt davon"}
+            refined_lines = []
+            
+            def refine(job):
+                if not idle.is_set():
+                    raise AssertionError("Überarbeitung lief, obwohl die Live-Stufe beschäftigt war")
+                text = corrections.get(job.line_id)
+                if text is None:
+                    return False
+                writer.revise(job.line_id, f"[20:00:0{job.line_id}] {text}", [record(job.line_id, text, 1)])
+                refined_lines.append(job.line_id)
+                return True
+            
+            refiner = Refiner(refine, idle.is_set, idle_poll=0.01).start()
+            for line_id, text in drafts.items():
+                refiner.submit(RefinementJob(line_id, float(line_id), line_id + 0.9, float(line_id),
+                                             np.zeros(16000, dtype=np.int16), text, ""))
+            time.sleep(0.1)
+            if refined_lines:
+                print("FEHLER: Überarbeitung hat nicht auf die Live-Stufe gewartet")
+                return False
+            idle.set()
+            refiner.close(timeout=5)
+            writer.close(footer="=== Ende ===")
+            print(f"Überarbeitet: {refiner.refined}, unverändert: {refiner.unchanged}, fehlgeschlagen: {refiner.failed}")
+            if refiner.refined != 2 or refiner.unchanged != 1 or refiner.failed:
+                print("FEHLER: Falsche Zahl überarbeiteter Zeilen")
+                return False
+            
+            with open(text_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            expected = [f"[20:00:0{line_id}] {corrections.get(line_id, text)}" for line_id, text in drafts.items()]
+            print(f"Textdatei: {lines}")
+            if lines != expected + ["=== Ende ==="] or os.path.exists(text_path + ".tmp"):
+                print("FEHLER: Entwurfszeilen in der Textdatei nicht ersetzt")
+                return False
+            # Beide Überarbeitungen landen mit einem Neuschreiben (erst beim Schließen) in der Datei
+            print(f"Textdatei {writer.rewrites}x neu geschrieben, höchstens {writer.max_lines} Zeilen im Speicher")
+            if writer.rewrites != 1 or not writer.max_lines:
+                print("FEHLER: Textdatei bei jedem Flush neu geschrieben oder Zeilen unbegrenzt")
+                return False
+            
+            with open(jsonl_path, "r", encoding="utf-8") as f:
+                revisions = [(r["id"], r["revision"]) for r in map(json.loads, f)]
+            if revisions != [(1, 0), (2, 0), (3, 0), (1, 1), (3, 1)]:
+                print(f"FEHLER: JSONL-Fassungen falsch: {revisions}")
+                return False
+            
+            store = TranscriptStore(os.path.join(directory, "archiv.sqlite3"))
+            hits = store.search("Drache*")
+            stale = store.search("Dragween")
+            print(f"Archiv: {[(hit.text, hit.revision) for hit in hits]}")
+            if len(hits) != 2 or any(hit.revision != 1 for hit in hits) or stale:
+                print("FEHLER: Archiv enthält nicht nur die überarbeiteten Fassungen")
+                return False
+            
+            # Import einer JSONL mit Überarbeitungen übernimmt nur die letzte Fassung jeder Zeile
+            session_id, count = store.import_jsonl(jsonl_path)
+            store.close()
+            if count != 3:
+                print(f"FEHLER: Import übernimmt {count} statt 3 Segmente")
+                return False
+        
+        print("✓ Überarbeitung funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Überarbeitungs-Test: {e}")
+        return False
+
+def test_audio_archive():
+    """Test 22: Audio-Archiv (Chunk-Dateien, Index, Lesen per Memory-Mapping, Aufbewahrung)"""
+    print("\n=== TEST 22: Audio-Archiv ===")
+    try:
+        import tempfile
+        from audio_archive import AudioArchiver, ArchiveReader, sessions
+        
+        RATE = 16000
+        CHUNK_SIZE = 1024
+        audio = (np.arange(10 * RATE) % 30000).astype(np.int16)   # 10s, jedes Sample eindeutig genug
+        
+        with tempfile.TemporaryDirectory() as directory:
+            start_time = 1_700_000_000.0
+            archiver = AudioArchiver(directory, RATE, chunk_duration=1.5).start(started=start_time)
+            write_start = time.perf_counter()
+            for end in range(CHUNK_SIZE, len(audio) + 1, CHUNK_SIZE):
+                if end // CHUNK_SIZE == 20:
+                    continue   # Verlorener Chunk, muss als Stille aufgefüllt werden
+                archiver.write(audio[end - CHUNK_SIZE:end].tobytes(), end, start_time + end / RATE)
+            write_time = time.perf_counter() - write_start
+            archiver.close()
+            archived = len(audio) // CHUNK_SIZE * CHUNK_SIZE
+            print(f"{archived} Samples archiviert, write() insgesamt {write_time * 1000:.1f} ms")
+            
+            reader = ArchiveReader(sessions(directory)[0])
+            index = reader.index()
+            print(f"{len(index)} Chunks, Index: {index[['first_sample', 'samples', 'gap_samples']].tolist()}")
+            if reader.total_samples != archived or len(index) != -(-archived // reader.chunk_samples):
+                print("FEHLER: Index passt nicht zur Aufnahme")
+                return False
+            if int(index["gap_samples"].sum()) != CHUNK_SIZE:
+                print("FEHLER: Verlorener Chunk nicht als Lücke vermerkt")
+                return False
+            
+            # Bereich über eine Chunk-Grenze hinweg (Sekunden wie in transcript.jsonl)
+            samples = reader.read_segment({"start": 1.4, "end": 3.25})
+            if not np.array_equal(samples, audio[22400:52000]):
+                print("FEHLER: Gelesene Samples über Chunk-Grenzen stimmen nicht")
+                return False
+            gap = reader.read_samples(19 * CHUNK_SIZE, 20 * CHUNK_SIZE)
+            if gap.any():
+                print("FEHLER: Lücke enthält keine Stille")
+                return False
+            by_time = reader.read_time(start_time + 4.0, start_time + 4.5)
+            if not np.array_equal(by_time, audio[4 * RATE:int(4.5 * RATE)]):
+                print("FEHLER: Lesen nach Uhrzeit liefert falsche Samples")
+                return False
+            try:
+                reader.read(9.0, 11.0)
+                print("FEHLER: Bereich hinter dem Archivende wurde gelesen")
+                return False
+            except ValueError:
+                pass
+            reader.close()
+            
+            # Aufbewahrung: höchstens 2 Chunks (je 1,5s) im ganzen Archiv
+            limit = 2 * reader.chunk_samples * 2
+            archiver = AudioArchiver(directory, RATE, chunk_duration=1.5, max_bytes=limit).start(started=start_time)
+            for end in range(CHUNK_SIZE, len(audio) + 1, CHUNK_SIZE):
+                archiver.write(audio[end - CHUNK_SIZE:end].tobytes(), end, start_time + end / RATE)
+            archiver.close()
+            remaining = [name for session in sessions(directory) for name in os.listdir(session)
+                         if name.startswith("chunk_")]
+            print(f"Nach Aufbewahrung: {len(sessions(directory))} Session(s), {len(remaining)} Chunks, "
+                  f"{archiver.deleted_chunks} gelöscht")
+            if len(sessions(directory)) != 1 or len(remaining) > 3:
+                print("FEHLER: Größenlimit des Archivs nicht eingehalten")
+                return False
+            reader = ArchiveReader(archiver.directory)
+            if not np.array_equal(reader.read(9.0, 9.5), audio[9 * RATE:int(9.5 * RATE)]):
+                print("FEHLER: Neueste Samples nach Aufbewahrung nicht lesbar")
+                return False
+
+            # Mehrere Archiver im selben Verzeichnis räumen gleichzeitig auf, ohne sich zu stören
+            errors = []
+            shared_directory = os.path.join(directory, "shared")
+            archivers = [AudioArchiver(shared_directory, RATE, chunk_duration=0.25, max_bytes=limit,
+                                       log=errors.append).start(started=start_time, name=f"S{index}")
+                         for index in range(4)]
+            for end in range(CHUNK_SIZE, len(audio) + 1, CHUNK_SIZE):
+                for archiver in archivers:
+                    archiver.write(audio[end - CHUNK_SIZE:end].tobytes(), end, start_time + end / RATE)
+            for archiver in archivers:
+                archiver.close()
+            # Früher beendete Sessions darf ein noch laufender Archiver ganz entfernen, halbe Sessions bleiben nie
+            remaining = sessions(shared_directory)
+            print(f"Gemeinsames Verzeichnis: {len(remaining)} Sessions, "
+                  f"{sum(archiver.deleted_chunks for archiver in archivers)} gelöscht, Fehler: {errors}")
+            if (errors or archivers[-1].directory not in remaining
+                    or len(os.listdir(shared_directory)) != len(remaining)):
+                print("FEHLER: Aufbewahrung mehrerer Archiver stört sich gegenseitig")
+                return False
+
+            # Zur Laufzeit angelegte Sprecher (Stream-Server) bekommen eine eigene Session
+            import stt
+            server_directory = os.path.join(directory, "server")
+            original_streams = stt.speaker_streams
+            stt.speaker_streams = []
+            try:
+                stt.start_audio_archive(server_directory)
+                stream = stt.add_speaker_stream("Gast")
+                archiver = stream.archiver
+                if archiver is None or not os.path.basename(archiver.directory).endswith("-Gast"):
+                    print("FEHLER: Neuer Sprecher wird nicht archiviert")
+                    return False
+                archiver.write(audio[:RATE].tobytes(), RATE, start_time + 1.0)
+                stt.release_speaker_stream(stream)
+            finally:
+                stt.close_audio_archive()
+                stt.speaker_streams = original_streams
+            reader = ArchiveReader(archiver.directory)
+            print(f"Session des Gasts: {reader.total_samples} Samples")
+            if stream.archiver is not None or reader.total_samples != RATE:
+                print("FEHLER: Session beim Beenden des Sprechers nicht abgeschlossen")
+                return False
+
+        print("✓ Audio-Archiv funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Audio-Archiv-Test: {e}")
+        return False
+
+def test_multi_speaker():
+    """Test 23: Mehrere Sprecher (Kanäle trennen, Wasserstand, Zusammenführen nach Sprechzeit)"""
+    print("\n=== TEST 23: Mehrere Sprecher ===")
+    try:
+        from ring_buffer import AudioRingBuffer
+        from volume_meter import VolumeMeter
+        from endpointing import UtteranceEndpointer
+        from stitcher import TranscriptStitcher
+        from speaker_stream import SpeakerStream
+        from work_queue import TimeOrderedMerge
+        
+        RATE = 16000
+        CHUNK_SIZE = 1024
+        SPEAKERS = 3
+        thresholds = {0: 0.005, 1: 0.02, 2: 0.05, 3: 0.1, 4: 0.2}
+        streams = [SpeakerStream(index, f"Spieler {index + 1}", RATE, AudioRingBuffer(10 * RATE),
+                                 VolumeMeter(thresholds, RATE),
+                                 UtteranceEndpointer(0.005, 0.01, hangover=0.5 * RATE, min_speech=0.1 * RATE,
+                                                     max_utterance=8 * RATE, pre_roll=0.2 * RATE),
+                                 TranscriptStitcher())
+                   for index in range(SPEAKERS)]
+        
+        # Verschachtelte Frames: Spieler 2 spricht lauter und später als Spieler 1, Spieler 3 schweigt
+        frames = np.zeros((4 * RATE, SPEAKERS), dtype=np.int16)
+        tone = (np.sin(np.arange(RATE) / 5) * 8000).astype(np.int16)
+        frames[RATE // 2:3 * RATE // 2, 0] = tone
+        frames[RATE:2 * RATE, 1] = tone * 2
+        data = frames.tobytes()
+        
+        clock_start = 1_700_000_000.0
+        utterances = []
+        for stream in streams:
+            stream.clock_start = clock_start
+        for offset in range(0, len(data), CHUNK_SIZE * SPEAKERS * 2):
+            interleaved = np.frombuffer(data[offset:offset + CHUNK_SIZE * SPEAKERS * 2], dtype=np.int16)
+            channels = interleaved.reshape(-1, SPEAKERS).T
+            if not all(np.shares_memory(channel, interleaved) for channel in channels):
+                print("FEHLER: Kanäle wurden beim Trennen kopiert")
+                return False
+            for stream, samples in zip(streams, channels):
+                _, rms = stream.volume_meter.update(samples)
+                end_sample = stream.audio_buffer.write(samples)
+                utterance = stream.endpointer.process(rms, end_sample)
+                if utterance is not None:
+                    utterances.append(utterance._replace(stream=stream.index))
+                    stream.utterance_started(utterance.start_sample)
+                stream.capture_mark = stream.endpointer.open_start
+        
+        if not np.array_equal(streams[1].audio_buffer.read(RATE, 2 * RATE, dtype=np.int16), tone * 2):
+            print("FEHLER: Ringpuffer von Spieler 2 enthält nicht seinen Kanal")
+            return False
+        levels = [int(stream.volume_meter.snapshot(64)[3].max()) for stream in streams]
+        print(f"Äußerungen: {[(u.stream, u.start_sample, u.end_sample) for u in utterances]}, Höchstpegel: {levels}")
+        if [u.stream for u in utterances] != [0, 1] or not levels[1] > levels[0] > levels[2]:
+            print("FEHLER: Endpunkterkennung oder Pegel nicht je Sprecher getrennt")
+            return False
+        
+        # Ergebnisse kommen in beliebiger Reihenfolge - ausgegeben wird nach Sprechzeit
+        emitted = []
+        merge = TimeOrderedMerge(SPEAKERS, lambda source, item: emitted.append(item))
+        watermark = streams[0].watermark()
+        if watermark > clock_start + utterances[0].start_sample / RATE:
+            print("FEHLER: Wasserstand übergeht eine offene Äußerung")
+            return False
+        for stream in streams:
+            merge.advance(stream.index, stream.watermark())
+        for utterance in reversed(utterances):
+            stream = streams[utterance.stream]
+            merge.push(stream.index, stream.wall_time(utterance.start_sample / RATE), stream.name)
+            stream.utterance_finished(utterance.start_sample)
+            merge.advance(stream.index, stream.watermark())
+            if utterance.stream == 1 and emitted:
+                print("FEHLER: Spieler 2 vor der noch offenen Äußerung von Spieler 1 ausgegeben")
+                return False
+        print(f"Ausgabe: {emitted}")
+        if emitted != ["Spieler 1", "Spieler 2"]:
+            print("FEHLER: Zeilen nicht nach Sprechzeit zusammengeführt")
+            return False
+        
+        # Ein Sprecher mitten in einer Äußerung hält spätere Zeilen anderer zurück
+        merge.push(2, clock_start + 5.0, "später")
+        merge.advance(0, clock_start + 4.5)
+        merge.advance(1, clock_start + 6.0)
+        merge.advance(2, clock_start + 6.0)
+        if "später" in emitted:
+            print("FEHLER: Zeile vor dem Wasserstand eines anderen Sprechers ausgegeben")
+            return False
+        merge.advance(0, float("inf"))
+        if emitted[-1] != "später" or merge.pending_count():
+            print("FEHLER: Zurückgehaltene Zeile nicht ausgegeben")
+            return False
+        
+        print("✓ Mehrere Sprecher funktionieren")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Mehrsprecher-Test: {e}")
+        return False
+
+def test_batch_engine():
+    """Test 24: Batch-Inferenz (Bündeln, Zuordnung der Ergebnisse, Fehlerfall)"""
+    print("\n=== TEST 24: Batch-Inferenz ===")
+    try:
+        from collections import namedtuple
+        from work_queue import BoundedWorkQueue, ReorderBuffer
+        from batch_engine import BatchInferenceEngine, split_batch_segments
+        
+        # Wartende Aufträge mehrerer Quellen: (Quelle, Nummer)
+        work_queue = BoundedWorkQueue(16)
+        for index in range(7):
+            work_queue.put((index % 3, index))
+        work_queue.close()
+        
+        batches = []
+        def run_batch(items):
+            batches.append(len(items))
+            if len(batches) == 2:
+                raise RuntimeError("Modell nicht verfügbar")
+            return [f"Quelle {source}: {number}" for source, number in items]
+        
+        delivered = []
+        order = ReorderBuffer(lambda seq, result: delivered.append(result))
+        timings = []
+        def deliver(seq, item, result, timing):
+            timings.append(timing)
+            order.submit(seq, (item[0], result))
+        
+        engine = BatchInferenceEngine(work_queue, run_batch, deliver, max_batch_size=3, max_wait=0.05)
+        engine.start()
+        engine.join(timeout=5)
+        stats = engine.stats()
+        print(f"Batches: {batches}, Statistik: {stats}")
+        if batches != [3, 3, 1] or stats["requests"] != 7 or stats["failed"] != 3:
+            print("FEHLER: Aufträge nicht bis zur Batch-Größe gebündelt")
+            return False
+        expected = [(0, "Quelle 0: 0"), (1, "Quelle 1: 1"), (2, "Quelle 2: 2"), (0, None), (1, None), (2, None),
+                    (0, "Quelle 0: 6")]
+        if delivered != expected:
+            print(f"FEHLER: Ergebnisse falsch zugeordnet: {delivered}")
+            return False
+        if any(timing.batch_size not in (1, 3) or timing.waited < 0 for timing in timings):
+            print("FEHLER: Latenzangaben je Auftrag unplausibel")
+            return False
+        
+        # Ein einzelner Auftrag wartet höchstens max_wait auf weitere
+        work_queue = BoundedWorkQueue(4)
+        work_queue.put("allein")
+        engine = BatchInferenceEngine(work_queue, lambda items: items, lambda *args: None,
+                                      max_batch_size=8, max_wait=0.1)
+        start_time = time.perf_counter()
+        batch = engine.collect()
+        waited = time.perf_counter() - start_time
+        print(f"Einzelner Auftrag nach {waited * 1000:.0f} ms abgegeben")
+        if len(batch) != 1 or not 0.09 <= waited < 1.0:
+            print("FEHLER: Wartezeit des Batches nicht eingehalten")
+            return False
+        
+        # Segmente des aneinandergehängten Audios den Fenstern zuordnen
+        Segment = namedtuple("Segment", ["start", "end", "text"])
+        segments = [Segment(0.0, 2.5, "a"), Segment(2.5, 3.0, "b"), Segment(4.25, 6.0, "c")]
+        groups = split_batch_segments(segments, [0.0, 2.5, 4.0])
+        print(f"Zuordnung: {[[segment.text for segment in group] for group in groups]}")
+        if [[segment.text for segment in group] for group in groups] != [["a"], ["b"], ["c"]]:
+            print("FEHLER: Segmente falschen Fenstern zugeordnet")
+            return False
+        
+        # --batch 8: Ringpuffer (und damit Merkmale und VAD) fassen alle gebündelten Fenster
+        import stt
+        original = stt.RING_BUFFER_DURATION
+        try:
+            stt.configure_ring_buffer(2, 8)
+            expected = (stt.WORK_QUEUE_SIZE + 8) * stt.MAX_COALESCED_DURATION + stt.OVERLAP_DURATION
+            capacity = stt.create_speaker_stream(0).audio_buffer.capacity
+            print(f"Ringpuffer bei Batch-Größe 8: {stt.RING_BUFFER_DURATION}s, {capacity} Samples")
+            if stt.RING_BUFFER_DURATION != expected or capacity != expected * stt.RATE:
+                print("FEHLER: Ringpuffer nicht nach der Batch-Größe bemessen")
+                return False
+        finally:
+            stt.RING_BUFFER_DURATION = original
+            stt.resize_empty_rings()
+
+        # Gebündelte Fenster: ein Durchlauf je Prompt, Clips nur über die Sprachabschnitte des VAD
+        from types import SimpleNamespace
+        from endpointing import Utterance
+        from ring_buffer import AudioRingBuffer
+        class SpanVAD:
+            def __init__(self, spans):
+                self.spans = spans
+            def wait(self, sample, timeout):
+                return True
+            def speech_spans(self, start, end, *args):
+                return self.spans
+        class RecordingPipeline:
+            def __init__(self):
+                self.calls = []
+            def transcribe(self, audio, **kwargs):
+                self.calls.append((len(audio), kwargs["initial_prompt"], kwargs["clip_timestamps"]))
+                return [], None
+        def fake_stream(prompt, spans):
+            ring = AudioRingBuffer(4 * stt.RATE, dtype=np.int16)
+            ring.write(np.full(2 * stt.RATE, 1000, dtype=np.int16))
+            return SimpleNamespace(audio_buffer=ring, feature_stream=None, vad=SpanVAD(spans),
+                                   stitcher=SimpleNamespace(prompt=lambda: prompt))
+        rate = stt.RATE
+        model = object()
+        pipeline = RecordingPipeline()
+        original_streams = stt.speaker_streams
+        stt.batched_pipelines[id(model)] = pipeline
+        try:
+            stt.speaker_streams = [fake_stream("Anna", [(0, rate // 2), (rate, rate + rate // 2)]),
+                                   fake_stream("Ben", None), fake_stream("Anna", [(rate // 4, rate)])]
+            utterances = [Utterance(0, 2 * rate, False, 0), Utterance(0, 2 * rate, False, 1),
+                          Utterance(0, rate, False, 2)]
+            stt.transcribe_batch(model, utterances)
+        finally:
+            stt.speaker_streams = original_streams
+            del stt.batched_pipelines[id(model)]
+        calls = sorted((prompt, length, [(clip["start"], clip["end"]) for clip in clips])
+                       for length, prompt, clips in pipeline.calls)
+        print(f"Durchläufe: {calls}")
+        if calls != [("Anna", 3 * rate, [(0.0, 0.5), (1.0, 1.5), (2.25, 3.0)]), ("Ben", 2 * rate, [(0.0, 2.0)])]:
+            print("FEHLER: Batch nicht nach Prompt getrennt oder Clips nicht aus den Sprachabschnitten")
+            return False
+
+        print("✓ Batch-Inferenz funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Batch-Inferenz-Test: {e}")
+        return False
+
+def test_stream_server():
+    """Test 25: Stream-Server (PCM über Unix-Socket, Text zurück, langsame Zuhörer abhängen)"""
+    print("\n=== TEST 25: Stream-Server ===")
+    try:
+        import asyncio
+        import json
+        import tempfile
+        from collections import namedtuple
+        from audio_source import PushSource
+        import stt
+        import stream_server
+        
+        # Zuschieben in beliebigen Stücken, gelesen wird in ganzen Chunks
+        source = PushSource(16000, max_bytes=4096)
+        accepted = [source.push(bytes(3000)), source.push(bytes(3000)), source.push(bytes(10))]
+        source.finish()
+        sizes = [len(source.read(1024)) for _ in range(4)]
+        print(f"push: {accepted}, read: {sizes}")
+        if accepted != [True, True, False] or sizes != [2048, 2048, 1904, 0]:
+            print("FEHLER: PushSource puffert oder stückelt falsch")
+            return False
+        
+        Word = namedtuple("Word", ["start", "end", "word", "probability"])
+        Segment = namedtuple("Segment", ["start", "end", "text", "words", "avg_logprob", "no_speech_prob"])
+        Info = namedtuple("Info", ["language", "language_probability"])
+        
+        class WordModel:
+            """Platzhalter: hört in jedem Fenster das Wort 'Initiative'"""
+            def transcribe(self, audio, **kwargs):
+                duration = len(audio) / 16000
+                word = Word(0.1, min(duration, 0.6), " Initiative", 0.9)
+                return iter([Segment(0.0, duration, " Initiative", [word], -0.2, 0.01)]), Info("de", 1.0)
+        
+        directory = tempfile.mkdtemp()
+        stt.DEBUG = False
+        stt.TRANSCRIPT_FILE = os.path.join(directory, "server.txt")
+        stt.TRANSCRIPT_JSONL_FILE = None
+        stt.TRANSCRIPT_STORE_FILE = None
+        stt.model_manager.loader = lambda *args, **kwargs: WordModel()
+        stt.STREAMING_VAD = False # Der Sinuston ist für den VAD keine Sprache
+        stt.setup_speakers([])
+        stt.initialize_transcript_file()
+        threading.Thread(target=stt.transcribe_audio, daemon=True).start()
+        
+        # 1,5 s Ton, danach Stille - eine Äußerung
+        tone = (np.sin(np.arange(int(1.5 * 16000)) / 5) * 8000).astype(np.int16)
+        audio = np.concatenate([tone, np.zeros(16000, dtype=np.int16)]).tobytes()
+        
+        async def read_until_end(reader):
+            events = []
+            async for line in reader:
+                events.append(json.loads(line))
+                if events[-1]["type"] in ("end", "error"):
+                    break
+            return events
+        
+        async def scenario():
+            server = stream_server.StreamServer(queue_size=50)
+            path = os.path.join(directory, "stt.sock")
+            await server.start(unix_path=path)
+            listener_reader, listener_writer = await asyncio.open_unix_connection(path)
+            listener_writer.write(b'{"type": "subscribe", "speakers": ["Anna"]}\n')
+            await listener_reader.readline() # ready
+            
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"type": "stream", "name": "Anna", "levels": false}\n' + audio)
+            writer.write_eof()
+            events = await read_until_end(reader)
+            listened = await read_until_end(listener_reader)
+            
+            # Ein Zuhörer, der nichts abholt: 51 Ereignisse auf einmal überfüllen seine Warteschlange
+            slow_reader, slow_writer = await asyncio.open_unix_connection(path)
+            slow_writer.write(b'{"type": "subscribe", "speakers": ["Ben"]}\n')
+            await slow_reader.readline()
+            for index in range(51):
+                server._broadcast({"type": "final", "stream": 99, "speaker": "Ben", "text": str(index)})
+            evicted = await asyncio.wait_for(slow_reader.read(), 5) == b""  # Verbindung getrennt
+            # Nach dem Ende bleibt vom Sprecher nur ein Platzhalter
+            while not stt.speaker_streams[0].released:
+                await asyncio.sleep(0.01)
+            await server.close()
+            return events, listened, evicted, server.stats()
+        
+        events, listened, evicted, stats = asyncio.run(asyncio.wait_for(scenario(), 30))
+        released = stt.speaker_streams[0]
+        stt.close_transcript_file()
+        print(f"Sender: {[(event['type'], event.get('text')) for event in events]}")
+        print(f"Zuhörer: {[(event['type'], event.get('speaker')) for event in listened]}, Statistik: {stats}")
+        if [event["type"] for event in events][0] != "ready" or events[-1]["type"] != "end":
+            print("FEHLER: Stream nicht vollständig abgewickelt")
+            return False
+        if [event["text"] for event in events if event["type"] == "final"] != ["Initiative"]:
+            print("FEHLER: Text nicht an den Sender zurückgeschickt")
+            return False
+        if [(event["type"], event["speaker"]) for event in listened] != [("final", "Anna"), ("end", "Anna")]:
+            print("FEHLER: Zuhörer hat die Zeile nicht bekommen")
+            return False
+        with open(stt.TRANSCRIPT_FILE, "r", encoding="utf-8") as f:
+            if "Anna: Initiative" not in f.read():
+                print("FEHLER: Zeile fehlt im Transkript")
+                return False
+        if not evicted or stats["evictions"] != 1:
+            print("FEHLER: Langsamer Zuhörer wurde nicht abgehängt")
+            return False
+        print(f"Beendeter Sprecher: {type(released).__name__} '{released.name}', "
+              f"Warteschlange {stt.utterance_queue.maxsize} Plätze")
+        if hasattr(released, "audio_buffer") or released.name != "Anna" or stt.transcript_latency.count(speaker="Anna"):
+            print("FEHLER: Beendeter Sprecher hält noch Puffer oder Metriken")
+            return False
+        if stt.utterance_queue.maxsize != stt.WORK_QUEUE_SIZE:
+            print("FEHLER: Warteschlange nach dem Ende nicht wieder verkleinert")
+            return False
+        
+        # Der Platz wird erst nach den wartenden Überarbeitungen des beendeten Sprechers neu vergeben
+        stt.refinements_pending[0] += 1
+        waiting = stt.add_speaker_stream("Ben")
+        stt.refinement_done(namedtuple("Job", ["stream"])(0))
+        reused = stt.add_speaker_stream("Carla")
+        print(f"Neue Sprecher: Ben -> Platz {waiting.index}, Carla -> Platz {reused.index}, "
+              f"{len(stt.speaker_streams)} Plätze")
+        stt.release_speaker_stream(waiting)
+        stt.release_speaker_stream(reused)
+        if waiting.index != 1 or reused.index != 0 or len(stt.speaker_streams) != 2:
+            print("FEHLER: Plätze beendeter Sprecher werden nicht wiederverwendet")
+            return False
+        
+        print("✓ Stream-Server funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Stream-Server-Test: {e}")
+        return False
+
+def test_resampler():
+    """Test 26: Resampler (native Geräte-Rate und Kanäle -> 16 kHz mono)"""
+    print("\n=== TEST 26: Resampler ===")
+    try:
+        from resampler import StreamingResampler, InputConverter, benchmark
+        
+        # 44,1 kHz Sinus: in krummen Blöcken dasselbe Ergebnis wie am Stück
+        rate = 44100
+        t = np.arange(rate) / rate
+        signal = (np.sin(2 * np.pi * 1000 * t) * 10000).astype(np.float32)[:, None]
+        whole = StreamingResampler(rate, 16000).process(signal)
+        resampler = StreamingResampler(rate, 16000)
+        blocks = [resampler.process(signal[start:start + 1234]) for start in range(0, rate, 1234)]
+        chunked = np.concatenate(blocks)
+        print(f"Am Stück: {len(whole)} Samples, in Blöcken: {len(chunked)} Samples")
+        if len(chunked) != len(whole) or not np.allclose(chunked, whole, atol=1e-2):
+            print("FEHLER: Blockgrenzen verändern das Ergebnis")
+            return False
+        
+        # Vergleich mit dem idealen 1-kHz-Sinus bei 16 kHz (Verzögerung des Filters herausgerechnet)
+        delay = 16 # zero_crossings Perioden der Ausgangs-Rate
+        expected = np.sin(2 * np.pi * 1000 * (np.arange(len(whole)) - delay) / 16000) * 10000
+        error = whole[delay + 100:-100, 0] - expected[delay + 100:-100]
+        snr = 10 * np.log10(np.mean(expected[delay + 100:-100] ** 2) / np.mean(error ** 2))
+        print(f"Signal-Rausch-Abstand: {snr:.1f} dB")
+        if snr < 60:
+            print("FEHLER: Resampler zu ungenau")
+            return False
+        
+        # 12 kHz liegt über der neuen Nyquist-Frequenz und muss verschwinden statt bei 4 kHz aufzutauchen
+        alias = StreamingResampler(48000, 16000).process(
+            (np.sin(2 * np.pi * 12000 * np.arange(48000) / 48000) * 10000)[:, None])
+        suppression = 20 * np.log10(10000 / np.sqrt(2) / np.sqrt(np.mean(alias[100:-100] ** 2)))
+        print(f"Aliasing-Dämpfung (12 kHz): {suppression:.1f} dB")
+        if suppression < 60:
+            print("FEHLER: Aliasing nicht ausreichend gedämpft")
+            return False
+        
+        # Stereo 48 kHz -> 16 kHz mono: gemittelt, int16
+        left = np.full(4800, 1000, dtype=np.int16)
+        stereo = np.stack([left, -left // 2], axis=1).tobytes()
+        converter = InputConverter(48000, 2, 16000)
+        converter.process(stereo)
+        frames = converter.process(stereo)
+        print(f"Stereo -> {frames.shape} {frames.dtype}, Mitte: {frames[len(frames) // 2, 0]}")
+        if frames.shape[1] != 1 or frames.dtype != np.int16 or abs(int(frames[len(frames) // 2, 0]) - 250) > 2:
+            print("FEHLER: Downmix falsch")
+            return False
+        
+        cost = benchmark(48000, 2, seconds=5)
+        print(f"CPU-Kosten 48 kHz stereo: {cost * 100:.2f}% eines Kerns")
+        
+        print("✓ Resampler funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Resampler-Test: {e}")
+        return False
+
+def test_metrics():
+    """Test 27: Metriken (Prometheus-Text, JSON, Lock-Zeiten) und Stichproben-Profiler"""
+    print("\n=== TEST 27: Metriken und Profiler ===")
+    try:
+        import json
+        import tempfile
+        import urllib.request
+        from metrics import MetricsRegistry, TimedLock, SnapshotWriter, start_http_server
+        from work_queue import BoundedWorkQueue
+        from profiler import SamplingProfiler
+        
+        registry = MetricsRegistry()
+        chunks = registry.counter("test_chunks_total", "Gelesene Chunks")
+        latency = registry.histogram("test_latency_seconds", "Latenz", ["speaker"], buckets=(0.1, 0.5, 1.0))
+        depth = {"Anna": 2, "Ben": 0}
+        registry.gauge("test_queue_depth", "Wartende Aufträge", ["speaker"],
+                       callback=lambda: {(name,): value for name, value in depth.items()})
+        chunks.inc()
+        chunks.inc(2)
+        for value in (0.05, 0.2, 0.3, 0.7, 3.0):
+            latency.observe(value, speaker="Anna")
+        text = registry.render()
+        expected = ['test_chunks_total 3.0', 'test_queue_depth{speaker="Anna"} 2.0',
+                    'test_latency_seconds_bucket{speaker="Anna",le="0.5"} 3.0',
+                    'test_latency_seconds_bucket{speaker="Anna",le="+Inf"} 5.0',
+                    'test_latency_seconds_count{speaker="Anna"} 5.0', '# TYPE test_latency_seconds histogram']
+        missing = [line for line in expected if line not in text.splitlines()]
+        median = latency.quantile(0.5, speaker="Anna")
+        print(f"Median: {median:.2f}s, fehlende Zeilen: {missing}")
+        if missing or not 0.1 <= median <= 0.5:
+            print("FEHLER: Prometheus-Text oder Quantil falsch")
+            return False
+        
+        # Lock der Warteschlange: Warte- und Haltezeiten landen im Histogramm
+        wait = registry.histogram("test_lock_wait_seconds", "Wartezeit", ["lock"])
+        hold = registry.histogram("test_lock_hold_seconds", "Haltezeit", ["lock"])
+        queue = BoundedWorkQueue(4, lock=TimedLock("queue", wait, hold))
+        consumer = threading.Thread(target=lambda: [queue.get() for _ in range(3)])
+        consumer.start()
+        for item in range(3):
+            queue.put(item)
+        consumer.join(5)
+        print(f"Lock: {wait.count(lock='queue')} Erwerbe, Haltezeit p95 {hold.quantile(0.95, lock='queue') * 1e6:.0f} µs")
+        if consumer.is_alive() or wait.count(lock="queue") < 6 or wait.count(lock="queue") != hold.count(lock="queue"):
+            print("FEHLER: Lock-Zeiten nicht erfasst")
+            return False
+        
+        # HTTP-Endpunkt (nur localhost) und JSON-Schnappschuss
+        server = start_http_server(registry, 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            scraped = urllib.request.urlopen(url + "/metrics", timeout=5).read().decode("utf-8")
+            snapshot = json.loads(urllib.request.urlopen(url + "/metrics.json", timeout=5).read())
+        finally:
+            server.shutdown()
+            server.server_close()
+        path = os.path.join(tempfile.mkdtemp(), "metrics.json")
+        SnapshotWriter(registry, path, interval=60).close()
+        with open(path, "r", encoding="utf-8") as f:
+            written = json.load(f)
+        print(f"Endpunkt: {len(scraped.splitlines())} Zeilen, JSON: {snapshot['metrics']['test_latency_seconds']}")
+        if "test_chunks_total 3.0" not in scraped or written["metrics"]["test_chunks_total"] != 3:
+            print("FEHLER: Export unvollständig")
+            return False
+        
+        # Profiler: Stichproben nur innerhalb von section()
+        def busy_transcribe(seconds):
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                sum(range(1000))
+        
+        profiler = SamplingProfiler(interval=0.002).start()
+        busy_transcribe(0.1)
+        outside = profiler.samples
+        with profiler.section():
+            busy_transcribe(0.2)
+        profiler.close()
+        print(f"Profiler: {outside} Stichproben außerhalb, {profiler.samples} im Abschnitt, top: {profiler.top(2)}")
+        if outside != 0 or profiler.samples < 10 or not any("busy_transcribe" in line for line in profiler.collapsed()):
+            print("FEHLER: Profiler sammelt falsch")
+            return False
+        
+        print("✓ Metriken und Profiler funktionieren")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Metrik-Test: {e}")
+        return False
+
+def test_streaming_vad():
+    """Test 28: Streaming-VAD (jeder Frame einmal, Zustand über Blöcke, Sprachabschnitte)"""
+    print("\n=== TEST 28: Streaming-VAD ===")
+    try:
+        from faster_whisper.vad import get_vad_model
+        from ring_buffer import AudioRingBuffer
+        from streaming_vad import StreamingVAD, VADWorker, load_silero_session
+        
+        with wave.open("test_recording.wav", "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        audio = audio[:len(audio) // 512 * 512]
+        samples = audio.astype(np.float32) / 32768
+        
+        # In krummen Blöcken dieselben Wahrscheinlichkeiten wie in einem Durchlauf über alles
+        whole = get_vad_model()(samples.copy()).reshape(-1)
+        vad = StreamingVAD(load_silero_session(), len(audio))
+        offset = 0
+        for frames in (1, 3, 10, 2, len(audio)):
+            block = samples[offset:offset + frames * 512]
+            if len(block):
+                vad.process(block)
+            offset += len(block)
+        _, streamed = vad.frame_probabilities(0, len(audio))
+        print(f"{vad.frames_done} Frames, größte Abweichung zum Gesamtdurchlauf: {np.abs(streamed - whole).max():.2e}")
+        if vad.frames_done != len(audio) // 512 or not np.allclose(streamed, whole, atol=1e-3):
+            print("FEHLER: Zustand geht zwischen den Blöcken verloren")
+            return False
+        
+        spans = vad.speech_spans(0, len(audio), min_silence=8000, pad=6400)
+        print(f"Sprachabschnitte: {[(round(start / 16000, 2), round(end / 16000, 2)) for start, end in spans]}")
+        if not spans or any(not 0 <= start < end <= len(audio) for start, end in spans):
+            print("FEHLER: Keine gültigen Sprachabschnitte in der Aufnahme")
+            return False
+
+        # min_speech verwirft kurze Ausreißer, max_speech teilt an der letzten Pause, ohne Pause hart
+        class ScriptedSession:
+            def __init__(self, probabilities):
+                self.probabilities = probabilities
+            def run(self, outputs, inputs):
+                return np.asarray(self.probabilities, dtype=np.float32)[:, None], inputs["h"], inputs["c"]
+        script = np.zeros(200)
+        script[10:12] = script[30:50] = script[52:70] = script[100:160] = 0.9
+        vad = StreamingVAD(ScriptedSession(script), 200 * 512)
+        vad.process(np.zeros(200 * 512, dtype=np.float32))
+        plain = vad.speech_spans(0, 200 * 512, min_silence=4 * 512, pad=0)
+        limited = vad.speech_spans(0, 200 * 512, min_silence=4 * 512, pad=0, min_speech=4 * 512, max_speech=30 * 512)
+        padded = vad.speech_spans(0, 200 * 512, min_silence=4 * 512, pad=512, min_speech=4 * 512, max_speech=30 * 512)
+        print(f"Frames ohne Grenzen: {[(start // 512, end // 512) for start, end in plain]}, "
+              f"mit: {[(start // 512, end // 512) for start, end in limited]}")
+        if plain != [(10 * 512, 12 * 512), (30 * 512, 70 * 512), (100 * 512, 160 * 512)]:
+            print("FEHLER: Sprachabschnitte ohne Grenzen falsch")
+            return False
+        if limited != [(30 * 512, 50 * 512), (52 * 512, 70 * 512), (100 * 512, 130 * 512), (130 * 512, 160 * 512)]:
+            print("FEHLER: min_speech/max_speech nicht angewendet")
+            return False
+        if len(padded) != 4 or any(end - start > 30 * 512 + 512 for start, end in padded):
+            print(f"FEHLER: Rand legt geteilte Abschnitte wieder zusammen: {padded}")
+            return False
+
+        # Worker: liest neues Audio aus dem Ringpuffer, die Aufnahme rechnet nichts
+        silence = np.zeros(16000, dtype=np.int16)
+        tone = (np.sin(np.arange(16000) / 5) * 8000).astype(np.int16)
+        buffer = AudioRingBuffer(10 * 16000)
+        vad = StreamingVAD(load_silero_session(), 10 * 16000)
+        worker = VADWorker(lambda: [(vad, buffer)], poll_interval=0.01).start()
+        for chunk in np.array_split(np.concatenate([silence, tone, audio]), 50):
+            buffer.write(chunk)
+            worker.notify()
+        end_sample = buffer.total_written
+        finished = vad.wait(end_sample, 10)
+        worker.close(5)
+        noise_spans = vad.speech_spans(0, 32000)
+        speech_spans = vad.speech_spans(32000, end_sample)
+        cost = vad.seconds / (end_sample / 16000)
+        print(f"Worker: {vad.frames_done} Frames, Stille+Ton: {noise_spans}, Sprache: {len(speech_spans)} Abschnitt(e), "
+              f"{cost * 100:.2f}% eines Kerns pro Audio-Sekunde")
+        if not finished or vad.frames_done != end_sample // 512 or noise_spans or not speech_spans:
+            print("FEHLER: Worker bewertet falsch oder unvollständig")
+            return False
+        
+        # Mehrere Aufnahme-Threads (z.B. Verbindungen des Stream-Servers) teilen eine Sitzung und einen Worker
+        import stt
+        loads = []
+        def slow_load():
+            loads.append(threading.get_ident())
+            time.sleep(0.05)
+            return load_silero_session()
+        saved = stt.vad_session, stt.load_silero_session
+        stt.vad_session, stt.load_silero_session = None, slow_load
+        try:
+            vads = []
+            threads = [threading.Thread(target=lambda: vads.append(stt.create_vad())) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stt.vad_session, stt.load_silero_session = saved
+        print(f"4 Aufnahme-Threads: Silero {len(loads)}x geladen, {len(set(id(vad.session) for vad in vads))} Sitzung(en)")
+        if len(loads) != 1 or len(set(id(vad.session) for vad in vads)) != 1:
+            print("FEHLER: VAD-Sitzung mehrfach geladen")
+            return False
+        
+        # Hat read_window() den Fensteranfang nach vorn geschoben, liegen keine Abschnitte davor
+        clamped = stt.clamp_speech([(100, 900), (1200, 1500), (3000, 5000)], 1000, 4000)
+        print(f"Auf [1000, 4000) beschnitten: {clamped}")
+        if clamped != [(1200, 1500), (3000, 4000)] or stt.clamp_speech(None, 0, 1) is not None:
+            print("FEHLER: Sprachabschnitte nicht auf das Fenster beschnitten")
+            return False
+        
+        print("✓ Streaming-VAD funktioniert")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Streaming-VAD-Test: {e}")
+        return False
+
+def test_soak_memory():
+    """Test 29: Soak-Test und Speicher-Budget (Proben, Steigung, begrenztes Transkript, Modell-Cache)"""
+    print("\n=== TEST 29: Soak-Test und Speicher-Budget ===")
+    try:
+        import tempfile
+        from collections import namedtuple
+        from memory_monitor import MemoryMonitor, growth_per_hour, process_rss
+        from transcript_writer import TranscriptWriter
+        import stt
+        import soak_test
+        
+        # Transkript mit höchstens 3 Zeilen im Speicher: ältere bleiben unverändert in der Datei
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "transcript.txt")
+            limits = []
+            writer = TranscriptWriter(path, flush_interval=60, header=lambda continuation: "=== Start ===\n",
+                                      max_lines=3, on_limit=limits.append)
+            writer.start()
+            for line_id in range(1, 5):
+                writer.write(f"Zeile {line_id} äöü", line_id=line_id)
+            writer.revise(4, "Zeile 4 überarbeitet") # Wird erst geschrieben, bevor Zeile 4 eingefroren wird
+            for line_id in range(5, 8):
+                writer.write(f"Zeile {line_id} äöü", line_id=line_id)
+            writer.revise(2, "Zeile 2 zu spät")      # Eingefroren - bleibt in der Textdatei stehen
+            writer.revise(6, "Zeile 6 überarbeitet")
+            writer.close()
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        expected = ["=== Start ===", "Zeile 1 äöü", "Zeile 2 äöü", "Zeile 3 äöü", "Zeile 4 überarbeitet",
+                    "Zeile 5 äöü", "Zeile 6 überarbeitet", "Zeile 7 äöü"]
+        print(f"Textdatei: {lines}, {writer.lines_in_memory} Zeilen im Speicher, eingefroren: {limits}")
+        if lines != expected or writer.lines_in_memory != 3 or writer.frozen_lines != 5 or not limits:
+            print("FEHLER: Begrenztes Transkript falsch geschrieben")
+            return False
+        
+        # Monitor: Proben mit eigener Uhr, ausgedünnte Historie, Grenze einmal je Überschreiten
+        clock = [0.0]
+        retained = []
+        exceeded = []
+        monitor = MemoryMonitor(clock=lambda: clock[0], probes={"retained": lambda: len(retained)}, max_samples=8,
+                                limit_bytes=1, on_limit=exceeded.append)
+        for step in range(20):
+            clock[0] = step * 360.0
+            retained.extend(range(100)) # 1000 Einträge pro Stunde
+            monitor.sample()
+        slope = growth_per_hour(monitor.samples, "retained")
+        print(f"RSS {process_rss() / 2**20:.0f} MB, {len(monitor.samples)} Proben, Steigung {slope:.0f}/h, "
+              f"Grenze {len(exceeded)}x überschritten")
+        if len(monitor.samples) > 8 or monitor.samples[0]["clock"] != 0.0 or abs(slope - 1000) > 1e-6:
+            print("FEHLER: Proben oder Steigung falsch")
+            return False
+        if len(exceeded) != 1 or monitor.latest["threads"] < 1:
+            print("FEHLER: Speicher-Grenze oder Thread-Zählung falsch")
+            return False
+        
+        # Bewertung: 20 MB/h Zuwachs und ein zusätzlicher Thread schlagen fehl, flache Werte nicht
+        leaky = [{"clock": hour * 3600.0, "rss_bytes": (100 + 20 * hour) * 2**20, "threads": 4 + (hour > 6),
+                  "open_files": 5, "garbage": 0} for hour in range(10)]
+        flat = [dict(sample, rss_bytes=100 * 2**20, threads=4) for sample in leaky]
+        _, leaky_failures = soak_test.evaluate(leaky, 3600)
+        _, flat_failures = soak_test.evaluate(flat, 3600)
+        print(f"Leck: {leaky_failures}, flach: {flat_failures}")
+        if len(leaky_failures) != 2 or flat_failures:
+            print("FEHLER: Soak-Bewertung falsch")
+            return False
+        # Nur Höchststand (macOS) oder gar kein RSS: die RSS-Prüfung entfällt und wird als solche ausgewiesen
+        peak_summary, peak_failures = soak_test.evaluate(leaky, 3600, rss_source="peak")
+        unknown = [dict(sample, rss_bytes=None) for sample in flat]
+        unknown_summary, unknown_failures = soak_test.evaluate(unknown, 3600, rss_source=None)
+        print(f"Höchststand: {peak_failures}, {peak_summary['rss_check']}; ohne RSS: {unknown_failures}")
+        if len(peak_failures) != 1 or "RSS" in peak_failures[0] or unknown_failures or "rss_check" not in unknown_summary:
+            print("FEHLER: RSS-Prüfung ohne aktuellen RSS nicht ausgesetzt")
+            return False
+        
+        # Globale Einstellungen von stt gelten nur für diesen Test - danach laufen weitere Tests im selben Prozess
+        saved = {name: getattr(stt, name) for name in (
+            "DEBUG", "TRANSCRIPT_FILE", "TRANSCRIPT_JSONL_FILE", "TRANSCRIPT_STORE_FILE", "MEMORY_BUDGET",
+            "MEMORY_LIMIT_MB", "MEMORY_LEVEL_MODELS", "RING_BUFFER_DURATION", "utterance_queue", "speaker_streams",
+            "speaker_merge")}
+        saved_loader = stt.model_manager.loader
+        saved_kwargs = dict(stt.model_manager.model_kwargs)
+        try:
+            # Modell-Cache: mit MEMORY_LEVEL_MODELS = 1 wird das zuletzt unbenutzte Stufen-Modell entladen
+            Level = namedtuple("Level", ["model_config", "beam_size"])
+            stt.DEBUG = False
+            stt.MEMORY_BUDGET, stt.MEMORY_LEVEL_MODELS = True, 1
+            stt.model_manager.loader = lambda *args, **kwargs: object()
+            stt.level_models.clear()
+            hits = stt.memory_cap_hits.snapshot().get("level_models", 0)
+            stt.model_for_level(Level(("tiny", "cpu", "int8"), 1), "haupt")
+            stt.model_for_level(Level(("base", "cpu", "int8"), 1), "haupt")
+            cached = list(stt.level_models)
+            stt.MEMORY_BUDGET = False
+            stt.model_manager.loader = saved_loader
+            stt.unload_level_models()
+            print(f"Stufen-Modelle: {cached}, Cache-Grenze {stt.memory_cap_hits.snapshot().get('level_models', 0) - hits}x")
+            if cached != [("base", "cpu", "int8")] or stt.memory_cap_hits.snapshot()["level_models"] != hits + 1:
+                print("FEHLER: Modell-Cache nicht begrenzt")
+                return False
+            
+            # Kurzer Soak-Lauf durch die komplette Pipeline mit Platzhalter-Modell
+            Word = namedtuple("Word", ["start", "end", "word", "probability"])
+            Segment = namedtuple("Segment", ["start", "end", "text", "words", "avg_logprob", "no_speech_prob"])
+            Info = namedtuple("Info", ["language", "language_probability"])
+            
+            class WordModel:
+                def transcribe(self, audio, **kwargs):
+                    duration = len(audio) / 16000
+                    word = Word(0.1, min(duration, 0.6), " Initiative", 0.9)
+                    return iter([Segment(0.0, duration, " Initiative", [word], -0.2, 0.01)]), Info("de", 1.0)
+            
+            if not stt.model_manager.ready:
+                stt.model_manager.loader = lambda *args, **kwargs: WordModel()
+            stt.setup_speakers([""])
+            directory = tempfile.mkdtemp()
+            report = soak_test.run_soak("test_recording.wav", hours=0.01, sample_interval=0.1, memory_budget=True,
+                                        max_rss_growth=float("inf"), max_traced_growth=float("inf"),
+                                        transcript_file=os.path.join(directory, "soak.txt"))
+            print(f"Soak: {report['input']['audio_hours'] * 3600:.0f}s Audio in {report['wall_seconds']:.1f}s, "
+                  f"{report['samples']} Proben, Puffer {report['pipeline']['ring_buffer_seconds']}, "
+                  f"Budget {report['memory_cap_hits']}, Verstöße {report['failures']}")
+            if report["input"]["audio_hours"] < 0.01 or report["samples"] < 2 or report["config"]["ring_buffer_seconds"] > 60:
+                print("FEHLER: Soak-Lauf unvollständig")
+                return False
+            if report["memory_cap_hits"].get("ring_buffer") != 1 or report["pipeline"]["ring_buffer_seconds"]["max"] > 60:
+                print("FEHLER: Ringpuffer nicht begrenzt")
+                return False
+            if stt.utterance_queue is not saved["utterance_queue"] or stt.utterance_queue._closed:
+                print("FEHLER: Soak-Lauf hinterlässt eine fremde oder geschlossene Warteschlange")
+                return False
+        finally:
+            for name, value in saved.items():
+                setattr(stt, name, value)
+            stt.model_manager.loader = saved_loader
+            stt.model_manager.model_kwargs = saved_kwargs
+        
+        print("✓ Soak-Test und Speicher-Budget funktionieren")
+        return True
+        
+    except Exception as e:
+        print(f"FEHLER bei Soak-Test: {e}")
+        return False
+
 def main():
     """Führe alle Tests aus"""
     print("🔧 STT DIAGNOSE-TESTS STARTEN 🔧")
@@ -250,6 +1889,75 @@ def main():
     # Test 6: Puffer-Simulation
     results['buffer_logic'] = test_buffer_simulation()
     
+    # Test 7: Ringpuffer
+    results['ring_buffer'] = test_ring_buffer()
+    
+    # Test 8: Endpunkterkennung
+    results['endpointing'] = test_endpointing()
+    
+    # Test 9: Warteschlange und Worker
+    results['work_queue'] = test_work_queue()
+    
+    # Test 10: Überlappung ohne Duplikate
+    results['stitcher'] = test_stitcher()
+    
+    # Test 11: Modell-Manager
+    results['model_manager'] = test_model_manager()
+    
+    # Test 12: WAV-Wiedergabe
+    results['wav_replay'] = test_wav_replay()
+    
+    # Test 13: Autotuner-Auswahl
+    results['autotune'] = test_autotune_selection()
+    
+    # Test 14: Batch-Sharding
+    results['batch_sharding'] = test_batch_sharding()
+    
+    # Test 15: Shared-Memory-Ringpuffer
+    results['shared_ring'] = test_shared_ring()
+    
+    # Test 16: Lautstärkemesser
+    results['volume_meter'] = test_volume_meter()
+    
+    # Test 17: Transkript-Schreiber
+    results['transcript_writer'] = test_transcript_writer()
+    
+    # Test 18: Transkript-Archiv
+    results['transcript_store'] = test_transcript_store()
+    
+    # Test 19: Vorberechnete Merkmale
+    results['mel_features'] = test_mel_features()
+    
+    # Test 20: Last-Scheduler
+    results['scheduler'] = test_scheduler()
+    
+    # Test 21: Überarbeitung
+    results['refinement'] = test_refinement()
+    
+    # Test 22: Audio-Archiv
+    results['audio_archive'] = test_audio_archive()
+    
+    # Test 23: Mehrere Sprecher
+    results['multi_speaker'] = test_multi_speaker()
+    
+    # Test 24: Batch-Inferenz
+    results['batch_engine'] = test_batch_engine()
+    
+    # Test 25: Stream-Server
+    results['stream_server'] = test_stream_server()
+    
+    # Test 26: Resampler
+    results['resampler'] = test_resampler()
+    
+    # Test 27: Metriken und Profiler
+    results['metrics'] = test_metrics()
+    
+    # Test 28: Streaming-VAD
+    results['streaming_vad'] = test_streaming_vad()
+    
+    # Test 29: Soak-Test und Speicher-Budget
+    results['soak_memory'] = test_soak_memory()
+    
     # Zusammenfassung
     print("\n" + "=" * 50)
     print("📊 TEST-ERGEBNISSE:")
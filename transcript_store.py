@@ -0,0 +1,234 @@
+import argparse
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime
+
+STORE_FILE = "transcripts.sqlite3"
+
+# Ein Suchtreffer: Session, Audio-Zeit (s seit Session-Beginn), Uhrzeit, Text und Kennzahlen
+Hit = namedtuple("Hit", ["session_id", "start", "end", "time", "text", "avg_logprob", "no_speech_prob", "revision",
+                         "speaker", "snippet"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    time REAL NOT NULL,
+    text TEXT NOT NULL,
+    avg_logprob REAL,
+    no_speech_prob REAL,
+    line_id INTEGER,
+    revision INTEGER NOT NULL DEFAULT 0,
+    speaker TEXT
+);
+CREATE INDEX IF NOT EXISTS segments_time ON segments(time);
+CREATE INDEX IF NOT EXISTS segments_session ON segments(session_id, start);
+CREATE INDEX IF NOT EXISTS segments_line ON segments(session_id, line_id);
+CREATE INDEX IF NOT EXISTS segments_speaker ON segments(speaker, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_ADDED_COLUMNS = [
+    ("line_id", "INTEGER"),
+    ("revision", "INTEGER NOT NULL DEFAULT 0"),
+    ("speaker", "TEXT"),
+]
+
+
+def parse_time(value):
+    """Uhrzeit als Unix-Zeit: float, datetime oder ISO-Text wie '2026-10-17' oder '2026-10-17T20:15'."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def phrase_query(text):
+    """FTS5-Ausdruck für eine exakte Wortfolge."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TranscriptStore:
+    """Durchsuchbares Archiv aller Transkript-Segmente in SQLite mit FTS5-Volltextindex.
+
+    add_segments() sammelt Einträge nur in der laufenden Transaktion, commit() schreibt sie gebündelt -
+    im Live-Betrieb erledigt beides der Schreib-Thread des TranscriptWriter, nie die Transkription.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(segments)")]
+        # Archive aus älteren Versionen (ohne Überarbeitungen bzw. Sprecher) ergänzen
+        for column, definition in _ADDED_COLUMNS:
+            if columns and column not in columns:
+                self._db.execute(f"ALTER TABLE segments ADD COLUMN {column} {definition}")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def start_session(self, started=None, source=None):
+        """Legt eine neue Session an und gibt ihre Id zurück."""
+        cursor = self._db.execute("INSERT INTO sessions(started, source) VALUES (?, ?)",
+                                  (time.time() if started is None else parse_time(started), source))
+        self._db.commit()
+        return cursor.lastrowid
+
+    def end_session(self, session_id, ended=None):
+        ended = time.time() if ended is None else parse_time(ended)
+        self._db.execute("UPDATE sessions SET ended = ? WHERE id = ?", (ended, session_id))
+        self._db.commit()
+
+    def add_segments(self, session_id, records):
+        """Übernimmt JSONL-Einträge vom Typ 'segment' (ohne Commit)."""
+        rows = [(session_id, record["start"], record["end"], parse_time(record["time"]), record["text"],
+                 record.get("avg_logprob"), record.get("no_speech_prob"), record.get("id"), record.get("revision", 0),
+                 record.get("speaker"))
+                for record in records if record.get("type") == "segment"]
+        if rows:
+            self._db.executemany("INSERT INTO segments(session_id, start, end, time, text, avg_logprob, no_speech_prob, "
+                                 "line_id, revision, speaker) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def revise_segments(self, session_id, line_id, records):
+        """Ersetzt die Segmente einer Zeile durch ihre überarbeitete Fassung (ohne Commit, in derselben Transaktion)."""
+        self._db.execute("DELETE FROM segments WHERE session_id = ? AND line_id = ?", (session_id, line_id))
+        return self.add_segments(session_id, records)
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def search(self, query=None, phrase=False, since=None, until=None, session_id=None, limit=50, speaker=None):
+        """Sucht Segmente nach Stichworten (FTS5-Syntax), Wortfolge (phrase=True), Zeitraum und/oder Sprecher.
+
+        Ohne query werden alle Segmente im Zeitraum geliefert. Ergebnisse sind zeitlich sortiert.
+        """
+        conditions, params = [], []
+        if query:
+            conditions.append("segments_fts MATCH ?")
+            params.append(phrase_query(query) if phrase else query)
+        if since is not None:
+            conditions.append("s.time >= ?")
+            params.append(parse_time(since))
+        if until is not None:
+            conditions.append("s.time < ?")
+            params.append(parse_time(until))
+        if session_id is not None:
+            conditions.append("s.session_id = ?")
+            params.append(session_id)
+        if speaker is not None:
+            conditions.append("s.speaker = ?")
+            params.append(speaker)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if query:
+            sql = ("SELECT s.session_id, s.start, s.end, s.time, s.text, s.avg_logprob, s.no_speech_prob, s.revision, "
+                   "s.speaker, snippet(segments_fts, 0, '[', ']', '…', 12) "
+                   f"FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid {where} ")
+        else:
+            sql = ("SELECT s.session_id, s.start, s.end, s.time, s.text, s.avg_logprob, s.no_speech_prob, s.revision, "
+                   "s.speaker, s.text "
+                   f"FROM segments s {where} ")
+        sql += "ORDER BY s.time LIMIT ?"
+        params.append(limit)
+        return [Hit(*row) for row in self._db.execute(sql, params)]
+
+    def sessions(self):
+        """Alle Sessions als (id, started, ended, source, segmentanzahl)."""
+        return self._db.execute(
+            "SELECT sessions.id, started, ended, source, COUNT(segments.id) FROM sessions "
+            "LEFT JOIN segments ON segments.session_id = sessions.id GROUP BY sessions.id ORDER BY started"
+        ).fetchall()
+
+    def import_jsonl(self, path):
+        """Übernimmt eine bestehende transcript.jsonl als eigene Session."""
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        segments = [record for record in records if record.get("type") == "segment"]
+        # Von überarbeiteten Zeilen nur die letzte Fassung übernehmen
+        latest = {}
+        for record in segments:
+            if record.get("id") is not None:
+                latest[record["id"]] = max(latest.get(record["id"], 0), record.get("revision", 0))
+        segments = [record for record in segments
+                    if record.get("id") is None or record.get("revision", 0) == latest[record["id"]]]
+        started = parse_time(segments[0]["time"]) - segments[0]["start"] if segments else None
+        session_id = self.start_session(started, source=path)
+        count = self.add_segments(session_id, segments)
+        if segments:
+            self.end_session(session_id, parse_time(segments[-1]["time"]) + segments[-1]["end"] - segments[-1]["start"])
+        self.commit()
+        return session_id, count
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durchsucht das Transkript-Archiv")
+    parser.add_argument("--db", default=STORE_FILE, help="Archiv-Datenbank")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Stichwort-, Wortfolgen- oder Zeitraumsuche")
+    search.add_argument("query", nargs="?", help="Suchbegriffe (FTS5-Syntax, z.B. 'Heidenheim OR Ulm')")
+    search.add_argument("--phrase", action="store_true", help="Suchbegriffe als exakte Wortfolge")
+    search.add_argument("--since", help="Ab Uhrzeit (ISO, z.B. 2026-10-01 oder 2026-10-01T19:00)")
+    search.add_argument("--until", help="Bis Uhrzeit (ISO, exklusiv)")
+    search.add_argument("--session", type=int, help="Nur diese Session")
+    search.add_argument("--speaker", help="Nur dieser Sprecher")
+    search.add_argument("--limit", type=int, default=50)
+
+    commands.add_parser("sessions", help="Alle Sessions auflisten")
+
+    importer = commands.add_parser("import", help="Bestehende JSONL-Transkripte übernehmen")
+    importer.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    store = TranscriptStore(args.db)
+    try:
+        if args.command == "search":
+            start_time = time.perf_counter()
+            hits = store.search(args.query, args.phrase, args.since, args.until, args.session, args.limit, args.speaker)
+            elapsed = time.perf_counter() - start_time
+            for hit in hits:
+                speaker = f" {hit.speaker}" if hit.speaker else ""
+                print(f"[{format_timestamp(hit.time)}] Session {hit.session_id} @ {hit.start:.1f}s{speaker}: {hit.snippet}")
+            print(f"{len(hits)} Treffer in {elapsed * 1000:.1f} ms")
+        elif args.command == "sessions":
+            for session_id, started, ended, source, count in store.sessions():
+                end = format_timestamp(ended) if ended else "läuft/abgebrochen"
+                print(f"{session_id:>4}  {format_timestamp(started)} - {end}  {count:>6} Segmente  {source or ''}")
+        elif args.command == "import":
+            for path in args.files:
+                session_id, count = store.import_jsonl(path)
+                print(f"✓ {path}: Session {session_id}, {count} Segmente")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
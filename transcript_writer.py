@@ -0,0 +1,262 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+MAX_LINES = 2000 # Standard für max_lines: Zeilen der aktuellen Textdatei, die überarbeitbar im Speicher bleiben
+REWRITE_INTERVAL = 60.0 # Sekunden: Standard-Abstand, in dem Überarbeitungen in die Textdatei geschrieben werden
+
+
+class TranscriptWriter:
+    """Schreibt Transkript-Zeilen (Text) und strukturierte Einträge (JSONL) in einem eigenen Thread.
+
+    Die Dateien bleiben geöffnet, geschrieben wird gepuffert: flush() höchstens alle flush_interval
+    Sekunden, os.fsync() alle fsync_interval Sekunden sowie beim Schließen. Bei Erreichen von
+    rotate_bytes (Größe der Textdatei) oder rotate_interval (Sekunden) werden beide Dateien mit dem
+    Startzeitpunkt im Namen beiseitegelegt und neu begonnen (0 = keine Rotation).
+    Mit store (TranscriptStore) landen alle Segmente zusätzlich als eigene Session im Archiv,
+    committet wird zusammen mit dem flush().
+
+    Zeilen mit line_id können später per revise() ersetzt werden: Im JSONL folgt sofort ein Eintrag
+    mit höherer revision, im Archiv werden die Segmente der Zeile ausgetauscht. Die Textdatei wird
+    höchstens alle rewrite_interval Sekunden sowie bei Rotation und Schließen neu geschrieben und per
+    os.replace() atomar ausgetauscht - jedes Neuschreiben kostet die ganze Datei. Zeilen aus bereits
+    rotierten Dateien bleiben dort unverändert.
+
+    Der Schreiber hält nur die letzten max_lines Zeilen im Speicher (0 = alle). Ältere stehen dann nur
+    noch in der Datei: beim Neuschreiben wird ihr Teil unverändert übernommen, Überarbeitungen dieser
+    Zeilen gehen nur noch ins JSONL und ins Archiv. on_limit(anzahl) meldet jedes Einfrieren.
+    """
+
+    def __init__(self, text_path, jsonl_path=None, flush_interval=1.0, fsync_interval=10.0,
+                 rotate_bytes=0, rotate_interval=0, header=None, store=None, max_lines=MAX_LINES, on_limit=None,
+                 rewrite_interval=REWRITE_INTERVAL, log=None):
+        self.text_path = text_path
+        self.jsonl_path = jsonl_path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.header = header   # header(fortsetzung) -> Kopfzeilen jeder neuen Textdatei
+        self.store = store
+        self.max_lines = max_lines
+        self.on_limit = on_limit
+        self.rewrite_interval = rewrite_interval
+        self.frozen_lines = 0   # Zeilen, die nicht mehr im Speicher gehalten werden (über alle Dateien)
+        self.session_id = None
+        self.log = log or (lambda message: None)
+        self.rotations = 0
+        self.rewrites = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._text_file = None
+        self._jsonl_file = None
+        self._opened_at = None
+        self._lines = []        # Inhalt der aktuellen Textdatei (für das Neuschreiben bei Überarbeitungen)
+        self._line_index = {}   # line_id -> Position in der Datei (Zeilen seit Dateibeginn)
+        self._first_line = 0    # Position von _lines[0] - davor liegt der eingefrorene Teil der Datei
+        self._frozen_bytes = 0  # Länge des eingefrorenen Teils auf der Platte
+        self._revised = set()   # Positionen überarbeiteter Zeilen, die noch nicht in der Datei stehen
+
+    @property
+    def lines_in_memory(self):
+        return len(self._lines)
+
+    def start(self):
+        """Legt neue Dateien an (bestehende werden überschrieben) und startet den Schreib-Thread."""
+        self._open(mode="w", continuation=False)
+        if self.store is not None:
+            self.session_id = self.store.start_session(source=self.text_path)
+        self._thread = threading.Thread(target=self._run, name="Transkript-Schreiber", daemon=True)
+        self._thread.start()
+
+    def write(self, line, records=(), line_id=None):
+        """Reiht eine Textzeile und zugehörige JSONL-Einträge (dicts) ein, ohne auf die Platte zu warten."""
+        self._queue.put((False, line_id, line, list(records)))
+
+    def revise(self, line_id, line, records=()):
+        """Ersetzt die Zeile line_id durch eine überarbeitete Fassung (records tragen die neue revision)."""
+        self._queue.put((True, line_id, line, list(records)))
+
+    def close(self, footer=None):
+        """Schreibt alle wartenden Zeilen (und optional footer), synchronisiert und schließt die Dateien."""
+        if self._thread is None:
+            return
+        if footer is not None:
+            self.write(footer)
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _open(self, mode, continuation):
+        self._opened_at = time.time()
+        self._text_file = open(self.text_path, mode, encoding="utf-8")
+        if self.jsonl_path:
+            self._jsonl_file = open(self.jsonl_path, mode, encoding="utf-8")
+        self._lines = []
+        self._line_index = {}
+        self._first_line = 0
+        self._frozen_bytes = 0
+        self._revised = set()
+        if self.header is not None:
+            self._append_text(self.header(continuation))
+
+    def _append_text(self, text, line_id=None):
+        self._text_file.write(text)
+        if line_id is not None:
+            self._line_index[line_id] = self._first_line + len(self._lines)
+        self._lines.append(text)
+        if self.max_lines and len(self._lines) > self.max_lines:
+            self._freeze(len(self._lines) - self.max_lines)
+
+    def _freeze(self, count):
+        """Gibt die ältesten count Zeilen aus dem Speicher frei - in der Datei bleiben sie unverändert stehen."""
+        if self._revised and min(self._revised) < self._first_line + count:
+            self._rewrite_text_file() # Überarbeitete Fassungen erst auf die Platte, sonst stimmen die Längen nicht
+        frozen, self._lines = self._lines[:count], self._lines[count:]
+        # Bytes wie auf der Platte: UTF-8, im Textmodus wird "\n" zu os.linesep
+        self._frozen_bytes += sum(len(text.encode("utf-8")) + text.count("\n") * (len(os.linesep) - 1)
+                                  for text in frozen)
+        self._first_line += count
+        # line_ids stehen in Schreibreihenfolge im dict - die ältesten zuerst
+        while self._line_index:
+            line_id = next(iter(self._line_index))
+            if self._line_index[line_id] >= self._first_line:
+                break
+            del self._line_index[line_id]
+        self.frozen_lines += count
+        if self.on_limit is not None:
+            self.on_limit(self.frozen_lines)
+
+    def _rewrite_text_file(self):
+        """Schreibt die aktuelle Textdatei mit überarbeiteten Zeilen neu und tauscht sie atomar aus."""
+        temporary = self.text_path + ".tmp"
+        if self._frozen_bytes:
+            # Eingefrorenen Anfang unverändert von der Platte übernehmen
+            self._text_file.flush()
+            with open(self.text_path, "rb") as source, open(temporary, "wb") as target:
+                remaining = self._frozen_bytes
+                while remaining:
+                    block = source.read(min(remaining, 1 << 20))
+                    if not block:
+                        break
+                    target.write(block)
+                    remaining -= len(block)
+        with open(temporary, "a" if self._frozen_bytes else "w", encoding="utf-8") as f:
+            f.write("".join(self._lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._text_file.close()
+        os.replace(temporary, self.text_path)
+        self._text_file = open(self.text_path, "a", encoding="utf-8")
+        self._revised = set()
+        self.rewrites += 1
+
+    def _close_files(self):
+        for f in (self._text_file, self._jsonl_file):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+        self._text_file = self._jsonl_file = None
+
+    def _rotate(self):
+        suffix = datetime.fromtimestamp(self._opened_at).strftime("%Y%m%d-%H%M%S")
+        base, ext = os.path.splitext(self.text_path)
+        if os.path.exists(f"{base}_{suffix}{ext}"):
+            # Mehrere Rotationen in derselben Sekunde nicht überschreiben
+            suffix += f"-{self.rotations}"
+        if self._revised:
+            self._rewrite_text_file()
+        self._close_files()
+        if self.store is not None:
+            # Auch das Archiv festschreiben - nach der Rotation flusht _run() erst mit der nächsten Zeile
+            self.store.commit()
+        for path in (self.text_path, self.jsonl_path):
+            if path:
+                base, ext = os.path.splitext(path)
+                os.replace(path, f"{base}_{suffix}{ext}")
+        self._open(mode="w", continuation=True)
+        self.rotations += 1
+        self.log(f"Transkript rotiert ({suffix})")
+
+    def _due_for_rotation(self):
+        if self.rotate_bytes and self._text_file.tell() >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_interval) and time.time() - self._opened_at >= self.rotate_interval
+
+    def _run(self):
+        last_flush = last_fsync = last_rewrite = time.monotonic()
+        dirty = False
+        while True:
+            deadlines = []
+            if dirty:
+                deadlines.append(last_flush + self.flush_interval)
+            if self._revised:
+                deadlines.append(last_rewrite + self.rewrite_interval)
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = False # Nur Flush oder Neuschreiben fällig
+
+            if entry is None:
+                break
+            if entry:
+                revision, line_id, line, records = entry
+                try:
+                    if not revision:
+                        self._append_text(line + "\n", line_id)
+                    elif line_id in self._line_index:
+                        position = self._line_index[line_id]
+                        self._lines[position - self._first_line] = line + "\n"
+                        self._revised.add(position)
+                    if self._jsonl_file is not None:
+                        for record in records:
+                            self._jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if self.store is not None:
+                        if revision:
+                            self.store.revise_segments(self.session_id, line_id, records)
+                        else:
+                            self.store.add_segments(self.session_id, records)
+                    dirty = True
+                    if self._due_for_rotation():
+                        self._rotate()
+                        dirty = False
+                except (OSError, sqlite3.Error) as e:
+                    self.log(f"Fehler beim Schreiben des Transkripts: {e}")
+
+            now = time.monotonic()
+            if self._revised and now - last_rewrite >= self.rewrite_interval:
+                try:
+                    self._rewrite_text_file()
+                except OSError as e:
+                    self.log(f"Fehler beim Schreiben des Transkripts: {e}")
+                last_rewrite = now
+            if dirty and now - last_flush >= self.flush_interval:
+                try:
+                    for f in (self._text_file, self._jsonl_file):
+                        if f is not None:
+                            f.flush()
+                            if now - last_fsync >= self.fsync_interval:
+                                os.fsync(f.fileno())
+                    if self.store is not None:
+                        self.store.commit()
+                except (OSError, sqlite3.Error) as e:
+                    self.log(f"Fehler beim Schreiben des Transkripts: {e}")
+                if now - last_fsync >= self.fsync_interval:
+                    last_fsync = now
+                last_flush = now
+                dirty = False
+        if self._revised:
+            self._rewrite_text_file()
+        self._close_files()
+        if self.store is not None:
+            try:
+                self.store.end_session(self.session_id)
+                self.store.close()
+            except sqlite3.Error as e:
+                self.log(f"Fehler beim Schließen des Archivs: {e}")
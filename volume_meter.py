@@ -0,0 +1,116 @@
+import bisect
+from collections import namedtuple
+
+import numpy as np
+
+# Ein Eintrag der Pegel-Historie: Ende in Sekunden Audio-Zeit, RMS und Spitze in [0, 1], Pegel 0-4
+LevelBin = namedtuple("LevelBin", ["time", "rms", "peak", "level"])
+
+
+class VolumeMeter:
+    """Streaming-Lautstärkemesser für den Aufnahme-Thread mit Pegel-Historie für den Visualizer.
+
+    Pro Chunk wird die Quadratsumme im Integer-Bereich berechnet - in einem einmal reservierten
+    int64-Arbeitspuffer statt in neuen float-Kopien - und der Pegel per Schwellen-Suche bestimmt.
+    Alle bin_duration Sekunden landet ein Eintrag (RMS, Spitze, Pegel) in einem Ring fester Größe.
+
+    Leser brauchen kein Lock: level/rms sind einfache Attribute, snapshot() kopiert die Historie und
+    prüft danach, ob der Schreiber sie währenddessen überholt hat. subscribe() ruft Callbacks pro
+    Eintrag im Aufnahme-Thread auf - sie müssen also schnell sein.
+    """
+
+    def __init__(self, thresholds, rate, history_duration=10.0, bin_duration=0.064):
+        # Schwellen 1-4 bestimmen den Pegel, unterhalb von Schwelle 1 gilt Stille (Pegel 0)
+        self.thresholds = np.array([thresholds[level] for level in sorted(thresholds) if level > 0],
+                                   dtype=np.float64)
+        self._threshold_list = self.thresholds.tolist()
+        self.rate = rate
+        self.bin_samples = max(1, int(round(bin_duration * rate)))
+        self.capacity = max(1, int(round(history_duration / bin_duration)))
+
+        self._rms = np.zeros(self.capacity, dtype=np.float32)
+        self._peak = np.zeros(self.capacity, dtype=np.float32)
+        self._level = np.zeros(self.capacity, dtype=np.int8)
+        self._time = np.zeros(self.capacity, dtype=np.float64)
+        self._count = 0   # Anzahl geschriebener Einträge (monoton steigend, wird zuletzt erhöht)
+
+        self._samples = 0        # Verarbeitete Samples insgesamt
+        self._bin_sum = 0        # Quadratsumme des laufenden Eintrags
+        self._bin_peak = 0
+        self._bin_fill = 0
+
+        self.level = 0    # Pegel des letzten Chunks (0 = Stille, 1-4 = leise bis sehr laut)
+        self.rms = 0.0    # RMS des letzten Chunks in [0, 1]
+        self._subscribers = []
+        self._work = np.empty(0, dtype=np.int64)
+
+    def level_for(self, rms):
+        """Pegel 0-4 für einen RMS-Wert oder ein Array von RMS-Werten."""
+        return np.searchsorted(self.thresholds, rms, side="right")
+
+    def update(self, data):
+        """Verarbeitet einen Chunk (bytes oder int16-Array) und gibt (Pegel, RMS) zurück."""
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        n = len(samples)
+        if n == 0:
+            return self.level, self.rms
+
+        # Quadratsumme und Spitze im wiederverwendeten int64-Puffer (kein Überlauf, keine Allokation)
+        if len(self._work) < n:
+            self._work = np.empty(n, dtype=np.int64)
+        work = self._work[:n]
+        np.copyto(work, samples)
+        square_sum = int(np.dot(work, work))
+        np.abs(work, out=work)
+        peak = int(work.max())
+        rms = (square_sum / n) ** 0.5 / 32768.0
+        level = bisect.bisect_right(self._threshold_list, rms)
+        self.rms = rms
+        self.level = level
+
+        self._samples += n
+        self._bin_sum += square_sum
+        self._bin_peak = max(self._bin_peak, peak)
+        self._bin_fill += n
+        if self._bin_fill >= self.bin_samples:
+            self._close_bin()
+        return level, rms
+
+    def _close_bin(self):
+        rms = (self._bin_sum / self._bin_fill) ** 0.5 / 32768.0
+        level = bisect.bisect_right(self._threshold_list, rms)
+        entry = LevelBin(self._samples / self.rate, rms, self._bin_peak / 32768.0, level)
+        index = self._count % self.capacity
+        self._rms[index] = entry.rms
+        self._peak[index] = entry.peak
+        self._level[index] = entry.level
+        self._time[index] = entry.time
+        self._count += 1   # Erst nach dem Schreiben veröffentlichen
+        self._bin_sum = self._bin_peak = self._bin_fill = 0
+        for callback in self._subscribers:
+            callback(entry)
+
+    def subscribe(self, callback):
+        """Registriert callback(LevelBin), aufgerufen für jeden neuen Historien-Eintrag."""
+        self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        self._subscribers = [c for c in self._subscribers if c is not callback]
+
+    def snapshot(self, count=None):
+        """Gibt (time, rms, peak, level) als Kopien der letzten count Einträge in zeitlicher Reihenfolge zurück.
+
+        time enthält das Ende jedes Eintrags in Sekunden Audio-Zeit.
+        """
+        count = self.capacity if count is None else min(count, self.capacity)
+        while True:
+            total = self._count
+            available = min(count, total)
+            positions = np.arange(total - available, total) % self.capacity
+            rms = self._rms[positions]
+            peak = self._peak[positions]
+            level = self._level[positions]
+            times = self._time[positions]
+            # Hat der Schreiber die kopierten Einträge inzwischen überschrieben, erneut lesen
+            if self._count - total <= self.capacity - available:
+                return times, rms, peak, level
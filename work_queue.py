@@ -0,0 +1,159 @@
+import collections
+import heapq
+import itertools
+import threading
+
+# Strategien, wenn die Warteschlange voll ist
+BLOCK = "block"              # Erzeuger wartet, bis wieder Platz ist
+DROP_OLDEST = "drop_oldest"  # Ältesten wartenden Auftrag verwerfen (wird über on_drop gemeldet)
+COALESCE = "coalesce"        # Neuen Auftrag mit dem jüngsten wartenden zusammenlegen, sonst DROP_OLDEST
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+
+class BoundedWorkQueue:
+    """Begrenzte Auftrags-Warteschlange mit fortlaufenden Sequenznummern und expliziter Überlast-Strategie.
+
+    Jeder Auftrag bekommt beim Einreihen eine Sequenznummer, damit Ergebnisse mehrerer
+    Worker später wieder in der richtigen Reihenfolge ausgegeben werden können.
+    Verworfene Aufträge gehen nie stillschweigend verloren, sondern werden an on_drop gemeldet.
+    """
+
+    def __init__(self, maxsize, policy=BLOCK, merge=None, on_drop=None, lock=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unbekannte Strategie '{policy}', erlaubt sind: {', '.join(POLICIES)}")
+        if policy == COALESCE and merge is None:
+            raise ValueError("Strategie 'coalesce' benötigt eine merge-Funktion")
+        self.maxsize = int(maxsize)
+        self.policy = policy
+        self.merge = merge
+        self.on_drop = on_drop
+        self._items = collections.deque()
+        self._next_seq = 0
+        self._closed = False
+        self._cond = threading.Condition(lock) # lock: z.B. metrics.TimedLock (darf nicht reentrant sein)
+        # Statistik
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_watermark = 0
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, timeout=None):
+        """Reiht einen Auftrag ein und gibt seine Sequenznummer zurück (bei Zusammenlegung die des Ziel-Auftrags)."""
+        dropped = None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Warteschlange ist geschlossen")
+            if len(self._items) >= self.maxsize:
+                if self.policy == COALESCE:
+                    seq, pending = self._items[-1]
+                    merged = self.merge(pending, item)
+                    if merged is not None:
+                        self._items[-1] = (seq, merged)
+                        self.coalesced += 1
+                        return seq
+                if self.policy == BLOCK:
+                    if not self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed, timeout):
+                        raise TimeoutError("Warteschlange voll")
+                    if self._closed:
+                        raise RuntimeError("Warteschlange ist geschlossen")
+                else:
+                    dropped = self._items.popleft()
+                    self.dropped += 1
+            seq = self._next_seq
+            self._next_seq += 1
+            self._items.append((seq, item))
+            self.high_watermark = max(self.high_watermark, len(self._items))
+            self._cond.notify_all()
+
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(*dropped)
+        return seq
+
+    def get(self, timeout=None):
+        """Gibt (seq, item) zurück, oder None wenn die Warteschlange geschlossen und leer ist."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise TimeoutError("Keine Aufträge vorhanden")
+            if not self._items:
+                return None
+            job = self._items.popleft()
+            self._cond.notify_all()
+            return job
+
+    def resize(self, maxsize):
+        """Ändert die Zahl der Plätze. Beim Verkleinern bleiben überzählige Aufträge, bis sie abgeholt sind."""
+        with self._cond:
+            self.maxsize = int(maxsize)
+            self._cond.notify_all() # Wartende Erzeuger haben evtl. wieder Platz
+
+    def close(self):
+        """Nimmt keine neuen Aufträge mehr an, bereits wartende werden noch ausgegeben."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ReorderBuffer:
+    """Sammelt Ergebnisse in beliebiger Reihenfolge und gibt sie streng nach Sequenznummer an emit weiter."""
+
+    def __init__(self, emit, first_seq=0, lock=None):
+        self.emit = emit
+        self._next_seq = first_seq
+        self._pending = {}
+        self._lock = lock or threading.Lock()
+
+    def submit(self, seq, result):
+        """Legt ein Ergebnis ab und gibt alle nun lückenlos verfügbaren Ergebnisse aus."""
+        with self._lock:
+            self._pending[seq] = result
+            while self._next_seq in self._pending:
+                self.emit(self._next_seq, self._pending.pop(self._next_seq))
+                self._next_seq += 1
+
+    def pending_count(self):
+        """Anzahl fertiger Ergebnisse, die noch auf einen Vorgänger warten."""
+        with self._lock:
+            return len(self._pending)
+
+
+class TimeOrderedMerge:
+    """Führt die jeweils geordneten Ausgaben mehrerer Quellen nach ihrem Zeitstempel zusammen.
+
+    push() hält ein Element zurück, bis jede Quelle per advance() einen Wasserstand gemeldet hat,
+    vor dem sie nichts mehr liefern wird. Dann gehen alle Elemente bis zum kleinsten Wasserstand
+    zeitlich sortiert an emit(source, item). flush() gibt alle zurückgehaltenen Elemente aus.
+    """
+
+    def __init__(self, sources, emit):
+        self.emit = emit
+        self._watermarks = [float("-inf")] * sources
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, source, timestamp, item):
+        with self._lock:
+            heapq.heappush(self._heap, (timestamp, next(self._counter), source, item))
+            self._release(min(self._watermarks))
+
+    def advance(self, source, watermark):
+        """Meldet, dass source keine Elemente vor watermark mehr liefert (float('inf') = Quelle beendet)."""
+        with self._lock:
+            self._watermarks[source] = watermark
+            self._release(min(self._watermarks))
+
+    def flush(self):
+        with self._lock:
+            self._release(float("inf"))
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._heap)
+
+    def _release(self, watermark):
+        while self._heap and self._heap[0][0] <= watermark:
+            _, _, source, item = heapq.heappop(self._heap)
+            self.emit(source, item)